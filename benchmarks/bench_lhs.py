@@ -0,0 +1,72 @@
+"""
+Benchmark for the gene-pool Latin hypercube generator.
+
+Compares `emat.experiment.latin_hypercube.lhs` with a reference copy of
+the previous implementation, which computed the dense correlation
+matrix of the entire gene pool, reporting run time, peak traced memory,
+and the largest absolute correlation between any two columns of the
+resulting design.  The previous implementation is only run for the
+smaller design, as the dense version needs many gigabytes of memory
+for the larger one.
+
+Run from the repository root::
+
+    python benchmarks/bench_lhs.py
+"""
+
+import time
+import tracemalloc
+import numpy
+
+from emat.experiment.latin_hypercube import lhs
+
+
+def dense_lhs(n_factors, n_samples, genepool=10000, random_in_cell=True):
+    """Reference copy of the previous `lhs` implementation."""
+    candidates = numpy.empty([genepool, n_samples], dtype=numpy.float64)
+    for i in range(genepool):
+        candidates[i, :] = numpy.random.permutation(n_samples)
+    corr = numpy.fabs(numpy.corrcoef(candidates))
+    keepers = [0]
+    keeper_gross_corr = 0
+    for j in range(n_factors - 1):
+        keeper_gross_corr += corr[keepers[-1], :]
+        k = numpy.argmin(keeper_gross_corr)
+        keepers.append(k)
+    result = candidates[keepers, :].copy()
+    if random_in_cell:
+        result += numpy.random.rand(*(result.shape))
+    else:
+        result += 0.5
+    result /= n_samples
+    return result
+
+
+def max_abs_corr(h):
+    corr = numpy.corrcoef(h)
+    return numpy.fabs(corr - numpy.eye(corr.shape[0])).max()
+
+
+def timed(label, func, *args, **kwargs):
+    numpy.random.seed(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    h = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>40}: {elapsed:8.2f} s  peak {peak / 2**20:9.1f} MiB  "
+          f"max |corr| {max_abs_corr(h):.4f}")
+
+
+def main():
+    print("50 factors x 2000 samples, genepool 5000")
+    timed("dense corrcoef (previous)", dense_lhs, 50, 2000, genepool=5000)
+    timed("streamed (correlation)", lhs, 50, 2000, genepool=5000)
+    timed("streamed (maximin)", lhs, 50, 2000, genepool=5000, criterion='maximin')
+    print("200 factors x 50000 samples, genepool 10000")
+    timed("streamed (correlation)", lhs, 200, 50000)
+
+
+if __name__ == '__main__':
+    main()
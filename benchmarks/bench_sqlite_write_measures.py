@@ -0,0 +1,113 @@
+"""
+Benchmark for writing performance measures to a SQLiteDB.
+
+Reports rows (individual measure values) per second written by
+`SQLiteDB.write_experiment_measures`, using the default `executemany`
+path and the temporary staging table path, for 10k, 100k and 1M
+measure values.  A reference timing that inserts one value per
+`execute` call is included for the smaller sizes.
+
+Run from the repository root::
+
+    python benchmarks/bench_sqlite_write_measures.py
+"""
+
+import time
+import uuid
+import numpy as np
+import pandas as pd
+
+import emat
+from emat.database.sqlite import sql_queries as sq
+
+N_MEASURES = 40
+
+
+def make_db(n_measures=N_MEASURES):
+    inputs = "\n".join(
+        f"""
+        x{i}:
+            ptype: uncertainty
+            dtype: float
+            default: 0.5
+            min: 0
+            max: 1"""
+        for i in range(3)
+    )
+    outputs = "\n".join(
+        f"""
+        m{i}:
+            kind: info"""
+        for i in range(n_measures)
+    )
+    yaml = f"""
+    scope:
+        name: bench
+    inputs:{inputs}
+    outputs:{outputs}
+    """
+    scope = emat.Scope("bench.yaml", yaml)
+    db = emat.SQLiteDB()
+    scope.store_scope(db)
+    return scope, db
+
+
+def make_design(scope, db, n_experiments):
+    rng = np.random.default_rng(0)
+    xl_df = pd.DataFrame(
+        rng.random([n_experiments, 3]),
+        columns=scope.get_parameter_names(),
+    )
+    ex_ids = db.write_experiment_parameters(scope.name, 'bench', xl_df)
+    m_df = pd.DataFrame(
+        rng.random([n_experiments, len(scope.get_measure_names())]),
+        columns=scope.get_measure_names(),
+        index=pd.Index(ex_ids, name='experiment'),
+    )
+    return m_df
+
+
+def write_per_cell(db, scope_name, source, m_df):
+    """Reference implementation, one `execute` per measure value."""
+    with db.conn:
+        cur = db.conn.cursor()
+        run_ids = [
+            db.new_run_id(scope_name, experiment_id=ex_id, source=source)[0]
+            for ex_id in m_df.index
+        ]
+        for measure_name in m_df.columns:
+            for (ex_id, value), uid in zip(m_df[measure_name].items(), run_ids):
+                cur.execute(sq.INSERT_EX_M, dict(
+                    experiment_id=ex_id,
+                    measure_value=value,
+                    measure_source=source,
+                    measure_name=measure_name,
+                    measure_run=uid.bytes,
+                ))
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main(sizes=(10_000, 100_000, 1_000_000), reference_limit=100_000):
+    print(f"{'values':>10} {'method':>10} {'seconds':>10} {'rows/sec':>12}")
+    for n_values in sizes:
+        n_experiments = n_values // N_MEASURES
+        methods = [
+            ('bulk', lambda db, m_df: db.write_experiment_measures('bench', 0, m_df)),
+            ('staging', lambda db, m_df: db.write_experiment_measures('bench', 0, m_df, staging=True)),
+        ]
+        if n_values <= reference_limit:
+            methods.append(('per-cell', lambda db, m_df: write_per_cell(db, 'bench', 0, m_df)))
+        for label, method in methods:
+            scope, db = make_db()
+            m_df = make_design(scope, db, n_experiments)
+            elapsed = timed(method, db, m_df)
+            print(f"{n_values:>10} {label:>10} {elapsed:>10.2f} {n_values/elapsed:>12,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -88,6 +88,107 @@ def compute_categorical_similarity(x,y):
 	return numpy.absolute(x - y).sum()/2.0 # divide by two for double-counting
 
 
+def _smallest_uint(n):
+	for dtype in (numpy.uint8, numpy.uint16, numpy.uint32):
+		if n <= numpy.iinfo(dtype).max:
+			return dtype
+	return numpy.uint64
+
+
+class BinIndex:
+	"""
+	The bin of each value in a data column, computed once.
+
+	Each value is coded by the number of its bin, counting from 1, or by 0
+	if it is missing or outside all the bins.  The codes are stored in the
+	smallest unsigned integer type that fits, so counting the values in
+	each bin for any selection of the data is a single `numpy.bincount`.
+
+	Args:
+		codes (array-like of int): The bin codes.
+		shape (tuple of int): The shape of the bins, one dimension
+			for a histogram or two for a heatmap.
+	"""
+
+	def __init__(self, codes, shape):
+		self.shape = tuple(shape)
+		self.n_bins = int(numpy.prod(self.shape))
+		self.codes = numpy.asarray(codes).astype(_smallest_uint(self.n_bins), copy=False)
+		self.totals = self.counts()
+
+	@classmethod
+	def from_edges(cls, values, edges):
+		"""
+		Bin values like `numpy.histogram`, by explicit bin edges.
+
+		Each bin includes its left edge, and the last bin also its right edge.
+		"""
+		values = numpy.asarray(values, dtype=float)
+		edges = numpy.asarray(edges, dtype=float)
+		n = len(edges) - 1
+		codes = numpy.searchsorted(edges, values, side='right')
+		codes[values == edges[-1]] = n
+		codes[codes > n] = 0
+		index = cls(codes, (n,))
+		index.edges = edges
+		return index
+
+	@classmethod
+	def from_labels(cls, values, labels):
+		"""Bin values by matching each to one of the labels."""
+		codes = pandas.Series(values).astype(
+			pandas.CategoricalDtype(categories=labels, ordered=False)
+		).cat.codes.to_numpy() + 1
+		index = cls(codes, (len(labels),))
+		index.labels = labels
+		return index
+
+	@classmethod
+	def from_range(cls, values, bins, range_):
+		"""
+		Bin values into equal width bins spanning a range, like `datashader`.
+
+		Values exactly at the top of the range are in the last bin.
+		"""
+		values = numpy.asarray(values, dtype=float)
+		lo, hi = range_
+		scale = bins / (hi - lo)
+		inside = (values >= lo) & (values <= hi)
+		codes = numpy.zeros(len(values), dtype=numpy.int64)
+		codes[inside] = numpy.minimum((values[inside] * scale - lo * scale).astype(numpy.int64), bins - 1) + 1
+		index = cls(codes, (bins,))
+		index.centers = lo + (numpy.arange(bins) + 0.5) * (hi - lo) / bins
+		return index
+
+	@classmethod
+	def product(cls, y_index, x_index):
+		"""Combine the bins of two columns into the cells of a 2-d grid."""
+		y_codes = y_index.codes.astype(numpy.int64)
+		x_codes = x_index.codes.astype(numpy.int64)
+		codes = numpy.where(
+			(y_codes > 0) & (x_codes > 0),
+			(y_codes - 1) * x_index.n_bins + x_codes,
+			0,
+		)
+		return cls(codes, y_index.shape + x_index.shape)
+
+	def counts(self, selection=None):
+		"""
+		Count the values in each bin.
+
+		Args:
+			selection (array-like of bool, optional):
+				Count only these values.
+
+		Returns:
+			numpy.ndarray
+		"""
+		codes = self.codes
+		if selection is not None:
+			codes = codes[numpy.asarray(selection, dtype=bool)]
+		return numpy.bincount(codes, minlength=self.n_bins + 1)[1:].reshape(self.shape)
+
+
 def new_histogram_figure(
 		selection,
 		data_column,
@@ -104,6 +205,7 @@ def new_histogram_figure(
 		ref_point=None,
 		ghost_fraction=0.2,
 		earth_movers_dist=False,
+		bin_index=None,
 ):
 	"""
 	Create a new histogram figure for use with the visualizer.
@@ -124,6 +226,9 @@ def new_histogram_figure(
 		figure_class ({go.FigureWidget, go.Figure}, optional):
 			The class type of figure to generate. If not given,
 			a go.FigureWidget is created.
+		bin_index (BinIndex, optional):
+			The precomputed bins of `data_column`, made with
+			`BinIndex.from_edges`.  If given, `bins` is ignored.
 
 	Returns:
 		go.FigureWidget or go.Figure
@@ -132,22 +237,27 @@ def new_histogram_figure(
 	selected_color = colors.Color(selected_color, default=colors.DEFAULT_HIGHLIGHT_COLOR_RGB)
 	if figure_class is None:
 		figure_class = go.FigureWidget
-	data_column_missing_data = data_column.isna()
-	data_column_legit_data = ~data_column_missing_data
 
-	if bins is None:
-		bins = 20
-	try:
-		bar_heights, bar_x = numpy.histogram(data_column[data_column_legit_data], bins=bins)
-	except:
-		_logger.error("ERROR IN COMPUTING HISTOGRAM")
-		_logger.error(f"  bins = {bins}")
-		_logger.error(f"  data_column.name = {getattr(data_column,'name','name not found')}")
-		_logger.error(f"  data_column = {data_column}")
-		raise
+	if bin_index is not None:
+		bar_x = bin_index.edges
+		bar_heights = bin_index.totals
+		bar_heights_select = bin_index.counts(selection)
+	else:
+		data_column_missing_data = data_column.isna()
+		data_column_legit_data = ~data_column_missing_data
+		if bins is None:
+			bins = 20
+		try:
+			bar_heights, bar_x = numpy.histogram(data_column[data_column_legit_data], bins=bins)
+		except:
+			_logger.error("ERROR IN COMPUTING HISTOGRAM")
+			_logger.error(f"  bins = {bins}")
+			_logger.error(f"  data_column.name = {getattr(data_column,'name','name not found')}")
+			_logger.error(f"  data_column = {data_column}")
+			raise
+		bar_heights_select, bar_x = numpy.histogram(data_column[selection][data_column_legit_data], bins=bar_x)
 	bins_left = bar_x[:-1]
 	bins_width = bar_x[1:] - bar_x[:-1]
-	bar_heights_select, bar_x = numpy.histogram(data_column[selection][data_column_legit_data], bins=bar_x)
 
 	ghost_x, ghost_y = [], []
 	ghost_mode = (numpy.sum(bar_heights_select) / numpy.sum(bar_heights) < ghost_fraction)
@@ -257,6 +367,7 @@ def update_histogram_figure(
 		unselected_color=None,
 		ghost_fraction=0.2,
 		earth_movers_dist=False,
+		bin_index=None,
 ):
 	"""
 	Update an existing figure used in the visualizer.
@@ -265,21 +376,29 @@ def update_histogram_figure(
 		fig:
 		selection:
 		data_column:
+		bin_index (BinIndex, optional):
+			The precomputed bins of `data_column`, which are
+			the same as the bins of the figure.
 
 	Returns:
 		fig
 	"""
 	unselected_color = colors.Color(unselected_color)
 	selected_color = colors.Color(selected_color)
-	bins = list(fig['data'][0]['x'] - fig['data'][0]['width']/2)
-	bins.append(fig['data'][0]['x'][-1] + fig['data'][0]['width'][-1])
-	data_column_missing_data = data_column.isna()
-	data_column_legit_data = ~data_column_missing_data
-	bar_heights, bar_x = numpy.histogram(data_column[data_column_legit_data], bins=bins)
-	bar_heights_select, bar_x = numpy.histogram(
-		data_column[selection][data_column_legit_data],
-		bins=bar_x,
-	)
+	if bin_index is not None:
+		bar_x = bin_index.edges
+		bar_heights = bin_index.totals
+		bar_heights_select = bin_index.counts(selection)
+	else:
+		bins = list(fig['data'][0]['x'] - fig['data'][0]['width']/2)
+		bins.append(fig['data'][0]['x'][-1] + fig['data'][0]['width'][-1])
+		data_column_missing_data = data_column.isna()
+		data_column_legit_data = ~data_column_missing_data
+		bar_heights, bar_x = numpy.histogram(data_column[data_column_legit_data], bins=bins)
+		bar_heights_select, bar_x = numpy.histogram(
+			data_column[selection][data_column_legit_data],
+			bins=bar_x,
+		)
 	if 'meta' in fig['layout']:
 		meta = fig['layout']['meta']
 		if meta is None:
@@ -412,6 +531,7 @@ def new_frequencies_figure(
 		ref_point=None,
 		ghost_fraction=0.2,
 		categorical_similarity=False,
+		bin_index=None,
 ):
 	unselected_color = colors.Color(unselected_color, default=colors.DEFAULT_BASE_COLOR)
 	selected_color = colors.Color(selected_color, default=colors.DEFAULT_HIGHLIGHT_COLOR_RGB)
@@ -420,11 +540,10 @@ def new_frequencies_figure(
 	if label_name_map is None:
 		label_name_map = {True: 'True', False: 'False'}
 
-	v = data_column.astype(
-		pandas.CategoricalDtype(categories=labels, ordered=False)
-	).cat.codes
-	bar_heights, bar_x = numpy.histogram(v, bins=numpy.arange(0, len(labels) + 1))
-	bar_heights_select, _ = numpy.histogram(v[selection], bins=numpy.arange(0, len(labels) + 1))
+	if bin_index is None:
+		bin_index = BinIndex.from_labels(data_column, labels)
+	bar_heights = bin_index.totals
+	bar_heights_select = bin_index.counts(selection)
 	original_labels = labels
 	labels = [label_name_map.get(i, i) for i in labels]
 	ghost_x, ghost_y = [], []
@@ -526,15 +645,15 @@ def update_frequencies_figure(
 		unselected_color=None,
 		ghost_fraction=0.2,
 		categorical_similarity=False,
+		bin_index=None,
 ):
 	unselected_color = colors.Color(unselected_color)
 	selected_color = colors.Color(selected_color)
-	labels = list(fig['layout']['meta']['x_tick_values'])
-	v = data_column.astype(
-		pandas.CategoricalDtype(categories=labels, ordered=False)
-	).cat.codes
-	bar_heights, bar_x = numpy.histogram(v, bins=numpy.arange(0, len(labels) + 1))
-	bar_heights_select, _ = numpy.histogram(v[selection], bins=numpy.arange(0, len(labels) + 1))
+	if bin_index is None:
+		labels = list(fig['layout']['meta']['x_tick_values'])
+		bin_index = BinIndex.from_labels(data_column, labels)
+	bar_heights = bin_index.totals
+	bar_heights_select = bin_index.counts(selection)
 	fig['data'][0]['y'] = bar_heights_select
 	fig['data'][1]['y'] = bar_heights - bar_heights_select
 	if rerange_y:
@@ -1487,6 +1606,146 @@ def _get_bins_and_range(ticktext, label, in_range, scope):
 			range_ = (param.min-0.5, param.max+0.5)
 	return bins, range_
 
+def _hmm_axis(scope, data, label, bin_cache):
+	"""The ticks, range and bins of a heat map matrix dimension, cached in `bin_cache`."""
+	if label not in bin_cache:
+		points = perturb_categorical_df(data, label)
+		ticktext, tickvals, range_ = axis_info(data[label], range_padding=0.25, epsilon=0.25)
+		bins, bins_range = _get_bins_and_range(ticktext, label, range_, scope)
+		bin_cache[label] = dict(
+			points=points,
+			ticktext=ticktext,
+			tickvals=tickvals,
+			range=range_,
+			bin_index=BinIndex.from_range(points, bins, bins_range),
+		)
+	return bin_cache[label]
+
+def _hmm_cell_counts(row, col, y_axis, x_axis, selection, bin_cache):
+	"""Count the selected and unselected points in each bin of a heat map."""
+	if (row, col) not in bin_cache:
+		bin_cache[(row, col)] = BinIndex.product(y_axis['bin_index'], x_axis['bin_index'])
+	bin_index = bin_cache[(row, col)]
+	selected = bin_index.counts(selection)
+	return selected, bin_index.totals - selected
+
+def _hmm_hover_meta(agg1_arr, agg0_arr, x_ticktext, y_ticktext):
+	wtype_def = [
+		('ns', agg1_arr.dtype),
+		('nu', agg0_arr.dtype),
+	]
+	if x_ticktext is not None:
+		wtype_def.append(
+			('x', numpy.asarray(x_ticktext).astype('U').dtype)
+		)
+	if y_ticktext is not None:
+		wtype_def.append(
+			('y', numpy.asarray(y_ticktext).astype('U').dtype)
+		)
+	meta = numpy.empty(agg0_arr.shape, dtype=numpy.dtype(wtype_def))
+	meta['ns'] = agg1_arr
+	meta['nu'] = agg0_arr
+	if x_ticktext is not None:
+		meta[:,1::2]['x']=x_ticktext
+	if y_ticktext is not None:
+		meta[1::2,:]['y']=numpy.asarray(y_ticktext)[:,None]
+	return meta
+
+def _hmm_heatmap_z(agg_arr):
+	z = agg_arr.astype(numpy.float32)
+	z[z == 0] = numpy.nan
+	return z
+
+def _hmm_coloraxes(n, zmax, selected_color, unselected_color):
+	return {
+		f"coloraxis{n*2-1}": {
+			'showscale': False,
+			'colorscale': [
+				[0.0, selected_color.rgba(0.0)],
+				[0.5, selected_color.rgba(0.6)],
+				[1.0, selected_color.rgba(1.0)],
+			],
+			'cmax':zmax,
+			'cmin':0,
+		},
+		f"coloraxis{n*2}": {
+			'showscale': False,
+			'colorscale': [
+				[0.0, unselected_color.rgba(0.0)],
+				[0.5, unselected_color.rgba(0.6)],
+				[1.0, unselected_color.rgba(1.0)],
+			],
+			'cmax': zmax,
+			'cmin': 0,
+		},
+	}
+
+def _hmm_selected_points(scope, data, selection, n_selected, show_points, row, col, y_axis, x_axis):
+	"""The selected points to overlay on a heat map, if there are few enough."""
+	experiment_name = "Experiment"
+	if data.index.name:
+		experiment_name = data.index.name
+	if x_axis['ticktext'] is not None or y_axis['ticktext'] is not None:
+		hovertemplate_s = (
+				f'<b>{scope.shortname(row)}</b>: %{{meta[1]}}<br>' +
+				f'<b>{scope.shortname(col)}</b>: %{{meta[2]}}' +
+				f'<extra>{experiment_name} %{{meta[0]}}</extra>'
+		)
+	else:
+		hovertemplate_s = (
+				f'<b>{scope.shortname(row)}</b>: %{{y}}<br>' +
+				f'<b>{scope.shortname(col)}</b>: %{{x}}' +
+				f'<extra>{experiment_name} %{{meta}}</extra>'
+		)
+	if n_selected > show_points:
+		return [None], [None], hovertemplate_s, None
+	if x_axis['ticktext'] is not None or y_axis['ticktext'] is not None:
+		meta_s = data[selection][[row, col]].reset_index().to_numpy()
+	else:
+		meta_s = multiindex_to_strings(data[selection].index)
+	return x_axis['points'][selection], y_axis['points'][selection], hovertemplate_s, meta_s
+
+def _hmm_kde(data, label, selection, x_range):
+	import scipy.stats
+	try:
+		kde0 = scipy.stats.gaussian_kde(data[~selection][label])
+		kde1 = scipy.stats.gaussian_kde(data[selection][label])
+	except TypeError:
+		kde0 = scipy.stats.gaussian_kde(data[~selection][label].cat.codes)
+		kde1 = scipy.stats.gaussian_kde(data[selection][label].cat.codes)
+	except ValueError:
+		if selection.all():
+			kde0 = lambda z: numpy.zeros_like(z)
+			kde1 = scipy.stats.gaussian_kde(data[label])
+		elif (~selection).all():
+			kde0 = scipy.stats.gaussian_kde(data[label])
+			kde1 = lambda z: numpy.zeros_like(z)
+	x_fill = numpy.linspace(*x_range, 200)
+	y_0 = kde0(x_fill)
+	y_1 = kde1(x_fill)
+	topline = max(y_0.max(), y_1.max())
+	y_range_kde = (-0.07*topline, 1.07*topline)
+	return x_fill, y_0, y_1, y_range_kde
+
+def _hmm_cell_shapes(n, box, refpoint, row, col, y_axis, x_axis):
+	x = x_axis['bin_index'].centers
+	y = y_axis['bin_index'].centers
+	shapes = []
+	if box is not None:
+		shapes.extend(_splom_part_boxes(
+			box, n,
+			x, col, x_axis['tickvals'], x_axis['ticktext'], x_axis['range'],
+			y, row, y_axis['tickvals'], y_axis['ticktext'], y_axis['range'],
+			background_opacity=0.05,
+		))
+	if refpoint is not None:
+		shapes.extend(_splom_part_ref_point(
+			n,
+			x, x_axis['range'], x_axis['tickvals'], x_axis['ticktext'], refpoint.get(col, None),
+			y, y_axis['range'], y_axis['tickvals'], y_axis['ticktext'], refpoint.get(row, None),
+		))
+	return shapes
+
 def new_hmm_figure(
 		scope,
 		data,
@@ -1507,8 +1766,23 @@ def new_hmm_figure(
 		show_points_frac=0.1,
 		marker_size=5,
 		with_hover=True,
+		bin_cache=None,
 ):
-	import datashader as ds  # optional dependency
+	"""
+	Create a new heat map matrix figure.
+
+	The points in each heat map are binned by the precomputed bin
+	indexes of the row and column dimensions, which are kept in
+	`bin_cache` so that later selection updates only need to count
+	the selected points in each bin.
+
+	Args:
+		bin_cache (dict, optional):
+			A cache of bin indexes for `data`.  Pass the same dict to
+			`update_hmm_figure` to reuse the bin indexes.
+	"""
+	if bin_cache is None:
+		bin_cache = {}
 
 	if unselected_color is None:
 		unselected_color = colors.DEFAULT_BASE_COLOR_RGB
@@ -1574,10 +1848,6 @@ def new_hmm_figure(
 	if figure_class is not None:
 		fig = figure_class(fig)
 
-	experiment_name = "Experiment"
-	if data.index.name:
-		experiment_name = data.index.name
-
 	if selection is None:
 		selection = pandas.Series(True, index=data.index)
 
@@ -1596,35 +1866,15 @@ def new_hmm_figure(
 		for colnum, col in enumerate(cols, start=1):
 			n += 1
 
-			# x = perturb_categorical_df(data, col, suffix="numberize")
-			# y = perturb_categorical_df(data, row, suffix="numberize")
-			x_points = perturb_categorical_df(data, col)
-			y_points = perturb_categorical_df(data, row)
-			x_ticktext, x_tickvals, x_range = axis_info(data[col], range_padding=0.25, epsilon=0.25)
-			y_ticktext, y_tickvals, y_range = axis_info(data[row], range_padding=0.25, epsilon=0.25)
+			x_axis = _hmm_axis(scope, data, col, bin_cache)
+			y_axis = _hmm_axis(scope, data, row, bin_cache)
+			x_ticktext, x_tickvals, x_range = x_axis['ticktext'], x_axis['tickvals'], x_axis['range']
+			y_ticktext, y_tickvals, y_range = y_axis['ticktext'], y_axis['tickvals'], y_axis['range']
 
 			if row == col:
 				extra_y_ax += 1
 
-				import scipy.stats
-				try:
-					kde0 = scipy.stats.gaussian_kde(data[~selection][row])
-					kde1 = scipy.stats.gaussian_kde(data[selection][row])
-				except TypeError:
-					kde0 = scipy.stats.gaussian_kde(data[~selection][row].cat.codes)
-					kde1 = scipy.stats.gaussian_kde(data[selection][row].cat.codes)
-				except ValueError:
-					if selection.all():
-						kde0 = lambda z: numpy.zeros_like(z)
-						kde1 = scipy.stats.gaussian_kde(data[row])
-					elif (~selection).all():
-						kde0 = scipy.stats.gaussian_kde(data[row])
-						kde1 = lambda z: numpy.zeros_like(z)
-				x_fill = numpy.linspace(*x_range, 200)
-				y_0 = kde0(x_fill)
-				y_1 = kde1(x_fill)
-				topline = max(y_0.max(), y_1.max())
-				y_range_kde = (-0.07*topline, 1.07*topline)
+				x_fill, y_0, y_1, y_range_kde = _hmm_kde(data, row, selection, x_range)
 
 				layout_updates = {}
 				layout_updates[f'yaxis{extra_y_ax}'] = dict(
@@ -1670,30 +1920,16 @@ def new_hmm_figure(
 
 			else:
 
-				x_bins, x_range_ = _get_bins_and_range(x_ticktext, col, x_range, scope)
-				y_bins, y_range_ = _get_bins_and_range(y_ticktext, row, y_range, scope)
-
-				# saved_bins[(rownum, colnum)] = (x_bins, x_range_, y_bins, y_range_)
-				cvs = ds.Canvas(plot_width=x_bins, plot_height=y_bins, x_range=x_range_, y_range=y_range_)
-
-				_col = f"_{col}_perturb" if f"_{col}_perturb" in data.columns else col
-				_row = f"_{row}_perturb" if f"_{row}_perturb" in data.columns else row
-
-				agg1 = cvs.points(data[selection], _col, _row)
-				agg0 = cvs.points(data[~selection], _col, _row)
+				agg1_arr, agg0_arr = _hmm_cell_counts(row, col, y_axis, x_axis, selection, bin_cache)
 
 				if x_ticktext is not None:
-					x_arr = data[col].to_numpy().astype('U')
 					x_hovertag = "%{meta[2]}"
 				else:
-					x_arr = None
 					x_hovertag = "%{x:.3s}"
 
 				if y_ticktext is not None:
-					y_arr = data[row].to_numpy().astype('U')
 					y_hovertag = "%{meta[3]}" if x_hovertag=="%{meta[2]}" else "%{meta[2]}"
 				else:
-					y_arr = None
 					y_hovertag = "%{y:.3s}"
 				if with_hover:
 					hovertemplate = (
@@ -1706,38 +1942,12 @@ def new_hmm_figure(
 						f"<b>{scope.shortname(col)}</b>: {{x}}<br>" +
 						f"<b>{scope.shortname(row)}</b>: {{y}}"
 					)
-				agg0_arr = numpy.asanyarray(agg0)
-				agg1_arr = numpy.asanyarray(agg1)
-				wtype_def = [
-					('ns', agg1_arr.dtype),
-					('nu', agg0_arr.dtype),
-				]
-				if x_arr is not None:
-					wtype_def.append(
-						('x', x_arr.dtype)
-					)
-				if y_arr is not None:
-					wtype_def.append(
-						('y', y_arr.dtype)
-					)
-				wtype = numpy.dtype(wtype_def)
 				if with_hover:
-					meta = numpy.empty(agg0_arr.shape, dtype=wtype)
-					meta['ns'] = agg1_arr
-					meta['nu'] = agg0_arr
-					if x_ticktext is not None:
-						meta[:,1::2]['x']=x_ticktext
-					if y_ticktext is not None:
-						meta[1::2,:]['y']=numpy.asarray(y_ticktext)[:,None]
+					meta = _hmm_hover_meta(agg1_arr, agg0_arr, x_ticktext, y_ticktext)
 				else:
 					meta = None
-				y_label, x_label = agg0.dims[0], agg0.dims[1]
-				# np.datetime64 is not handled correctly by go.Heatmap
-				for ax in [x_label, y_label]:
-					if numpy.issubdtype(agg0.coords[ax].dtype, numpy.datetime64):
-						agg0.coords[ax] = agg0.coords[ax].astype(str)
-				x = agg0.coords[x_label]
-				y = agg0.coords[y_label]
+				x = x_axis['bin_index'].centers
+				y = y_axis['bin_index'].centers
 
 				if not emph_selected:
 					fig.add_trace(
@@ -1755,13 +1965,11 @@ def new_hmm_figure(
 					)
 				else:
 					zmax = max(numpy.percentile(agg0_arr, 98), numpy.percentile(agg1_arr, 98))
-					agg0_arr = agg0_arr.astype(numpy.float32)
-					agg0_arr[agg0_arr==0] = numpy.nan
 					fig.add_trace(
 						go.Heatmap(
 							x=x,
 							y=y,
-							z=agg0_arr,
+							z=_hmm_heatmap_z(agg0_arr),
 							showlegend=False,
 							hovertemplate=hovertemplate,
 							meta=meta,
@@ -1773,13 +1981,11 @@ def new_hmm_figure(
 						row=rownum, col=colnum,
 					)
 
-					agg1_arr = agg1_arr.astype(numpy.float32)
-					agg1_arr[agg1_arr == 0] = numpy.nan
 					fig.add_trace(
 						go.Heatmap(
 							x=x,
 							y=y,
-							z=agg1_arr,
+							z=_hmm_heatmap_z(agg1_arr),
 							showlegend=False,
 							hovertemplate=hovertemplate,
 							meta=meta,
@@ -1792,27 +1998,9 @@ def new_hmm_figure(
 					)
 
 					show_points = min(show_points, len(data)*show_points_frac)
-					if n_selected <= show_points:
-						_x_points_selected = x_points[selection]
-						_y_points_selected = y_points[selection]
-					else:
-						_x_points_selected = [None]
-						_y_points_selected = [None]
-
-					if x_ticktext is not None or y_ticktext is not None:
-						hovertemplate_s = (
-								f'<b>{scope.shortname(row)}</b>: %{{meta[1]}}<br>' +
-								f'<b>{scope.shortname(col)}</b>: %{{meta[2]}}' +
-								f'<extra>{experiment_name} %{{meta[0]}}</extra>'
-						)
-						meta_s = data[selection][[row, col]].reset_index().to_numpy()
-					else:
-						hovertemplate_s = (
-								f'<b>{scope.shortname(row)}</b>: %{{y}}<br>' +
-								f'<b>{scope.shortname(col)}</b>: %{{x}}' +
-								f'<extra>{experiment_name} %{{meta}}</extra>'
-						)
-						meta_s = multiindex_to_strings(data[selection].index)
+					_x_points_selected, _y_points_selected, hovertemplate_s, meta_s = _hmm_selected_points(
+						scope, data, selection, n_selected, show_points, row, col, y_axis, x_axis,
+					)
 
 					fig.add_trace(
 						go.Scatter(
@@ -1829,52 +2017,15 @@ def new_hmm_figure(
 						),
 						row=rownum, col=colnum,
 					)
-					fig.update_layout({
-						f"coloraxis{n*2-1}": {
-							'showscale': False,
-							'colorscale': [
-								[0.0, selected_color.rgba(0.0)],
-								[0.5, selected_color.rgba(0.6)],
-								[1.0, selected_color.rgba(1.0)],
-							],
-							'cmax':zmax,
-							'cmin':0,
-						},
-						f"coloraxis{n*2}": {
-							'showscale': False,
-							'colorscale': [
-								[0.0, unselected_color.rgba(0.0)],
-								[0.5, unselected_color.rgba(0.6)],
-								[1.0, unselected_color.rgba(1.0)],
-							],
-							'cmax': zmax,
-							'cmin': 0,
-						},
-					})
+					fig.update_layout(_hmm_coloraxes(n, zmax, selected_color, unselected_color))
 				if on_select is not None:
 					fig.data[-1].on_selection(lambda *args: on_select(col, row, *args))
 				if on_deselect is not None:
 					fig.data[-1].on_deselect(lambda *args: on_deselect(col, row, *args))
 
 
-				if box is not None:
-					shapes = _splom_part_boxes(
-						box, n,
-						x, col, x_tickvals, x_ticktext, x_range,
-						y, row, y_tickvals, y_ticktext, y_range,
-						background_opacity=0.05,
-					)
-					for s in shapes:
-						fig.add_shape(s)
-
-				if refpoint is not None:
-					shapes = _splom_part_ref_point(
-						n,
-						x, x_range, x_tickvals, x_ticktext, refpoint.get(col, None),
-						y, y_range, y_tickvals, y_ticktext, refpoint.get(row, None),
-					)
-					for s in shapes:
-						fig.add_shape(s)
+				for s in _hmm_cell_shapes(n, box, refpoint, row, col, y_axis, x_axis):
+					fig.add_shape(s)
 
 			if colnum == 1:
 				fig.update_yaxes(
@@ -1943,6 +2094,7 @@ def new_hmm_figure(
 		row_titles=row_titles,
 		size=size,
 		refpoint=refpoint,
+		with_hover=with_hover,
 	)
 	fig.update_layout(meta=metadata)
 	return fig
@@ -1958,7 +2110,18 @@ def update_hmm_figure(
 		cols=None,
 		selected_color=None,
 		unselected_color=None,
+		bin_cache=None,
 ):
+	"""
+	Update an existing heat map matrix figure for a new selection.
+
+	Unless the rows or columns change, the figure is patched in place:
+	only the heat map values, hover counts, selected points and shapes
+	are replaced.  Give the same `bin_cache` as used to create the figure
+	to avoid binning the data again.
+	"""
+	if bin_cache is None:
+		bin_cache = {}
 	existing_emph_selected = fig['layout']['meta']['emph_selected']
 	existing_show_points = fig['layout']['meta']['show_points']
 	# saved_bins = fig['layout']['meta']['saved_bins']
@@ -1975,6 +2138,8 @@ def update_hmm_figure(
 			fig['layout']['meta'].get('unselected_color'),
 			default=colors.DEFAULT_BASE_COLOR_RGB,
 		)
+	selected_color = colors.Color(selected_color)
+	unselected_color = colors.Color(unselected_color)
 	if rows is None:
 		rows = existing_rows
 	if cols is None:
@@ -2008,53 +2173,70 @@ def update_hmm_figure(
 			selected_color=selected_color,
 			unselected_color=unselected_color,
 			marker_size=fig['layout']['meta'].get('marker_size', 3),
+			bin_cache=bin_cache,
 		)
 		fig['data'] = new_fig['data']
 		fig['layout'] = new_fig['layout']
 		return fig
 
-	replacement = new_hmm_figure(
-		scope,
-		data,
-		rows=rows,
-		cols=cols,
-		row_titles=fig['layout']['meta']['row_titles'],
-		size=fig['layout']['meta']['size'],
-		selection=selection,
-		box=box,
-		refpoint=fig['layout']['meta']['refpoint'],
-		figure_class=None,
-		on_select=None,
-		on_deselect=None,
-		selected_color=selected_color,
-		unselected_color=unselected_color,
-		emph_selected=existing_emph_selected,
-		show_points=existing_show_points,
-		marker_size=fig['layout']['meta']['marker_size'],
-	)
+	with_hover = fig['layout']['meta'].get('with_hover', True)
+	refpoint = fig['layout']['meta']['refpoint']
+	if selection is None:
+		selection = pandas.Series(True, index=data.index)
+	n_selected = numpy.sum(selection)
 
-	copy_features = {
-		'heatmap': ('name', 'x','y','z','showlegend','hovertemplate','meta','coloraxis','hoverongaps','zmax','zmin'),
-		'scatter': ('name', 'x','y','mode','marker','showlegend','hovertemplate','meta'),
-	}
+	shapes = []
+	n = 0
+	t = 0 # index of the first trace of each subplot
+	extra_y_ax = len(rows) * len(cols)
+	for rownum, row in enumerate(rows, start=1):
+		for colnum, col in enumerate(cols, start=1):
+			n += 1
+			x_axis = _hmm_axis(scope, data, col, bin_cache)
+			y_axis = _hmm_axis(scope, data, row, bin_cache)
 
-	for old_trace, new_trace in zip(fig['data'], replacement['data']):
-		classname = old_trace.__class__.__name__
-		if classname == 'dict':
-			classname = old_trace.get('type', 'NO_TYPE')
-		for attr in copy_features[classname.lower()]:
-			try:
-				replace_attr = getattr(new_trace, attr)
-			except AttributeError:
-				pass
+			if row == col:
+				extra_y_ax += 1
+				x_fill, y_0, y_1, y_range_kde = _hmm_kde(data, row, selection, x_axis['range'])
+				fig['layout'][f'yaxis{extra_y_ax}']['range'] = y_range_kde
+				fig['data'][t+1]['y'] = y_0
+				fig['data'][t+1]['line']['color'] = unselected_color.rgb()
+				fig['data'][t+2]['y'] = y_1
+				fig['data'][t+2]['line']['color'] = selected_color.rgb()
+				t += 3
+				continue
+
+			agg1_arr, agg0_arr = _hmm_cell_counts(row, col, y_axis, x_axis, selection, bin_cache)
+			if with_hover:
+				meta = _hmm_hover_meta(agg1_arr, agg0_arr, x_axis['ticktext'], y_axis['ticktext'])
 			else:
-				if isinstance(old_trace, dict):
-					old_trace[attr] = replace_attr
-				else:
-					setattr(old_trace, attr, replace_attr)
+				meta = None
+
+			if not existing_emph_selected:
+				fig['data'][t]['z'] = _hue_mix(agg1_arr, agg0_arr, selected_color, unselected_color)
+				fig['data'][t]['meta'] = meta
+				t += 1
+			else:
+				zmax = max(numpy.percentile(agg0_arr, 98), numpy.percentile(agg1_arr, 98))
+				for trace, agg_arr in zip(fig['data'][t:t+2], (agg0_arr, agg1_arr)):
+					trace['z'] = _hmm_heatmap_z(agg_arr)
+					trace['zmax'] = zmax
+					trace['meta'] = meta
+				points = fig['data'][t+2]
+				points['x'], points['y'], points['hovertemplate'], points['meta'] = _hmm_selected_points(
+					scope, data, selection, n_selected, existing_show_points, row, col, y_axis, x_axis,
+				)
+				points['marker']['color'] = selected_color.rgb()
+				fig.update_layout(_hmm_coloraxes(n, zmax, selected_color, unselected_color))
+				t += 3
 
-	fig['layout'] = replacement['layout']
+			shapes.extend(_hmm_cell_shapes(n, box, refpoint, row, col, y_axis, x_axis))
 
+	fig['layout']['shapes'] = shapes
+	metadata = dict(fig['layout']['meta'])
+	metadata['selected_color'] = selected_color.rgb()
+	metadata['unselected_color'] = unselected_color.rgb()
+	fig['layout']['meta'] = metadata
 	return fig
 
 
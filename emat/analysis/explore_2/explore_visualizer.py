@@ -1,7 +1,10 @@
 import numpy
 import pandas
+import asyncio
+import hashlib
 import warnings
 import functools
+from concurrent.futures import ThreadPoolExecutor
 from ...viz import colors
 from ...scope.box import GenericBox
 from ...database import Database
@@ -18,6 +21,7 @@ _logger = logging.getLogger('EMAT.widget')
 from .explore_base import DataFrameExplorer
 from ..prim import PrimBox
 from ..cart import CartBox
+from ..contrast import Timer
 from ...exceptions import ScopeError
 
 
@@ -64,6 +68,9 @@ class Visualizer(DataFrameExplorer):
 		db (emat.Database, optional): A database from which to read content.
 	"""
 
+	# seconds to wait for the selection to settle before scoring features
+	_feature_score_debounce = 0.5
+
 	def __init__(
 			self,
 			data,
@@ -109,6 +116,8 @@ class Visualizer(DataFrameExplorer):
 		self._figures_freq = {}
 		self._base_histogram = {}
 		self._categorical_data = {}
+		self._bin_indexes = {}
+		self._hmm_bin_cache = {}
 		self._freeze = False
 		self._two_way = {}
 		self._three_way = {}
@@ -116,6 +125,10 @@ class Visualizer(DataFrameExplorer):
 		self._hmm = {}
 		self._parcoords = {}
 		self._selection_feature_score_fig = None
+		self._feature_score_cache = {}
+		self._feature_score_executor = None
+		self._feature_score_timer = None
+		self._feature_score_future = None
 
 		self._status_txt = widget.HTML(
 			value="<i>Explore Status Not Set</i>",
@@ -188,6 +201,27 @@ class Visualizer(DataFrameExplorer):
 			box = None
 		return box
 
+	def _get_bin_index(self, col, bins=None, labels=None):
+		"""
+		The bin index of a data column, computed once and then reused.
+
+		Args:
+			col (str): The column name.
+			bins (int, optional): The number of histogram bins.
+			labels (Collection, optional): The frequency chart labels.
+
+		Returns:
+			BinIndex
+		"""
+		if col not in self._bin_indexes:
+			if labels is not None:
+				self._bin_indexes[col] = BinIndex.from_labels(self.data[col], labels)
+			else:
+				data_column = self.data[col]
+				edges = numpy.histogram_bin_edges(data_column[data_column.notna()], bins=bins)
+				self._bin_indexes[col] = BinIndex.from_edges(data_column, edges)
+		return self._bin_indexes[col]
+
 	def _create_histogram_figure(self, col, bins=20, *, marker_line_width=None):
 		if col in self._figures_hist:
 			self._update_histogram_figure(col)
@@ -196,6 +230,7 @@ class Visualizer(DataFrameExplorer):
 			box = self.__get_plain_box()
 			fig = new_histogram_figure(
 				selection, self.data[col], bins,
+				bin_index=self._get_bin_index(col, bins=bins),
 				marker_line_width=marker_line_width,
 				on_deselect=lambda *a: self._on_deselect_from_histogram(*a,name=col),
 				on_select=lambda *a: self._on_select_from_histogram(*a,name=col),
@@ -224,6 +259,7 @@ class Visualizer(DataFrameExplorer):
 			box = self.__get_plain_box()
 			fig = new_frequencies_figure(
 				selection, self.data[col], labels,
+				bin_index=self._get_bin_index(col, labels=labels),
 				marker_line_width=marker_line_width,
 				on_deselect=functools.partial(self._on_deselect_from_histogram, name=col),
 				on_select=functools.partial(self._on_select_from_freq, name=col),
@@ -257,6 +293,7 @@ class Visualizer(DataFrameExplorer):
 					self.data[col],
 					box=box,
 					ref_point=self.reference_point(col),
+					bin_index=self._bin_indexes.get(col),
 				)
 			rangestring_input = self._figures_hist[col].children[1]
 			if box is not None:
@@ -276,6 +313,7 @@ class Visualizer(DataFrameExplorer):
 					self.data[col],
 					box=box,
 					ref_point=self.reference_point(col),
+					bin_index=self._bin_indexes.get(col),
 				)
 			rangestring_input = self._figures_freq[col].children[1]
 			if box is not None:
@@ -1050,6 +1088,7 @@ class Visualizer(DataFrameExplorer):
 			show_points=show_points,
 			selected_color=self.active_selection_color(),
 			with_hover=with_hover,
+			bin_cache=self._hmm_bin_cache,
 		)
 
 		return self._hmm[key]
@@ -1071,6 +1110,7 @@ class Visualizer(DataFrameExplorer):
 					self.active_selection(),
 					box,
 					selected_color=self.active_selection_color(),
+					bin_cache=self._hmm_bin_cache,
 				)
 
 	def parcoords(
@@ -1317,51 +1357,82 @@ class Visualizer(DataFrameExplorer):
 			activate=activate,
 		)
 
-	def _compute_selection_feature_scores(self, name=None):
+	def _selection_feature_score_job(self, name=None):
+		"""
+		Snapshot what the feature scores of a selection depend on.
+
+		Returns:
+			tuple: The arguments for `_score_features`, and a key
+				for caching the scores, from a hash of the selection.
+		"""
 		if name is None:
 			name = self.active_selection_name()
+		target = self._selections[name].copy()
+		exclude_parameters = None
 		if self.selection_deftype(name) == 'box':
-			box = self._selection_defs[name]
-			from ..feature_scoring import box_feature_scores
-			try:
-				return box_feature_scores(
-					self.scope,
-					box,
-					self.data,
-					return_type='styled',
-					db=None,
-					random_state=None,
-					cmap='viridis',
-					exclude_measures=True,
-				)
-			except ValueError:
-				return pandas.DataFrame(
-					index=['target'],
-					columns=[],
-					data=None,
-				)
+			thresholds = self._selection_defs[name].thresholds
+			if not set(thresholds.keys()).intersection(self.scope.get_measure_names()):
+				# a box without measures has no feature scores
+				target = None
+			else:
+				exclude_parameters = tuple(thresholds.keys())
+		if target is None:
+			digest = None
 		else:
-			from ..feature_scoring import target_feature_scores
-			target = self._selections[name]
+			mask = target.to_numpy(dtype=bool)
+			digest = hashlib.sha1(numpy.packbits(mask).tobytes()).hexdigest(), mask.size
+		key = (digest, exclude_parameters)
+		return (target, self.data.copy(deep=False), exclude_parameters), key
+
+	def _score_features(self, target, data, exclude_parameters):
+		if target is None:
+			return pandas.DataFrame(
+				index=['target'],
+				columns=[],
+				data=None,
+			)
+		from ..feature_scoring import target_feature_scores
+		try:
 			return target_feature_scores(
 				self.scope,
 				target,
-				self.data,
+				data,
 				return_type='styled',
 				db=None,
 				random_state=None,
 				cmap='viridis',
 				exclude_measures=True,
+				exclude_parameters=exclude_parameters,
+			)
+		except ValueError:
+			if exclude_parameters is None:
+				raise
+			return pandas.DataFrame(
+				index=['target'],
+				columns=[],
+				data=None,
 			)
 
+	def _compute_selection_feature_scores(self, name=None):
+		args, key = self._selection_feature_score_job(name)
+		return self._score_features(*args)
 
-	def selection_feature_scores(self):
+	def _selection_feature_score_values(self, *args):
 		try:
-			scores = self._compute_selection_feature_scores().data.iloc[0]
+			return self._score_features(*args).data.iloc[0]
 		except KeyboardInterrupt:
 			raise
 		except:
-			scores = {}
+			return {}
+
+	def _cached_selection_feature_scores(self, name=None):
+		args, key = self._selection_feature_score_job(name)
+		if key not in self._feature_score_cache:
+			self._feature_score_cache[key] = self._selection_feature_score_values(*args)
+		return self._feature_score_cache[key]
+
+	def selection_feature_scores(self):
+		scores = self._cached_selection_feature_scores()
 		y = self.scope.get_parameter_names(False)
 		x = [scores.get(yi, numpy.nan) for yi in y]
 		fmt = lambda x: x if isinstance(x, str) else "{:.3f}".format(x)
@@ -1392,15 +1463,62 @@ class Visualizer(DataFrameExplorer):
 		fig.data[0].marker.color = 'yellow'
 
 	def _update_selection_feature_score_figure(self):
+		"""
+		Update the feature scores figure for the active selection.
+
+		Scores for a selection seen before are taken from the cache.
+		Otherwise, in an interactive session with a running event loop,
+		the scores are computed in a background thread once the selection
+		has not changed for `_feature_score_debounce` seconds, and any
+		stale pending computation is cancelled.  The figure stays marked
+		as pending until then.  Without an event loop, the scores are
+		computed right away.
+		"""
 		if self._selection_feature_score_fig is None:
 			return
-		fig = self._selection_feature_score_fig
+		if self._feature_score_timer is not None:
+			self._feature_score_timer.cancel()
+			self._feature_score_timer = None
+		if self._feature_score_future is not None:
+			self._feature_score_future.cancel()
+			self._feature_score_future = None
+		args, key = self._selection_feature_score_job()
+		if key in self._feature_score_cache:
+			self._set_selection_feature_score_figure(self._feature_score_cache[key])
+			return
 		try:
-			scores = self._compute_selection_feature_scores().data.iloc[0]
-		except KeyboardInterrupt:
-			raise
-		except:
-			scores = {}
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			loop = None
+		if loop is None:
+			self._feature_score_cache[key] = self._selection_feature_score_values(*args)
+			self._set_selection_feature_score_figure(self._feature_score_cache[key])
+			return
+		self._feature_score_timer = Timer(
+			self._feature_score_debounce,
+			functools.partial(self._submit_selection_feature_scores, loop, args, key),
+		)
+
+	def _submit_selection_feature_scores(self, loop, args, key):
+		self._feature_score_timer = None
+		if self._feature_score_executor is None:
+			self._feature_score_executor = ThreadPoolExecutor(1, thread_name_prefix='emat-feature-scores')
+		future = self._feature_score_executor.submit(self._selection_feature_score_values, *args)
+		self._feature_score_future = future
+		future.add_done_callback(
+			lambda f: loop.call_soon_threadsafe(self._finish_selection_feature_scores, f, key)
+		)
+
+	def _finish_selection_feature_scores(self, future, key):
+		if future.cancelled():
+			return
+		self._feature_score_cache[key] = future.result()
+		if future is self._feature_score_future:
+			self._feature_score_future = None
+			self._set_selection_feature_score_figure(self._feature_score_cache[key])
+
+	def _set_selection_feature_score_figure(self, scores):
+		fig = self._selection_feature_score_fig
 		y = self.scope.get_parameter_names(False)
 		x = [scores.get(yi, numpy.nan) for yi in y]
 		fmt = lambda x: x if isinstance(x, str) else "{:.3f}".format(x)
@@ -453,9 +453,10 @@ class Database(abc.ABC):
                 associated with both the scope and the named design
                 are returned, otherwise all experiments associated
                 with the scope are returned.
-            experiment_id (int, optional): The id of the experiment to
-                retrieve.  If omitted, get all experiments matching the
-                named scope and design.
+            experiment_id (int or Collection[int], optional): The id of
+                the experiment to retrieve, or a collection of ids.  If
+                omitted, get all experiments matching the named scope and
+                design.
             source (int, optional): The source identifier of the
                 experimental outcomes to load.  If not given, but
                 there are only results from a single source in the
@@ -87,6 +87,7 @@ CREATE TABLE IF NOT EXISTS ema_box_measure (
 CREATE TABLE IF NOT EXISTS ema_experiment (
     experiment_id     INTEGER PRIMARY KEY,
     scope_id          INT NOT NULL,
+    experiment_hash   BLOB, -- fingerprint of parameter values, see emat.util.deduplicate.fingerprint_rows
 
     FOREIGN KEY (scope_id) REFERENCES ema_scope(scope_id)
     ON DELETE CASCADE
@@ -150,3 +151,12 @@ CREATE TABLE IF NOT EXISTS ema_experiment_measure (
     PRIMARY KEY (experiment_id, measure_id, measure_run)
 );
 
+
+-- Registry of optional materialized wide tables, one row per cached scope
+CREATE TABLE IF NOT EXISTS ema_wide_cache (
+    scope_id          INTEGER PRIMARY KEY,
+    parameter_table   TEXT NOT NULL,
+    measure_table     TEXT NOT NULL,
+
+    FOREIGN KEY (scope_id) REFERENCES ema_scope(scope_id) ON DELETE CASCADE
+);
@@ -141,6 +141,147 @@ INSERT_EXPERIMENT_WITH_ID = '''
 '''
 
 
+INSERT_EXPERIMENT_WITH_ID_AND_HASH = '''
+    INSERT INTO ema_experiment ( experiment_id, scope_id, experiment_hash )
+        VALUES ( ?1, ?2, ?3 )
+'''
+
+GET_NEW_EXPERIMENT_ID = '''
+    SELECT IFNULL(MAX(experiment_id), 0)+1
+        FROM ema_experiment
+'''
+
+GET_SCOPE_ID = '''
+    SELECT scope_id FROM ema_scope WHERE name = ?
+'''
+
+GET_SCOPE_XL_IDS = '''
+    SELECT 
+        ema_parameter.name,
+        ema_parameter.parameter_id
+    FROM 
+        ema_parameter 
+        JOIN ema_scope_parameter sv 
+            ON (ema_parameter.parameter_id = sv.parameter_id)
+        JOIN ema_scope s 
+            ON (sv.scope_id = s.scope_id)
+    WHERE 
+        s.name = ?
+'''
+
+GET_EXPERIMENT_IDS_WITHOUT_HASH = '''
+    SELECT 
+        experiment_id
+    FROM 
+        ema_experiment
+    WHERE 
+        scope_id = ?1
+        AND experiment_hash IS NULL
+'''
+
+GET_EX_XL_WITHOUT_HASH = '''
+    SELECT 
+        eep.experiment_id, 
+        ep.name, 
+        parameter_value
+    FROM 
+        ema_experiment_parameter eep
+        JOIN ema_parameter ep
+            ON eep.parameter_id = ep.parameter_id
+        JOIN ema_experiment ee
+            ON eep.experiment_id = ee.experiment_id
+    WHERE 
+        ee.scope_id = ?1
+        AND ee.experiment_hash IS NULL
+'''
+
+SET_EXPERIMENT_HASH = '''
+    UPDATE 
+        ema_experiment 
+    SET 
+        experiment_hash = ?2 
+    WHERE 
+        experiment_id = ?1
+'''
+
+CLEAR_EXPERIMENT_HASHES = '''
+    UPDATE 
+        ema_experiment 
+    SET 
+        experiment_hash = NULL 
+    WHERE 
+        scope_id IN (SELECT scope_id FROM ema_scope WHERE name = ?1)
+'''
+
+CREATE_TEMP_STAGING_EX_HASH = '''
+    CREATE TEMP TABLE IF NOT EXISTS ema_staging_experiment_hash (
+        row_n             INT,
+        experiment_hash   BLOB
+    )
+'''
+
+INSERT_TEMP_STAGING_EX_HASH = '''
+    INSERT INTO temp.ema_staging_experiment_hash ( row_n, experiment_hash )
+        VALUES ( ?1, ?2 )
+'''
+
+GET_EXPERIMENT_IDS_BY_TEMP_STAGING_HASH = '''
+    SELECT 
+        s.row_n, 
+        MIN(ee.experiment_id),
+        COUNT(ee.experiment_id)
+    FROM 
+        temp.ema_staging_experiment_hash s
+        JOIN ema_experiment ee
+            ON ee.experiment_hash = s.experiment_hash
+    WHERE 
+        ee.scope_id = ?1
+    GROUP BY 
+        s.row_n
+'''
+
+CLEAR_TEMP_STAGING_EX_HASH = '''
+    DELETE FROM temp.ema_staging_experiment_hash
+'''
+
+CREATE_TEMP_STAGING_EX_VALUE = '''
+    CREATE TEMP TABLE IF NOT EXISTS ema_staging_experiment_value (
+        row_n             INT,
+        parameter_id      INT,
+        parameter_value
+    )
+'''
+
+INSERT_TEMP_STAGING_EX_VALUE = '''
+    INSERT INTO temp.ema_staging_experiment_value ( row_n, parameter_id, parameter_value )
+        VALUES ( ?1, ?2, ?3 )
+'''
+
+GET_EXPERIMENT_IDS_BY_TEMP_STAGING_VALUE = '''
+    SELECT 
+        s.row_n, 
+        eep.experiment_id
+    FROM 
+        temp.ema_staging_experiment_value s
+        JOIN ema_experiment_parameter eep
+            ON eep.parameter_id = s.parameter_id
+            AND eep.parameter_value = s.parameter_value
+        JOIN ema_experiment ee
+            ON eep.experiment_id = ee.experiment_id
+    WHERE 
+        ee.scope_id = ?1
+    GROUP BY 
+        s.row_n, 
+        eep.experiment_id
+    HAVING 
+        COUNT(*) = ?2
+'''
+
+CLEAR_TEMP_STAGING_EX_VALUE = '''
+    DELETE FROM temp.ema_staging_experiment_value
+'''
+
+
 INSERT_DESIGN_EXPERIMENT = '''
     INSERT OR IGNORE INTO ema_design_experiment (experiment_id, design_id)
         SELECT ?3, d.design_id
@@ -214,6 +355,12 @@ INVALIDATE_RUN_ID = '''
 
 
 
+INSERT_EX_XL_BY_ID = '''
+    INSERT INTO ema_experiment_parameter( experiment_id, parameter_id, parameter_value )
+        VALUES ( ?1, ?2, ?3 )
+'''
+
+
 INSERT_EX_XL = (
     '''INSERT INTO ema_experiment_parameter( experiment_id, parameter_id, parameter_value )
         SELECT ?, ema_parameter.parameter_id, ? FROM
@@ -352,6 +499,84 @@ _DEBUG_INSERT_EX_M = '''
 '''
 
 
+INSERT_EX_M_BULK = '''
+    REPLACE INTO ema_experiment_measure ( 
+        experiment_id, 
+        measure_id, 
+        measure_value, 
+        measure_run )
+    SELECT 
+        ?1, 
+        ema_measure.measure_id, 
+        ?3, 
+        eer.run_rowid
+    FROM 
+        ema_measure 
+        JOIN ema_experiment_run eer
+            ON eer.run_id = ?4
+    WHERE ema_measure.name = ?2
+'''
+
+CREATE_TEMP_STAGING_EX_M = '''
+    CREATE TEMP TABLE IF NOT EXISTS ema_staging_experiment_measure (
+        experiment_id     INT,
+        measure_name      TEXT,
+        measure_value     NUMERIC,
+        measure_run       UUID
+    )
+'''
+
+INSERT_TEMP_STAGING_EX_M = '''
+    INSERT INTO temp.ema_staging_experiment_measure ( 
+        experiment_id, 
+        measure_name, 
+        measure_value, 
+        measure_run )
+    VALUES (?1, ?2, ?3, ?4)
+'''
+
+MERGE_TEMP_STAGING_EX_M = '''
+    REPLACE INTO ema_experiment_measure ( 
+        experiment_id, 
+        measure_id, 
+        measure_value, 
+        measure_run )
+    SELECT 
+        s.experiment_id, 
+        ema_measure.measure_id, 
+        s.measure_value, 
+        eer.run_rowid
+    FROM 
+        temp.ema_staging_experiment_measure s
+        JOIN ema_measure 
+            ON ema_measure.name = s.measure_name
+        JOIN ema_experiment_run eer
+            ON eer.run_id = s.measure_run
+'''
+
+CLEAR_TEMP_STAGING_EX_M = '''
+    DELETE FROM temp.ema_staging_experiment_measure
+'''
+
+NEW_EXPERIMENT_RUN_BULK = '''
+    INSERT OR IGNORE INTO 
+        ema_experiment_run ( 
+            run_id, 
+            experiment_id, 
+            run_status, 
+            run_valid, 
+            run_location, 
+            run_source ) 
+    VALUES ( 
+        ?1, 
+        ?2, 
+        'init', 
+        1, 
+        NULL, 
+        ?3 )
+'''
+
+
 GET_EXPERIMENT_PARAMETERS_AND_MEASURES = '''
     SELECT eep.experiment_id, ep.name, parameter_value
         FROM ema_parameter ep
@@ -434,6 +659,199 @@ GET_EXPERIMENT_MEASURES_MASTER = '''
 
 
 
+CREATE_WIDE_CACHE = '''
+    CREATE TABLE IF NOT EXISTS ema_wide_cache (
+        scope_id          INTEGER PRIMARY KEY,
+        parameter_table   TEXT NOT NULL,
+        measure_table     TEXT NOT NULL,
+
+        FOREIGN KEY (scope_id) REFERENCES ema_scope(scope_id) ON DELETE CASCADE
+    )
+'''
+
+GET_WIDE_CACHE = '''
+    SELECT 
+        wc.parameter_table, 
+        wc.measure_table
+    FROM 
+        ema_wide_cache wc
+        JOIN ema_scope s 
+            ON wc.scope_id = s.scope_id
+    WHERE 
+        s.name = ?1
+'''
+
+INSERT_WIDE_CACHE = '''
+    INSERT OR REPLACE INTO ema_wide_cache ( scope_id, parameter_table, measure_table )
+        SELECT ema_scope.scope_id, ?2, ?3
+        FROM ema_scope WHERE ema_scope.name = ?1
+'''
+
+DELETE_WIDE_CACHE = '''
+    DELETE FROM ema_wide_cache 
+    WHERE scope_id IN (SELECT scope_id FROM ema_scope WHERE name = ?1)
+'''
+
+CREATE_WIDE_PARAMETER_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {wide_table} (
+        experiment_id     INTEGER PRIMARY KEY,
+
+        FOREIGN KEY (experiment_id) REFERENCES ema_experiment(experiment_id) ON DELETE CASCADE
+    )
+'''
+
+CREATE_WIDE_MEASURE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS {wide_table} (
+        run_rowid         INTEGER PRIMARY KEY,
+        experiment_id     INT NOT NULL,
+
+        FOREIGN KEY (run_rowid) REFERENCES ema_experiment_run(run_rowid) ON DELETE CASCADE,
+        FOREIGN KEY (experiment_id) REFERENCES ema_experiment(experiment_id) ON DELETE CASCADE
+    )
+'''
+
+POPULATE_WIDE_PARAMETER_ROWS = '''
+    INSERT OR IGNORE INTO {wide_table} ( experiment_id )
+    SELECT DISTINCT 
+        eep.experiment_id
+    FROM 
+        ema_experiment_parameter eep
+        JOIN ema_experiment ee
+            ON eep.experiment_id = ee.experiment_id
+        JOIN ema_scope s 
+            ON ee.scope_id = s.scope_id
+    WHERE 
+        s.name = ?1
+'''
+
+POPULATE_WIDE_PARAMETER_COLUMN = '''
+    UPDATE {wide_table}
+    SET {wide_column} = (
+        SELECT eep.parameter_value
+        FROM ema_experiment_parameter eep
+        JOIN ema_parameter ep 
+            ON eep.parameter_id = ep.parameter_id
+        WHERE eep.experiment_id = {wide_table}.experiment_id
+        AND ep.name = ?1
+    )
+'''
+
+POPULATE_WIDE_MEASURE_ROWS = '''
+    INSERT OR IGNORE INTO {wide_table} ( run_rowid, experiment_id )
+    SELECT DISTINCT 
+        eem.measure_run, 
+        eem.experiment_id
+    FROM 
+        ema_experiment_measure eem
+        JOIN ema_experiment ee
+            ON eem.experiment_id = ee.experiment_id
+        JOIN ema_scope s 
+            ON ee.scope_id = s.scope_id
+    WHERE 
+        s.name = ?1
+'''
+
+POPULATE_WIDE_MEASURE_COLUMN = '''
+    UPDATE {wide_table}
+    SET {wide_column} = (
+        SELECT eem.measure_value
+        FROM ema_experiment_measure eem
+        JOIN ema_measure em 
+            ON eem.measure_id = em.measure_id
+        WHERE eem.experiment_id = {wide_table}.experiment_id
+        AND eem.measure_run = {wide_table}.run_rowid
+        AND em.name = ?1
+    )
+'''
+
+UPSERT_WIDE_PARAMETERS = '''
+    INSERT OR REPLACE INTO {wide_table} ( experiment_id, {wide_columns} )
+    VALUES ( {wide_bindings} )
+'''
+
+UPSERT_WIDE_MEASURES = '''
+    INSERT INTO {wide_table} ( run_rowid, experiment_id, {wide_columns} )
+    SELECT 
+        eer.run_rowid, 
+        ?2, 
+        {wide_bindings}
+    FROM 
+        ema_experiment_run eer
+    WHERE 
+        eer.run_id = ?1
+    ON CONFLICT ( run_rowid ) DO UPDATE SET {wide_updates}
+'''
+
+GET_WIDE_PARAMETERS = '''
+    SELECT 
+        eep.*
+    FROM 
+        {wide_table} eep
+'''
+
+GET_WIDE_PARAMETERS_IN_DESIGN = '''
+    SELECT 
+        eep.*
+    FROM 
+        {wide_table} eep
+        JOIN ema_design_experiment ede 
+            ON eep.experiment_id = ede.experiment_id
+        JOIN ema_design ed 
+            ON ede.design_id = ed.design_id
+    WHERE 
+        ed.design = @design_name
+'''
+
+GET_WIDE_PARAMETERS_IDS_IN = '''
+    SELECT 
+        eep.*
+    FROM 
+        {wide_table} eep
+    WHERE 
+        eep.experiment_id in (???)
+'''
+
+GET_WIDE_MEASURES_MASTER = '''
+    SELECT DISTINCT 
+        eem.experiment_id,
+        runs.run_id,
+        {wide_columns}
+    FROM 
+        {wide_table} eem 
+        JOIN ema_design_experiment ede 
+            ON eem.experiment_id = ede.experiment_id
+        JOIN ema_design ed 
+            ON ed.design_id = ede.design_id
+        JOIN /* most recent valid run with results matching target source */ (
+            SELECT
+                *,
+                max(run_timestamp)
+            FROM
+                ema_experiment_run
+            WHERE
+                (
+                    run_rowid IN (
+                        SELECT DISTINCT measure_run 
+                        FROM ema_experiment_measure eem3 
+                        WHERE eem3.measure_value IS NOT NULL
+                    )
+                )
+                AND run_valid = 1
+                AND run_source = @measure_source
+            GROUP BY
+                experiment_id, run_source
+        ) /* end most recent */ runs 
+            ON runs.run_rowid = eem.run_rowid
+        WHERE 
+            NOT ( {wide_all_null} )
+            AND ed.design = @design_name 
+            AND eem.experiment_id = @experiment_id
+            AND run_source = @measure_source
+            AND run_valid = 1
+'''
+
+
+
 GET_EX_XLM_ALL = (
     '''
     SELECT 
@@ -870,6 +1288,18 @@ UPDATE_DATABASE_ema_experiment_run_ADD_run_source = (
     ''',
 )
 
+UPDATE_DATABASE_ema_experiment_ADD_experiment_hash = (
+    '''
+        ALTER TABLE ema_experiment
+        ADD COLUMN experiment_hash BLOB;
+    ''',
+)
+
+CREATE_INDEX_EXPERIMENT_HASH = '''
+    CREATE INDEX IF NOT EXISTS ema_experiment_hash_index
+    ON ema_experiment(scope_id, experiment_hash);
+'''
+
 
 from ... import __version__
 import numpy as np
@@ -5,6 +5,7 @@
 """
 
 import os
+import itertools
 from typing import List
 import sqlite3
 import atexit
@@ -17,7 +18,7 @@ import re
 
 from . import sql_queries as sq
 from ..database import Database
-from ...util.deduplicate import reindex_duplicates
+from ...util.deduplicate import fingerprint_rows
 from ...exceptions import DatabaseVersionWarning, DatabaseVersionError, DatabaseError, ReadOnlyDatabaseError
 
 from ...util.loggers import get_module_logger
@@ -49,6 +50,11 @@ def _to_uuid(b):
 
 
 
+def _quote_identifier(name):
+    """Quote a name for use as an SQLite identifier."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
 class SQLiteDB(Database):
     """
     SQLite implementation of the :class:`Database` abstract base class.
@@ -106,6 +112,7 @@ class SQLiteDB(Database):
             initialize = True
         # in order:
         self.modules = {}
+        self.clear_scope_cache()
         if initialize == 'skip':
             self.conn = self.__create(
                 [],
@@ -170,6 +177,11 @@ class SQLiteDB(Database):
                     self.update_database(sq.UPDATE_DATABASE_ema_experiment_measure_ADD_measure_run)
                 self.__apply_sql_script(self.conn, 'emat_db_rebuild.sql')
 
+            if 'experiment_hash' not in self._raw_query(table='ema_experiment')['name'].to_numpy():
+                self.update_database(sq.UPDATE_DATABASE_ema_experiment_ADD_experiment_hash, on_error='raise')
+            with self.conn:
+                self.conn.execute(sq.CREATE_INDEX_EXPERIMENT_HASH)
+
             try:
                 self.update_database_for_run_ids()
             except:
@@ -456,6 +468,7 @@ class SQLiteDB(Database):
         """
         if self.readonly:
             raise ReadOnlyDatabaseError
+        self._invalidate_scope_cache(scope_name)
         with self.conn:
             cur = self.conn.cursor()
 
@@ -494,6 +507,7 @@ class SQLiteDB(Database):
         from ...scope.scope import Scope
         assert isinstance(scope, Scope)
         scope_name = scope.name
+        self._invalidate_scope_cache(scope_name)
 
         with self.conn:
             cur = self.conn.cursor()
@@ -509,6 +523,8 @@ class SQLiteDB(Database):
                 {'scope_name':scope_name, 'scope_pickle':blob},
             )
 
+            prior_xl = set(i[0] for i in cur.execute(sq.GET_SCOPE_XL, [scope_name]))
+
             for xl in scope.get_uncertainties()+scope.get_levers():
                 cur.execute(
                     sq.CONDITIONAL_INSERT_XL,
@@ -529,6 +545,13 @@ class SQLiteDB(Database):
                     [scope_name, m.name],
                 )
 
+            # parameter fingerprints are stale if the parameters have changed
+            if (
+                    prior_xl != set(i[0] for i in cur.execute(sq.GET_SCOPE_XL, [scope_name]))
+                    and self._has_experiment_hash_column(cur)
+            ):
+                cur.execute(sq.CLEAR_EXPERIMENT_HASHES, [scope_name])
+
 
     @copydoc(Database.store_scope)
     def store_scope(self, scope):
@@ -549,6 +572,15 @@ class SQLiteDB(Database):
         """
         Load the pickled scope from the database.
 
+        Loaded scopes are cached on this database object, and
+        the cached object is returned as long as the stored scope
+        is unchanged, so repeated calls do not need to unpickle it
+        again.  The same Scope object is shared by every caller
+        and should be treated as read-only: to change it, modify
+        a copy (from `Scope.duplicate` or `copy.deepcopy`), and
+        store the changes with `update_scope` if they should
+        persist.
+
         Args:
             scope_name (str, optional):
                 The name of the scope to load.  If not
@@ -582,17 +614,92 @@ class SQLiteDB(Database):
             raise KeyError(f"scope '{scope_name}' not found")
         if blob is None:
             return blob
+        cached = self._scope_cache.get(scope_name)
+        if cached is not None and cached[0] == blob:
+            self._scope_cache_stats['scope_hits'] += 1
+            return cached[1]
+        self._scope_cache_stats['scope_misses'] += 1
         import gzip, cloudpickle
         try:
-            return cloudpickle.loads(gzip.decompress(blob))
+            scope = cloudpickle.loads(gzip.decompress(blob))
         except ModuleNotFoundError as err:
             if "ema_workbench" in err.msg:
                 import sys
                 from ... import workbench
                 sys.modules['ema_workbench'] = workbench
-                return cloudpickle.loads(gzip.decompress(blob))
+                scope = cloudpickle.loads(gzip.decompress(blob))
             else:
                 raise
+        self._scope_cache[scope_name] = (blob, scope)
+        return scope
+
+    def scope_cache_info(self):
+        """
+        Report on the effectiveness of the scope cache.
+
+        Returns:
+            dict: Counts of cache hits and misses for scope
+                objects (from `read_scope`) and for scope parameter
+                and measure name lists (from `read_uncertainties`,
+                `read_levers`, `read_constants` and `read_measures`),
+                plus the number of scopes currently cached.
+        """
+        return dict(
+            **self._scope_cache_stats,
+            currsize=len(set(self._scope_cache) | set(self._scope_names_cache)),
+        )
+
+    def clear_scope_cache(self):
+        """
+        Clear the scope cache and reset its hit and miss counters.
+
+        The cache is invalidated automatically when a scope is stored,
+        updated or deleted through this database object, but not when
+        another connection changes the scope parameters or measures.
+        """
+        self._scope_cache = {}
+        self._scope_names_cache = {}
+        self._scope_cache_stats = dict(
+            scope_hits=0,
+            scope_misses=0,
+            names_hits=0,
+            names_misses=0,
+        )
+
+    def _invalidate_scope_cache(self, scope_name):
+        self._scope_cache.pop(scope_name, None)
+        self._scope_names_cache.pop(scope_name, None)
+
+    def _read_scope_names_by_kind(self, scope_name, kind):
+        """
+        Read a list of parameter or measure names from the scope cache.
+
+        Args:
+            scope_name (str): The scope name.
+            kind (str): One of 'uncertainties', 'levers', 'constants'
+                or 'measures'.
+
+        Returns:
+            list
+        """
+        scope_name = self._validate_scope(scope_name, None)
+        names = self._scope_names_cache.get(scope_name)
+        if names is None:
+            self._scope_cache_stats['names_misses'] += 1
+            cur = self.conn.cursor()
+            names = {
+                kind_: [i[0] for i in cur.execute(query, [scope_name]).fetchall()]
+                for kind_, query in (
+                    ('uncertainties', sq.GET_SCOPE_X),
+                    ('levers', sq.GET_SCOPE_L),
+                    ('constants', sq.GET_SCOPE_C),
+                    ('measures', sq.GET_SCOPE_M),
+                )
+            }
+            self._scope_names_cache[scope_name] = names
+        else:
+            self._scope_cache_stats['names_hits'] += 1
+        return list(names[kind])
 
 
     @copydoc(Database.write_metamodel)
@@ -709,8 +816,10 @@ class SQLiteDB(Database):
     def delete_scope(self, scope_name):
         if self.readonly:
             raise ReadOnlyDatabaseError
+        self._invalidate_scope_cache(scope_name)
         with self.conn:
             cur = self.conn.cursor()
+            self._drop_wide_cache(cur, scope_name)
             cur.execute(sq.DELETE_SCOPE, [scope_name])
 
     def write_experiment_parameters(
@@ -781,14 +890,18 @@ class SQLiteDB(Database):
 
         with self.conn:
             scope_name = self._validate_scope(scope_name, 'design_name')
-            # local cursor because we'll depend on lastrowid
             fcur = self.conn.cursor()
 
             # get list of experiment variables - except "one"
-            scp_xl = fcur.execute(sq.GET_SCOPE_XL, [scope_name]).fetchall()
+            scp_xl = fcur.execute(sq.GET_SCOPE_XL_IDS, [scope_name]).fetchall()
             if len(scp_xl) == 0:
                 raise UserWarning('named scope {0} not found - experiments will \
                                       not be recorded'.format(scope_name))
+            scope_id = fcur.execute(sq.GET_SCOPE_ID, [scope_name]).fetchall()[0][0]
+            for xl_name, _ in scp_xl:
+                if xl_name not in xl_df.columns:
+                    _logger.error(f'Experiment definition missing {xl_name} variable')
+                    raise KeyError(xl_name)
 
             for k in design_name_map:
                 try:
@@ -797,64 +910,403 @@ class SQLiteDB(Database):
                     raise DatabaseError from err
 
             ### split experiments into novel and duplicate ###
-            # first join to existing experiments
-            existing_experiments = self.read_experiment_parameters(scope_name, None)
-            combined_experiments = pd.concat([
-                existing_experiments,
-                xl_df.set_index(np.full(len(xl_df), -1, dtype=int)),
-            ])
-            combined_experiments_reindexed = reindex_duplicates(combined_experiments)
-            xl_df_ = combined_experiments_reindexed.iloc[-len(xl_df):]
-            novel_flag = xl_df_.index.isin([-1])
-            novel_experiments = xl_df.loc[novel_flag]
-            duplicate_experiments = xl_df_.loc[~novel_flag]
-
-            ex_ids = []
-
-            for ex_id_as_input, row in novel_experiments.iterrows():
-                if force_ids:
-                    # create new experiment and set id
-                    fcur.execute(sq.INSERT_EXPERIMENT_WITH_ID, [scope_name, ex_id_as_input])
-                    ex_id = ex_id_as_input
-                else:
-                    # create new experiment and get id
-                    fcur.execute(sq.INSERT_EXPERIMENT, [scope_name])
-                    ex_id = fcur.lastrowid
-                # set each from experiment defitinion
-                for xl in scp_xl:
-                    try:
-                        value = row[xl[0]]
-                        fcur.execute(sq.INSERT_EX_XL, [ex_id, value, xl[0]])
-                    except TypeError:
-                        _logger.error(f'Experiment definition missing {xl[0]} variable')
-                        raise
+            # match parameter fingerprints against existing experiments
+            scp_xl_names = [xl_name for xl_name, _ in scp_xl]
+            if self._has_experiment_hash_column(fcur):
+                self._update_experiment_hashes(fcur, scope_id, scp_xl_names)
+                hashes = fingerprint_rows(xl_df, scp_xl_names)
+                ex_ids = self._match_experiment_hashes(fcur, scope_id, hashes)
+            else:
+                # opened without `update`, from before parameter fingerprints
+                hashes = None
+                ex_ids = self._match_experiment_values(
+                    fcur, scope_id, xl_df[scp_xl_names], dict(scp_xl), unique=False,
+                )
+            novel_flag = (ex_ids < 0)
+            ex_ids_as_input = xl_df.index
+
+            if force_ids:
+                for ex_id, ex_id_as_input in zip(ex_ids[~novel_flag], ex_ids_as_input[~novel_flag]):
+                    if ex_id != ex_id_as_input:
+                        raise ValueError(f"cannot change experiment id {ex_id_as_input} to {ex_id}")
+                ex_ids[novel_flag] = ex_ids_as_input[novel_flag]
+            else:
+                first_new_id = fcur.execute(sq.GET_NEW_EXPERIMENT_ID).fetchall()[0][0]
+                ex_ids[novel_flag] = np.arange(first_new_id, first_new_id + novel_flag.sum())
+            novel_ex_ids = ex_ids[novel_flag].tolist()
+
+            # create new experiments and set values from experiment definitions
+            if hashes is None:
+                fcur.executemany(
+                    sq.INSERT_EXPERIMENT_WITH_ID,
+                    zip(itertools.repeat(scope_name), novel_ex_ids),
+                )
+            else:
+                fcur.executemany(
+                    sq.INSERT_EXPERIMENT_WITH_ID_AND_HASH,
+                    zip(novel_ex_ids, itertools.repeat(scope_id), hashes[novel_flag].tolist()),
+                )
+            novel_values = {
+                xl_name: xl_df[xl_name][novel_flag].tolist()
+                for xl_name, _ in scp_xl
+            }
+            for xl_name, xl_id in scp_xl:
+                fcur.executemany(
+                    sq.INSERT_EX_XL_BY_ID,
+                    zip(novel_ex_ids, itertools.repeat(xl_id), novel_values[xl_name]),
+                )
+            wide_cache = self._get_wide_cache(fcur, scope_name)
+            if wide_cache is not None:
+                self._write_wide_parameters(fcur, wide_cache[0], novel_ex_ids, novel_values)
 
-                # Add this experiment id to this design
-                ex_ids.append(ex_id)
-                for design_name_, design_experiment_ids in design_name_map.items():
-                    if ex_id_as_input in design_experiment_ids:
-                        try:
-                            fcur.execute(sq.INSERT_DESIGN_EXPERIMENT, [scope_name, design_name_, ex_id])
-                        except Exception as err:
-                            _logger.error(str(err))
-                            _logger.error(f"scope_name, design_name, ex_id= {scope_name, design_name_, ex_id}")
-                            raise
+            # Add experiment ids to designs
+            for design_name_, design_experiment_ids in design_name_map.items():
+                in_design = ex_ids_as_input.isin(design_experiment_ids)
+                try:
+                    fcur.executemany(
+                        sq.INSERT_DESIGN_EXPERIMENT,
+                        zip(
+                            itertools.repeat(scope_name),
+                            itertools.repeat(design_name_),
+                            ex_ids[in_design].tolist(),
+                        ),
+                    )
+                except Exception as err:
+                    _logger.error(str(err))
+                    _logger.error(f"scope_name, design_name= {scope_name, design_name_}")
+                    raise
 
-            for ex_id, ex_id_as_input in zip(duplicate_experiments.index, xl_df.loc[~novel_flag].index):
-                if force_ids and ex_id != ex_id_as_input:
-                    raise ValueError(f"cannot change experiment id {ex_id_as_input} to {ex_id}")
-                # Add this experiment id to this design
-                ex_ids.append(ex_id)
-                for design_name_, design_experiment_ids in design_name_map.items():
-                    if ex_id_as_input in design_experiment_ids:
-                        try:
-                            fcur.execute(sq.INSERT_DESIGN_EXPERIMENT, [scope_name, design_name_, ex_id])
-                        except Exception as err:
-                            _logger.error(str(err))
-                            _logger.error(f"scope_name, design_name, ex_id= {scope_name, design_name_, ex_id}")
-                            raise
+            return ex_ids.tolist()
+
+    def _update_experiment_hashes(self, cur, scope_id, parameter_names):
+        """
+        Store parameter fingerprints for experiments that lack them.
+
+        Experiments written by older versions of emat, or before the
+        scope parameters were changed, have no fingerprint.  This computes
+        them once from the stored parameter values.
+        """
+        missing = [i[0] for i in cur.execute(sq.GET_EXPERIMENT_IDS_WITHOUT_HASH, [scope_id])]
+        if not missing:
+            return
+        ex_xl = pd.DataFrame(
+            cur.execute(sq.GET_EX_XL_WITHOUT_HASH, [scope_id]).fetchall(),
+            columns=['experiment', 'name', 'value'],
+        )
+        if ex_xl.empty:
+            ex_xl = pd.DataFrame(index=missing, columns=parameter_names)
+        else:
+            ex_xl = ex_xl.pivot(index='experiment', columns='name', values='value')
+            ex_xl = ex_xl.reindex(index=missing, columns=parameter_names)
+        hashes = fingerprint_rows(ex_xl, parameter_names)
+        cur.executemany(
+            sq.SET_EXPERIMENT_HASH,
+            zip(hashes.index.tolist(), hashes.tolist()),
+        )
+        _logger.info(f"computed parameter fingerprints for {len(hashes)} experiments")
+
+    def _match_experiment_hashes(self, cur, scope_id, hashes, unique=False):
+        """
+        Find existing experiments with matching parameter fingerprints.
+
+        Args:
+            cur (sqlite3.Cursor): Cursor to use.
+            scope_id (int): The internal scope_id.
+            hashes (Collection[bytes]): Fingerprints to look up.
+            unique (bool, default False): Raise an error if any
+                fingerprint matches more than one experiment, instead
+                of returning the lowest matching id.
+
+        Returns:
+            numpy.ndarray: The matching experiment id for each
+                fingerprint, or -1 where there is no match.
+
+        Raises:
+            ValueError: If `unique` is True and multiple experiments
+                match a fingerprint.
+        """
+        result = np.full(len(hashes), -1, dtype=np.int64)
+        cur.execute(sq.CREATE_TEMP_STAGING_EX_HASH)
+        cur.execute(sq.CLEAR_TEMP_STAGING_EX_HASH)
+        try:
+            cur.executemany(sq.INSERT_TEMP_STAGING_EX_HASH, enumerate(hashes))
+            matches = cur.execute(sq.GET_EXPERIMENT_IDS_BY_TEMP_STAGING_HASH, [scope_id]).fetchall()
+        finally:
+            cur.execute(sq.CLEAR_TEMP_STAGING_EX_HASH)
+        for row_n, ex_id, n_matches in matches:
+            if unique and n_matches > 1:
+                raise ValueError('multiple matching experiment ids found')
+            result[row_n] = ex_id
+        return result
+
+    @staticmethod
+    def _has_experiment_hash_column(cur):
+        """
+        Whether the database stores parameter fingerprints.
+
+        The column is added when a database is opened with `update`,
+        so a database from an older version of emat that is opened
+        without `update` does not have it.
+        """
+        columns = [i[1] for i in cur.execute("PRAGMA table_info(ema_experiment)")]
+        return 'experiment_hash' in columns
+
+    def _experiment_hashes_ready(self, cur, scope_id, parameter_names):
+        """
+        Whether all experiments in a scope have parameter fingerprints.
+
+        Missing fingerprints are computed and stored when the database
+        is writeable.  A readonly database is only checked.  A database
+        opened without `update` may predate fingerprints entirely.
+        """
+        if not self._has_experiment_hash_column(cur):
+            return False
+        if not self.readonly:
+            self._update_experiment_hashes(cur, scope_id, parameter_names)
+            return True
+        return not cur.execute(sq.GET_EXPERIMENT_IDS_WITHOUT_HASH, [scope_id]).fetchall()
+
+    def _match_experiment_values(self, cur, scope_id, xl_df, parameter_ids, unique=True):
+        """
+        Find existing experiments matching a subset of parameter values.
+
+        Each row of `xl_df` is staged in a temporary table as
+        (row, parameter, value) triples and resolved with a single join,
+        using the same value equality as SQLite applies to stored
+        parameter values.
+
+        Args:
+            cur (sqlite3.Cursor): Cursor to use.
+            scope_id (int): The internal scope_id.
+            xl_df (pandas.DataFrame): Parameter values to look up.
+            parameter_ids (Mapping[str,int]): The parameter_id for each
+                column of `xl_df`.
+            unique (bool, default True): Raise an error if any row
+                matches more than one experiment, instead of returning
+                the lowest matching id.
+
+        Returns:
+            numpy.ndarray: The matching experiment id for each
+                row, or -1 where there is no match.
+
+        Raises:
+            ValueError: If `unique` is True and multiple experiments
+                match a row.
+        """
+        result = np.full(len(xl_df), -1, dtype=np.int64)
+        cur.execute(sq.CREATE_TEMP_STAGING_EX_VALUE)
+        cur.execute(sq.CLEAR_TEMP_STAGING_EX_VALUE)
+        try:
+            for par_name in xl_df.columns:
+                cur.executemany(
+                    sq.INSERT_TEMP_STAGING_EX_VALUE,
+                    zip(
+                        range(len(xl_df)),
+                        itertools.repeat(parameter_ids[par_name]),
+                        xl_df[par_name].tolist(),
+                    ),
+                )
+            matches = cur.execute(
+                sq.GET_EXPERIMENT_IDS_BY_TEMP_STAGING_VALUE,
+                [scope_id, len(xl_df.columns)],
+            ).fetchall()
+        finally:
+            cur.execute(sq.CLEAR_TEMP_STAGING_EX_VALUE)
+        for row_n, ex_id in matches:
+            if result[row_n] >= 0:
+                if unique:
+                    raise ValueError('multiple matching experiment ids found')
+                if result[row_n] < ex_id:
+                    continue
+            result[row_n] = ex_id
+        return result
+
+    def create_wide_cache(self, scope_name=None):
+        """
+        Create wide cache tables of experiment data for a scope.
+
+        Experiment parameters and performance measures are stored in
+        the database in long form, with one row per value, and must be
+        pivoted every time they are read.  The wide cache stores an
+        additional copy of the data for a scope in tables with one
+        column per parameter or measure.  Once created, the cache is
+        kept in sync by the write methods of this class, and the
+        `read_experiment_parameters` and `read_experiment_measures`
+        methods read directly from it.
+
+        Args:
+            scope_name (str, optional): The scope name.  Can be omitted
+                if only one scope is stored in this database.
+
+        Raises:
+            ReadOnlyDatabaseError: If the database is read-only.
+        """
+        if self.readonly:
+            raise ReadOnlyDatabaseError
+        with self.conn:
+            scope_name = self._validate_scope(scope_name, None)
+            cur = self.conn.cursor()
+            self._drop_wide_cache(cur, scope_name)
+            cur.execute(sq.CREATE_WIDE_CACHE)
+            scope_id = cur.execute(sq.GET_SCOPE_ID, [scope_name]).fetchall()[0][0]
+            parameter_table = f"ema_wide_parameter_{scope_id}"
+            measure_table = f"ema_wide_measure_{scope_id}"
+            cur.execute(sq.CREATE_WIDE_PARAMETER_TABLE.format(
+                wide_table=_quote_identifier(parameter_table),
+            ))
+            cur.execute(sq.CREATE_WIDE_MEASURE_TABLE.format(
+                wide_table=_quote_identifier(measure_table),
+            ))
+            cur.execute(sq.INSERT_WIDE_CACHE, [scope_name, parameter_table, measure_table])
+
+            parameter_names = [i[0] for i in cur.execute(sq.GET_SCOPE_XL, [scope_name]).fetchall()]
+            self._ensure_wide_columns(cur, parameter_table, parameter_names)
+            cur.execute(sq.POPULATE_WIDE_PARAMETER_ROWS.format(
+                wide_table=_quote_identifier(parameter_table),
+            ), [scope_name])
+            for name in parameter_names:
+                cur.execute(sq.POPULATE_WIDE_PARAMETER_COLUMN.format(
+                    wide_table=_quote_identifier(parameter_table),
+                    wide_column=_quote_identifier(name),
+                ), [name])
+
+            measure_names = [i[0] for i in cur.execute(sq.GET_SCOPE_M, [scope_name]).fetchall()]
+            self._ensure_wide_columns(cur, measure_table, measure_names)
+            cur.execute(sq.POPULATE_WIDE_MEASURE_ROWS.format(
+                wide_table=_quote_identifier(measure_table),
+            ), [scope_name])
+            for name in measure_names:
+                cur.execute(sq.POPULATE_WIDE_MEASURE_COLUMN.format(
+                    wide_table=_quote_identifier(measure_table),
+                    wide_column=_quote_identifier(name),
+                ), [name])
+
+    def drop_wide_cache(self, scope_name=None):
+        """
+        Drop the wide cache tables for a scope, if they exist.
+
+        Reads of experiment data for the scope will revert to
+        pivoting the long form tables.
+
+        Args:
+            scope_name (str, optional): The scope name.  Can be omitted
+                if only one scope is stored in this database.
+
+        Raises:
+            ReadOnlyDatabaseError: If the database is read-only.
+        """
+        if self.readonly:
+            raise ReadOnlyDatabaseError
+        with self.conn:
+            scope_name = self._validate_scope(scope_name, None)
+            self._drop_wide_cache(self.conn.cursor(), scope_name)
+
+    def _drop_wide_cache(self, cur, scope_name):
+        wide_cache = self._get_wide_cache(cur, scope_name)
+        if wide_cache is not None:
+            for table in wide_cache:
+                cur.execute(f"DROP TABLE IF EXISTS {_quote_identifier(table)}")
+            cur.execute(sq.DELETE_WIDE_CACHE, [scope_name])
+
+    def _get_wide_cache(self, cur, scope_name):
+        """
+        Get the names of the wide cache tables for a scope.
+
+        Returns:
+            tuple or None: The names of the parameter and measure
+                tables, or None if there is no wide cache for this scope.
+        """
+        try:
+            result = cur.execute(sq.GET_WIDE_CACHE, [scope_name]).fetchall()
+        except sqlite3.OperationalError:
+            # the ema_wide_cache table is not present in this database
+            return None
+        if len(result) == 0:
+            return None
+        return tuple(result[0])
+
+    def _wide_columns(self, cur, table):
+        """The data columns in a wide cache table."""
+        cols = cur.execute(f"PRAGMA table_info({_quote_identifier(table)})").fetchall()
+        return [i[1] for i in cols if i[1] not in ('experiment_id', 'run_rowid')]
+
+    def _ensure_wide_columns(self, cur, table, names):
+        """Add any missing data columns to a wide cache table."""
+        existing = set(self._wide_columns(cur, table))
+        for name in names:
+            if name not in existing:
+                cur.execute(
+                    f"ALTER TABLE {_quote_identifier(table)} "
+                    f"ADD COLUMN {_quote_identifier(name)} NUMERIC"
+                )
+                existing.add(name)
+
+    def _write_wide_parameters(self, cur, table, ex_ids, values):
+        """
+        Write experiment parameters to a wide cache table.
+
+        Args:
+            cur (sqlite3.Cursor): Cursor to use.
+            table (str): The wide cache table name.
+            ex_ids (Sequence[int]): Experiment ids.
+            values (Mapping[str, Sequence]): Parameter values, with
+                one sequence per parameter aligned with `ex_ids`.
+        """
+        if len(ex_ids) == 0 or len(values) == 0:
+            return
+        names = list(values)
+        self._ensure_wide_columns(cur, table, names)
+        sql = sq.UPSERT_WIDE_PARAMETERS.format(
+            wide_table=_quote_identifier(table),
+            wide_columns=", ".join(_quote_identifier(n) for n in names),
+            wide_bindings=", ".join("?" for _ in range(len(names) + 1)),
+        )
+        cur.executemany(sql, zip(ex_ids, *values.values()))
+
+    def _write_wide_measures(self, cur, table, run_bytes, ex_ids, values):
+        """
+        Write performance measures to a wide cache table.
 
-            return ex_ids
+        Args:
+            cur (sqlite3.Cursor): Cursor to use.
+            table (str): The wide cache table name.
+            run_bytes (Sequence[bytes]): Run ids, which must already
+                exist in the ema_experiment_run table.
+            ex_ids (Sequence[int]): Experiment ids.
+            values (Mapping[str, Sequence]): Measure values, with
+                one sequence per measure aligned with `ex_ids`.
+        """
+        if len(ex_ids) == 0 or len(values) == 0:
+            return
+        names = list(values)
+        self._ensure_wide_columns(cur, table, names)
+        quoted = [_quote_identifier(n) for n in names]
+        sql = sq.UPSERT_WIDE_MEASURES.format(
+            wide_table=_quote_identifier(table),
+            wide_columns=", ".join(quoted),
+            wide_bindings=", ".join(f"?{n+3}" for n in range(len(names))),
+            wide_updates=", ".join(f"{q}=excluded.{q}" for q in quoted),
+        )
+        cur.executemany(sql, zip(run_bytes, ex_ids, *values.values()))
+
+    def _read_wide_parameters(self, cur, table, design_name=None, experiment_ids=None):
+        """Read experiment parameters from a wide cache table."""
+        if experiment_ids is not None:
+            query = sq.GET_WIDE_PARAMETERS_IDS_IN.replace(
+                "???", ",".join("?" for _ in experiment_ids)
+            )
+            bindings = list(experiment_ids)
+        elif design_name is None:
+            query = sq.GET_WIDE_PARAMETERS
+            bindings = {}
+        else:
+            query = sq.GET_WIDE_PARAMETERS_IN_DESIGN
+            bindings = dict(design_name=design_name)
+        cur.execute(query.format(wide_table=_quote_identifier(table)), bindings)
+        columns = [i[0] for i in cur.description]
+        xl_df = pd.DataFrame(cur.fetchall(), columns=columns)
+        xl_df = xl_df.set_index('experiment_id').sort_index()
+        return xl_df.dropna(axis=1, how='all')
 
     def read_experiment_id(self, scope_name, *args, **kwargs):
         """
@@ -899,6 +1351,38 @@ class SQLiteDB(Database):
         Returns:
             int: the experiment id of the identified experiment
 
+        Raises:
+            ValueError: If scope name does not exist
+            ValueError: If multiple experiments match an experiment definition.
+                This can happen, for example, if the definition is incomplete.
+        """
+        scope_name = self._validate_scope(scope_name, 'design_name')
+        parameters = {}
+        for a in args:
+            if a is not None:
+                parameters.update(a)
+        parameters.update(kwargs)
+        xl_df = pd.DataFrame(parameters, index=[0])
+        return self.get_experiment_ids(scope_name, xl_df)[0]
+
+    def get_experiment_ids(self, scope_name, xl_df):
+        """
+        Read or create experiment ids in the database.
+
+        All rows are first looked up together with `read_experiment_ids`.
+        Rows that do not match an existing experiment are completed using
+        the default values of any parameters not given in `xl_df`, and
+        written to the database as new 'ad hoc' experiments.
+
+        Args:
+            scope_name (str): scope name, used to identify experiments,
+                performance measures, and results associated with this run
+            xl_df (pandas.DataFrame): The columns of this DataFrame are
+                experiment parameters, and each row is an experiment.
+
+        Returns:
+            list: the experiment id of each row of `xl_df`
+
         Raises:
             ValueError: If scope name does not exist
             ValueError: If multiple experiments match an experiment definition.
@@ -908,16 +1392,17 @@ class SQLiteDB(Database):
         from ...exceptions import MissingIdWarning
         with warnings.catch_warnings():
             warnings.simplefilter("ignore", category=MissingIdWarning)
-            ex_id = self.read_experiment_id(scope_name, *args, **kwargs)
-        if ex_id is None:
-            parameters = self.read_scope(scope_name).get_parameter_defaults()
-            for a in args:
-                if a is not None:
-                    parameters.update(a)
-            parameters.update(kwargs)
-            df = pd.DataFrame(parameters, index=[0])
-            ex_id = self.write_experiment_parameters(scope_name, None, df)[0]
-        return ex_id
+            ex_ids = self.read_experiment_ids(scope_name, xl_df)
+        missing = [n for n, ex_id in enumerate(ex_ids) if ex_id is None]
+        if missing:
+            df = xl_df.iloc[missing].copy()
+            for k, v in self.read_scope(scope_name).get_parameter_defaults().items():
+                if k not in df.columns:
+                    df[k] = v
+            new_ids = self.write_experiment_parameters(scope_name, None, df)
+            for n, ex_id in zip(missing, new_ids):
+                ex_ids[n] = ex_id
+        return ex_ids
 
     def set_experiment_id(self, scope_name=None, experiment_id=None, *args, **kwargs):
         """
@@ -1112,52 +1597,37 @@ class SQLiteDB(Database):
             ValueError: If multiple experiments match an experiment definition.
                 This can happen, for example, if the definition is incomplete.
         """
-        # local cursor
-        fcur = self.conn.cursor()
-        ex_ids = []
-        missing_ids = 0
-
-        try:
-            # get list of experiment variables - except "one"
-            scp_xl = fcur.execute(sq.GET_SCOPE_XL, [scope_name]).fetchall()
-            if len(scp_xl) == 0:
-                raise ValueError('named scope {0} not found - experiment ids \
-                                      not available'.format(scope_name))
-
-            scp_xl = [i[0] for i in scp_xl]
-            use_cols = set(c for c in xl_df.columns if c in scp_xl)
-
-            for row in xl_df.itertuples(index=False, name=None):
-
-                candidate_ids = None
-
-                # get all ids by value
-                for par_name, par_value in zip(xl_df.columns, row):
-                    if par_name not in use_cols:
-                        continue
-                    possible_ids = set([i[0] for i in fcur.execute(
-                        sq.GET_EXPERIMENT_IDS_BY_VALUE,
-                        [scope_name, par_name, par_value],
-                    ).fetchall()])
-                    if candidate_ids is None:
-                        candidate_ids = possible_ids
-                    else:
-                        candidate_ids &= possible_ids
-
-                if len(candidate_ids) > 1:
-                    raise ValueError('multiple matching experiment ids found')
-                elif len(candidate_ids) == 1:
-                    ex_ids.append(candidate_ids.pop())
+        with self.conn:
+            fcur = self.conn.cursor()
+            try:
+                # get list of experiment variables - except "one"
+                scp_xl = fcur.execute(sq.GET_SCOPE_XL_IDS, [scope_name]).fetchall()
+                if len(scp_xl) == 0:
+                    raise ValueError('named scope {0} not found - experiment ids \
+                                          not available'.format(scope_name))
+                scope_id = fcur.execute(sq.GET_SCOPE_ID, [scope_name]).fetchall()[0][0]
+                parameter_ids = dict(scp_xl)
+                use_cols = [c for c in xl_df.columns if c in parameter_ids]
+
+                if (
+                        len(use_cols) == len(parameter_ids)
+                        and self._experiment_hashes_ready(fcur, scope_id, use_cols)
+                ):
+                    # complete experiments are found by their fingerprints
+                    hashes = fingerprint_rows(xl_df, use_cols)
+                    ex_ids = self._match_experiment_hashes(fcur, scope_id, hashes, unique=True)
                 else:
-                    missing_ids +=1
-                    ex_ids.append(None)
-        finally:
-            fcur.close()
+                    ex_ids = self._match_experiment_values(
+                        fcur, scope_id, xl_df[use_cols], parameter_ids,
+                    )
+            finally:
+                fcur.close()
 
+        missing_ids = int((ex_ids < 0).sum())
         if missing_ids:
             from ...exceptions import MissingIdWarning
             warnings.warn(f'missing {missing_ids} ids', category=MissingIdWarning)
-        return ex_ids
+        return [(int(i) if i >= 0 else None) for i in ex_ids]
 
     def read_all_experiment_ids(
             self,
@@ -1296,25 +1766,29 @@ class SQLiteDB(Database):
         scope_name = self._validate_scope(scope_name, 'design_name')
         cur = self.conn.cursor()
 
-        if experiment_ids is not None:
-            query = sq.GET_EX_XL_IDS_IN
-            if isinstance(experiment_ids, int):
-                experiment_ids = [experiment_ids]
-            subquery = ",".join(f"?{n+2}" for n in range(len(experiment_ids)))
-            query = query.replace("???", subquery)
-            bindings = [scope_name, *experiment_ids]
-        elif design_name is None:
-            query = sq.GET_EX_XL_ALL
-            bindings = dict(scope_name=scope_name)
+        if isinstance(experiment_ids, int):
+            experiment_ids = [experiment_ids]
+        wide_cache = self._get_wide_cache(cur, scope_name)
+        if wide_cache is not None:
+            xl_df = self._read_wide_parameters(cur, wide_cache[0], design_name, experiment_ids)
         else:
-            query = sq.GET_EXPERIMENT_PARAMETERS
-            bindings = dict(scope_name=scope_name, design_name=design_name)
-        xl_df = pd.DataFrame(cur.execute(
-            query,
-            bindings,
-        ).fetchall())
-        if xl_df.empty is False:
-            xl_df = xl_df.pivot(index=0, columns=1, values=2)
+            if experiment_ids is not None:
+                query = sq.GET_EX_XL_IDS_IN
+                subquery = ",".join(f"?{n+2}" for n in range(len(experiment_ids)))
+                query = query.replace("???", subquery)
+                bindings = [scope_name, *experiment_ids]
+            elif design_name is None:
+                query = sq.GET_EX_XL_ALL
+                bindings = dict(scope_name=scope_name)
+            else:
+                query = sq.GET_EXPERIMENT_PARAMETERS
+                bindings = dict(scope_name=scope_name, design_name=design_name)
+            xl_df = pd.DataFrame(cur.execute(
+                query,
+                bindings,
+            ).fetchall())
+            if xl_df.empty is False:
+                xl_df = xl_df.pivot(index=0, columns=1, values=2)
         xl_df.index.name = 'experiment'
         xl_df.columns.name = None
 
@@ -1346,6 +1820,8 @@ class SQLiteDB(Database):
             m_df,
             run_ids=None,
             experiment_id=None,
+            *,
+            staging=False,
     ):
         """
         Write experiment results to the database.
@@ -1357,6 +1833,10 @@ class SQLiteDB(Database):
         measures, as the individual experiments from any design are
         uniquely identified by the experiment id's.
 
+        All run records and measure values are assembled up front from
+        the columns of `m_df`, and written with `executemany` inside a
+        single transaction.
+
         Args:
             scope_name (str):
                 A scope name, used to identify experiments,
@@ -1379,6 +1859,13 @@ class SQLiteDB(Database):
             experiment_id (int, optional):
                 Provide an experiment_id.  This is only used if the
                 `m_df` is provided as a dict instead of a DataFrame
+            staging (bool, default False):
+                Load the measure values into a temporary staging table
+                first, and then move them into the measures table with a
+                single `INSERT ... SELECT` statement.  This resolves the
+                measure and run identifiers with one join instead of
+                one lookup per value, which is faster for very large
+                writes.
 
         Raises:
             UserWarning: If scope name does not exist
@@ -1409,61 +1896,62 @@ class SQLiteDB(Database):
                 raise UserWarning('named scope {0} not found - experiments will \
                                       not be recorded'.format(scope_name))
 
+            ex_ids = m_df.index.tolist()
             if run_ids is None:
                 # generate new run_ids if none is given
-                run_ids = []
-                for experiment_id in m_df.index:
-                    run_id, experiment_id = self.new_run_id(
-                        scope_name,
-                        experiment_id=experiment_id,
-                        source=source,
-                    )
-                    run_ids.append(run_id)
+                run_bytes = [uuid.uuid1().bytes for _ in ex_ids]
             else:
-                for (run_id, experiment_id) in zip(run_ids, m_df.index):
-                    self.existing_run_id(
-                        run_id,
-                        scope_name,
-                        experiment_id=experiment_id,
-                        source=source,
-                    )
+                run_bytes = [_to_uuid(run_id).bytes for run_id in run_ids]
+                if len(run_bytes) != len(ex_ids):
+                    raise ValueError(f'got {len(run_bytes)} run_ids for {len(ex_ids)} experiments')
 
+            cur.executemany(
+                sq.NEW_EXPERIMENT_RUN_BULK,
+                zip(run_bytes, ex_ids, itertools.repeat(source)),
+            )
+
+            measure_data = {}
             for m in scp_m:
-                dataseries = None
                 measure_name = m[0]
-                if measure_name not in m_df.columns:
+                if measure_name in m_df.columns:
+                    measure_data[measure_name] = m_df[measure_name]
+                else:
                     if scope is None:
                         scope = self.read_scope(scope_name)
                     formula = getattr(scope[measure_name], 'formula', None)
                     if formula:
-                        dataseries = m_df.eval(formula).rename(m.name)
+                        measure_data[measure_name] = m_df.eval(formula)
+                    else:
+                        _logger.debug(f"write_experiment_measures: no dataseries for {measure_name}")
+
+            measure_data = {k: v.tolist() for k, v in measure_data.items()}
+            measure_rows = itertools.chain.from_iterable(
+                zip(
+                    ex_ids,
+                    itertools.repeat(measure_name),
+                    values,
+                    run_bytes,
+                )
+                for measure_name, values in measure_data.items()
+            )
 
-                if measure_name in m_df.columns:
-                    dataseries = m_df[measure_name]
-
-                if dataseries is not None:
-                    for (ex_id, value), uid in zip(dataseries.iteritems(),run_ids):
-                        _logger.debug(f"write_experiment_measures: writing {measure_name} = {value} @ {ex_id}/{uid}")
-                        uid = _to_uuid(uid)
-                        # index is experiment id
-                        bindings = dict(
-                            experiment_id=ex_id,
-                            measure_value=value,
-                            measure_source=source,
-                            measure_name=measure_name,
-                            measure_run=uid.bytes,
-                        )
-                        try:
-                            if not pd.isna(m[0]):
-                                cur.execute(sq.INSERT_EX_M, bindings)
-                        except:
-                            _logger.error(f"Error saving {value} to m {m[0]} for ex {ex_id}")
-                            for binding, bval in bindings.items():
-                                _logger.error(f"bindings[{binding}]={bval} ({type(bval)})")
-                            _logger.error(str(cur.execute(sq._DEBUG_INSERT_EX_M, bindings).fetchall()))
-                            raise
+            try:
+                if staging:
+                    cur.execute(sq.CREATE_TEMP_STAGING_EX_M)
+                    cur.execute(sq.CLEAR_TEMP_STAGING_EX_M)
+                    cur.executemany(sq.INSERT_TEMP_STAGING_EX_M, measure_rows)
+                    cur.execute(sq.MERGE_TEMP_STAGING_EX_M)
+                    cur.execute(sq.CLEAR_TEMP_STAGING_EX_M)
                 else:
-                    _logger.debug(f"write_experiment_measures: no dataseries for {measure_name}")
+                    cur.executemany(sq.INSERT_EX_M_BULK, measure_rows)
+            except:
+                _logger.error(f"Error saving measures {list(measure_data)} "
+                              f"for {len(ex_ids)} experiments in scope {scope_name}")
+                raise
+
+            wide_cache = self._get_wide_cache(cur, scope_name)
+            if wide_cache is not None:
+                self._write_wide_measures(cur, wide_cache[1], run_bytes, ex_ids, measure_data)
 
     def write_ex_m_1(
             self,
@@ -1523,6 +2011,11 @@ class SQLiteDB(Database):
                     except:
                         _logger.error(f"Error saving {m_value} to m {m[0]} for ex {ex_id}")
                         raise
+                    wide_cache = self._get_wide_cache(cur, scope_name)
+                    if wide_cache is not None and run_id is not None:
+                        self._write_wide_measures(
+                            cur, wide_cache[1], [_to_uuid(run_id).bytes], [ex_id], {m_name: [m_value]},
+                        )
 
     def read_experiment_all(
             self,
@@ -1713,9 +2206,10 @@ class SQLiteDB(Database):
                 associated with both the scope and the named design
                 are returned, otherwise all experiments associated
                 with the scope are returned.
-            experiment_id (int, optional): The id of the experiment to
-                retrieve.  If omitted, get all experiments matching the
-                named scope and design.
+            experiment_id (int or Collection[int], optional): The id of
+                the experiment to retrieve, or a collection of ids.  If
+                omitted, get all experiments matching the named scope and
+                design.
             source (int, optional): The source identifier of the
                 experimental outcomes to load.  If not given, but
                 there are only results from a single source in the
@@ -1763,8 +2257,18 @@ class SQLiteDB(Database):
         else:
             scope = None
         scope_name = self._validate_scope(scope_name, 'design_name')
+        cur = self.conn.cursor()
 
-        sql = sq.GET_EXPERIMENT_MEASURES_MASTER
+        wide_cache = self._get_wide_cache(cur, scope_name)
+        wide_columns = self._wide_columns(cur, wide_cache[1]) if wide_cache else []
+        if wide_columns:
+            sql = sq.GET_WIDE_MEASURES_MASTER.format(
+                wide_table=_quote_identifier(wide_cache[1]),
+                wide_columns=", ".join(f"eem.{_quote_identifier(c)}" for c in wide_columns),
+                wide_all_null=" AND ".join(f"eem.{_quote_identifier(c)} IS NULL" for c in wide_columns),
+            )
+        else:
+            sql = sq.GET_EXPERIMENT_MEASURES_MASTER
 
         if design_name is None:
             sql = sql.replace("AND ed.design = @design_name", "")
@@ -1772,6 +2276,14 @@ class SQLiteDB(Database):
             sql = sql.replace("AND run_source = @measure_source", "")
         if experiment_id is None:
             sql = sql.replace("AND eem.experiment_id = @experiment_id", "")
+        elif not np.isscalar(experiment_id):
+            sql = sql.replace(
+                "AND eem.experiment_id = @experiment_id",
+                "AND eem.experiment_id IN ({})".format(
+                    ", ".join(str(int(i)) for i in experiment_id)
+                ),
+            )
+            experiment_id = None
         if runs in ('all', ):
             sql = sql.replace("AND run_valid = 1", "")
         elif runs == 'invalid':
@@ -1791,23 +2303,35 @@ class SQLiteDB(Database):
             measure_source=source,
         )
 
-        cur = self.conn.cursor()
         try:
             ex_m = pd.DataFrame(cur.execute(sql, arg).fetchall())
         except:
             _logger.error(f"ERROR ON READ MEASURES query=\n{sql}")
             _logger.error(f"ERROR ON READ MEASURES arg=\n{arg}")
             raise
-        if ex_m.empty is False:
+        multiple_source_error = ValueError(
+            "duplicate experiment ids suggest results "
+            "from more than one model source are stored\n"
+            "set `runs='valid'` to return results from all "
+            "sources or set the `source` argument."
+        )
+        if ex_m.empty is False and wide_columns:
+            ex_m.columns = [0, 1, *wide_columns]
+            ex_m = ex_m.set_index([0, 1]).astype(np.float64).dropna(axis=1, how='all')
+            if runs is None:
+                # by default, raise a value error if there are runs from multiple sources
+                ex_ids = ex_m.index.get_level_values(0)
+                for c in ex_m.columns:
+                    if ex_ids[ex_m[c].notna().to_numpy()].duplicated().any():
+                        raise multiple_source_error
+            ex_m = ex_m.sort_index()
+        elif ex_m.empty is False:
             if runs is None:
                 # by default, raise a value error if there are runs from multiple sources
                 try:
                     ex_m.pivot(index=0, columns=2, values=3)
                 except ValueError:
-                    raise ValueError("duplicate experiment ids suggest results "
-                                     "from more than one model source are stored\n"
-                                     "set `runs='valid'` to return results from all "
-                                     "sources or set the `source` argument.")
+                    raise multiple_source_error
             ex_m = ex_m.pivot(index=(0,1), columns=2, values=3).astype(np.float64)
         if isinstance(ex_m.index, pd.MultiIndex):
             fix_levels = [_to_uuid(i) for i in ex_m.index.levels[1]]
@@ -2171,31 +2695,19 @@ class SQLiteDB(Database):
 
     @copydoc(Database.read_uncertainties)
     def read_uncertainties(self, scope_name:str) -> list:
-        cur = self.conn.cursor()
-        scope_name = self._validate_scope(scope_name, None)
-        scp_x = cur.execute(sq.GET_SCOPE_X, [scope_name]).fetchall()
-        return [i[0] for i in scp_x]
+        return self._read_scope_names_by_kind(scope_name, 'uncertainties')
 
     @copydoc(Database.read_levers)
     def read_levers(self, scope_name:str) -> list:
-        cur = self.conn.cursor()
-        scope_name = self._validate_scope(scope_name, None)
-        scp_l = cur.execute(sq.GET_SCOPE_L, [scope_name]).fetchall()
-        return [i[0] for i in scp_l]
+        return self._read_scope_names_by_kind(scope_name, 'levers')
 
     @copydoc(Database.read_constants)
     def read_constants(self, scope_name:str) -> list:
-        cur = self.conn.cursor()
-        scope_name = self._validate_scope(scope_name, None)
-        scp_c = cur.execute(sq.GET_SCOPE_C, [scope_name]).fetchall()
-        return [i[0] for i in scp_c]
+        return self._read_scope_names_by_kind(scope_name, 'constants')
 
     @copydoc(Database.read_measures)
     def read_measures(self, scope_name: str) -> list:
-        cur = self.conn.cursor()
-        scope_name = self._validate_scope(scope_name, None)
-        scp_m = cur.execute(sq.GET_SCOPE_M, [scope_name]).fetchall()
-        return [i[0] for i in scp_m]
+        return self._read_scope_names_by_kind(scope_name, 'measures')
 
     @copydoc(Database.read_box)
     def read_box(self, scope_name: str, box_name: str, scope=None):
@@ -2,6 +2,7 @@
 
 import os
 import time
+import operator
 import numpy as np
 import pandas as pd
 
@@ -13,6 +14,8 @@ from ..util.loggers import get_module_logger
 _logger = get_module_logger(__name__)
 
 from .samplers import (
+    design_frame,
+    CorrelatedSampler,
     LHSSampler,
     AbstractSampler,
     UniformLHSSampler,
@@ -241,61 +244,64 @@ def design_experiments(
 
     np.random.seed(random_seed)
 
-    for _ in range(redraws):
-
-        if sample_from == 'all' and not jointly:
-
-            if n_samples is None:
-                n_samples_u = n_samples_per_factor * len(scope.get_uncertainties())
-                n_samples_l = n_samples_per_factor * len(scope.get_levers())
-            elif isinstance(n_samples, tuple):
-                n_samples_u, n_samples_l = n_samples
-            else:
-                n_samples_u = n_samples_l = n_samples
-
-            samples_u = sample_generator.generate_designs(scope.get_uncertainties(), n_samples_u)
-            samples_u.kind = dict
-            design_u = pd.DataFrame.from_records([_ for _ in samples_u])
-
-            samples_l = sample_generator.generate_designs(scope.get_levers(), n_samples_l)
-            samples_l.kind = dict
-            design_l = pd.DataFrame.from_records([_ for _ in samples_l])
-
-            design_u["____"] = 0
-            design_l["____"] = 0
-            design = pd.merge(design_u, design_l, on='____')
-            design.drop('____', 1, inplace=True)
-
+    if sample_from == 'all' and not jointly:
+        if n_samples is None:
+            n_samples_u = n_samples_per_factor * len(scope.get_uncertainties())
+            n_samples_l = n_samples_per_factor * len(scope.get_levers())
+        elif isinstance(n_samples, tuple):
+            n_samples_u, n_samples_l = n_samples
         else:
-            parms = []
-            if sample_from in ('all', 'uncertainties'):
-                parms += [i for i in scope.get_uncertainties()]
-            if sample_from in ('all', 'levers'):
-                parms += [i for i in scope.get_levers()]
-
-            if n_samples is None:
-                n_samples = n_samples_per_factor * len(parms)
-            samples = sample_generator.generate_designs(parms, n_samples)
-            samples.kind = dict
-            design = pd.DataFrame.from_records([_ for _ in samples])
-
-        if sample_from in ('all', 'constants'):
-            for i in scope.get_constants():
-                design[i.name] = i.default
-
-        design = scope.ensure_dtypes(design)
-        design = design.drop_duplicates()
-
-        if redraws > 1:
-            c = design.corr()
-            np.fill_diagonal(c.values, 0)
-            c[c==1.0] = 0
-            max_corr = c.fillna(0).abs().max().max()
-            if max_corr < max_corr_:
-                max_corr_ = max_corr
+            n_samples_u = n_samples_l = n_samples
+        parameter_groups = [
+            (scope.get_uncertainties(), n_samples_u),
+            (scope.get_levers(), n_samples_l),
+        ]
+    else:
+        parms = []
+        if sample_from in ('all', 'uncertainties'):
+            parms += [i for i in scope.get_uncertainties()]
+        if sample_from in ('all', 'levers'):
+            parms += [i for i in scope.get_levers()]
+        if n_samples is None:
+            n_samples = n_samples_per_factor * len(parms)
+        parameter_groups = [(parms, n_samples)]
+
+    if isinstance(sample_generator, CorrelatedSampler):
+        # Redraws are compared on the standard uniform samples, so the
+        # distribution shapes are only applied to the chosen draw.
+        for _ in range(redraws):
+            draws = [
+                sample_generator.generate_std_uniform_design(parms, n)
+                for parms, n in parameter_groups
+            ]
+            if redraws > 1:
+                max_corr = max(_max_abs_correlation(u) for _, u in draws)
+                if max_corr < max_corr_:
+                    max_corr_ = max_corr
+                    draws_ = draws
+            else:
+                draws_ = draws
+        frames = [
+            design_frame(sample_generator.std_uniform_to_samples(parms, u), parms, len(u))
+            for parms, u in draws_
+        ]
+        design_ = _finish_design(scope, frames, sample_from)
+    else:
+        for _ in range(redraws):
+            frames = [
+                _generate_design_frame(sample_generator, parms, n)
+                for parms, n in parameter_groups
+            ]
+            design = _finish_design(scope, frames, sample_from)
+            if redraws > 1:
+                max_corr = _max_abs_correlation(
+                    design.select_dtypes('number').to_numpy(dtype=float)
+                )
+                if max_corr < max_corr_:
+                    max_corr_ = max_corr
+                    design_ = design
+            else:
                 design_ = design
-        else:
-            design_ = design
 
     if db is not None and sample_from is 'all':
         try:
@@ -314,6 +320,54 @@ def design_experiments(
 
 
 
+def _generate_design_frame(sample_generator, parameters, nr_samples):
+    """Generate a DataFrame of experiments from any sampler."""
+    if isinstance(sample_generator, CorrelatedSampler):
+        return sample_generator.generate_design_frame(parameters, nr_samples)
+    if type(sample_generator).generate_designs is AbstractSampler.generate_designs:
+        parameters = sorted(parameters, key=operator.attrgetter('name'))
+        sampled_parameters = sample_generator.generate_samples(parameters, nr_samples)
+        return design_frame(sampled_parameters, parameters, nr_samples)
+    # samplers with their own design generation
+    samples = sample_generator.generate_designs(parameters, nr_samples)
+    samples.kind = dict
+    return pd.DataFrame.from_records([_ for _ in samples])
+
+
+def _finish_design(scope, frames, sample_from):
+    """Combine sampled frames full-factorially, and add constants."""
+    design = frames[0]
+    for other in frames[1:]:
+        design["____"] = 0
+        other["____"] = 0
+        design = pd.merge(design, other, on='____')
+        design = design.drop(columns='____')
+
+    if sample_from in ('all', 'constants'):
+        for i in scope.get_constants():
+            design[i.name] = i.default
+
+    design = scope.ensure_dtypes(design)
+    return design.drop_duplicates()
+
+
+def _max_abs_correlation(sample):
+    """
+    Largest absolute correlation between two columns of a sample.
+
+    Perfect correlations (e.g. between identical columns) and
+    constant columns are ignored.
+    """
+    if sample.shape[1] < 2 or sample.shape[0] < 2:
+        return 0.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        c = np.corrcoef(sample, rowvar=False)
+    np.fill_diagonal(c, 0)
+    c[c == 1.0] = 0
+    return np.nan_to_num(np.fabs(c)).max()
+
+
+
 def design_sensitivity_tests(
         scope,
         db=None,
@@ -414,6 +468,74 @@ def design_refpoint_test(
     return design
 
 
+_DISTANCE_CHUNK_SIZE = 4096
+_KDTREE_MAX_DIMS = 12
+
+
+def _scaled_points(points, weights):
+    """Rescale each axis so weighted distances become euclidean distances."""
+    return np.asarray(points, dtype=float) * np.sqrt(np.asarray(weights, dtype=float).reshape(1, -1))
+
+
+def _min_sq_distances(fixed_points, other_points):
+    """
+    Minimum squared euclidean distance from each other point to the fixed points.
+
+    A KD-tree is used for low dimensional data, and chunked matrix products
+    otherwise, so the full (n_other, n_fixed) distance matrix is never built.
+
+    Args:
+        fixed_points, other_points (numpy.ndarray): Already rescaled points.
+
+    Returns:
+        numpy.ndarray
+    """
+    if fixed_points.shape[0] == 0:
+        return np.full(other_points.shape[0], np.inf)
+    if fixed_points.shape[1] <= _KDTREE_MAX_DIMS and np.isfinite(fixed_points).all():
+        from scipy.spatial import cKDTree
+        dist, _ = cKDTree(fixed_points).query(other_points, k=1)
+        return dist ** 2
+    fixed_sq = (fixed_points ** 2).sum(1)
+    result = np.empty(other_points.shape[0], dtype=float)
+    for start in range(0, other_points.shape[0], _DISTANCE_CHUNK_SIZE):
+        chunk = other_points[start:start + _DISTANCE_CHUNK_SIZE]
+        sq_dist = (chunk ** 2).sum(1)[:, None] + fixed_sq[None, :] - 2 * (chunk @ fixed_points.T)
+        result[start:start + _DISTANCE_CHUNK_SIZE] = np.maximum(sq_dist.min(1), 0)
+    return result
+
+
+def _sum_within_axis_buffer(fixed_points, fixed_values, other_points, buffer_dist):
+    """
+    Sum values of fixed points within a buffer, separately along each axis.
+
+    For every other point and every axis, the fixed points whose distance
+    along that axis is no more than `buffer_dist` are found by binary search
+    on the sorted fixed coordinates, and their values (or a count, if
+    `fixed_values` is None) are added to the result.
+
+    Args:
+        fixed_points, other_points (numpy.ndarray): Already rescaled points.
+        fixed_values (numpy.ndarray or None): Values with the same shape
+            as `fixed_points`.
+
+    Returns:
+        numpy.ndarray
+    """
+    result = np.zeros(other_points.shape[0], dtype=float if fixed_values is not None else int)
+    for k in range(fixed_points.shape[1]):
+        order = np.argsort(fixed_points[:, k], kind='stable')
+        sorted_axis = fixed_points[order, k]
+        lo = np.searchsorted(sorted_axis, other_points[:, k] - buffer_dist, side='left')
+        hi = np.searchsorted(sorted_axis, other_points[:, k] + buffer_dist, side='right')
+        if fixed_values is None:
+            result += hi - lo
+        else:
+            cumulative = np.concatenate([[0.0], np.cumsum(fixed_values[order, k])])
+            result += cumulative[hi] - cumulative[lo]
+    return result
+
+
 def minimum_weighted_distance(fixed_points, other_points, weights):
     """
     Compute minimum weighted distance from one array of points to another.
@@ -437,16 +559,10 @@ def minimum_weighted_distance(fixed_points, other_points, weights):
         numpy.ndarray:
             The values correspond to the rows in `other_points`.
     """
-    array1 = np.asarray(fixed_points, dtype=float)
-    array2 = np.asarray(other_points, dtype=float)
-    w = np.asarray(weights, dtype=float).reshape(1, -1)
-    result = np.zeros(array2.shape[0], dtype=float)
-
-    for i in range(array2.shape[0]):
-        row = array2[i, :].reshape(1, -1)
-        sq_dist_by_axis = (array1 - row) ** 2
-        result[i] = (sq_dist_by_axis * w).sum(1).min()
-    return result
+    return _min_sq_distances(
+        _scaled_points(fixed_points, weights),
+        _scaled_points(other_points, weights),
+    )
 
 def count_within_buffer(fixed_points, other_points, weights, buffer_dist=1):
     """
@@ -476,16 +592,12 @@ def count_within_buffer(fixed_points, other_points, weights, buffer_dist=1):
             in the `weights` input, and the row correspond to the rows
             int the `df2` argument.
     """
-    array1 = np.asarray(fixed_points, dtype=float)
-    array2 = np.asarray(other_points, dtype=float)
-    w = np.asarray(weights, dtype=float).reshape(1, -1)
-    result = np.zeros(array2.shape[0], dtype=int)
-
-    for i in range(array2.shape[0]):
-        row = array2[i, :].reshape(1, -1)
-        distances = np.sqrt(((array1 - row) ** 2) * w)
-        result[i] = (distances <= buffer_dist).sum()
-    return result
+    return _sum_within_axis_buffer(
+        _scaled_points(fixed_points, weights),
+        None,
+        _scaled_points(other_points, weights),
+        buffer_dist,
+    )
 
 def value_within_buffer(fixed_points, fixed_values, other_points, weights, buffer_dist=1):
     """
@@ -518,16 +630,16 @@ def value_within_buffer(fixed_points, fixed_values, other_points, weights, buffe
             in the `weights` input, and the row correspond to the rows
             int the `df2` argument.
     """
-    array1 = np.asarray(fixed_points, dtype=float)
-    array2 = np.asarray(other_points, dtype=float)
-    w = np.asarray(weights, dtype=float).reshape(1, -1)
-    result = np.zeros(array2.shape[0], dtype=float)
-
-    for i in range(array2.shape[0]):
-        row = array2[i, :].reshape(1, -1)
-        distances = np.sqrt(((array1 - row) ** 2) * w)
-        result[i] = fixed_values[distances <= buffer_dist].sum()
-    return result
+    array1 = _scaled_points(fixed_points, weights)
+    values = np.asarray(fixed_values, dtype=float)
+    if values.ndim == 1:
+        values = np.broadcast_to(values.reshape(-1, 1), array1.shape)
+    return _sum_within_axis_buffer(
+        array1,
+        values,
+        _scaled_points(other_points, weights),
+        buffer_dist,
+    )
 
 
 def minimum_weighted_distances(df1, df2, weights):
@@ -556,15 +668,9 @@ def minimum_weighted_distances(df1, df2, weights):
             in the `weights` input, and the row correspond to the rows
             int the `df2` argument.
     """
-    array1 = np.asarray(df1, dtype=float)
-    array2 = np.asarray(df2, dtype=float)
-
-    result = pd.DataFrame(0, columns=weights.columns, index=df2.index)
-    for i, idx in enumerate(df2.index):
-        row = array2[i, :].reshape(1, -1)
-        sq_dist_by_axis = (array1 - row) ** 2
-        for name, w in weights.iteritems():
-            result.loc[idx, name] = (sq_dist_by_axis / w.values).sum(1).min()
+    result = pd.DataFrame(0.0, columns=weights.columns, index=df2.index)
+    for name, w in weights.items():
+        result[name] = minimum_weighted_distance(df1, df2, 1 / w.values)
     return result
 
 
@@ -577,6 +683,8 @@ def _pick_one_new_experiment(
         future_experiments_std,
         buffer_weighting=1,
         debug=None,
+        mwd=None,
+        cwb=None,
 ):
     """
     Pick a single new experiment from a candidate population.
@@ -606,26 +714,34 @@ def _pick_one_new_experiment(
             argument is the inverse of the result from the
             `get_length_scales` method of a `emat.MetaModel` that has been
             fit on the existing experiment results.
+        mwd (numpy.ndarray, optional):
+            Precomputed minimum weighted distances from the
+            `proposed_experiments` to each possible experiment.
+        cwb (numpy.ndarray, optional):
+            Precomputed and normalized values of future experiments
+            within the buffer of each possible experiment.
 
     Returns:
         int
             The row number from possible_experiments that is selected.
     """
-    mwd = minimum_weighted_distance(
-        proposed_experiments,
-        possible_experiments,
-        dimension_weights
-    )
+    if mwd is None:
+        mwd = minimum_weighted_distance(
+            proposed_experiments,
+            possible_experiments,
+            dimension_weights
+        )
 
     if future_experiments is not None:
-        cwb = value_within_buffer(
-            future_experiments,
-            future_experiments_std,
-            possible_experiments,
-            dimension_weights,
-            buffer_dist=1,
-        ).astype(float)
-        cwb /= cwb.max()
+        if cwb is None:
+            cwb = value_within_buffer(
+                future_experiments,
+                future_experiments_std,
+                possible_experiments,
+                dimension_weights,
+                buffer_dist=1,
+            ).astype(float)
+            cwb /= cwb.max()
 
         if debug:
             from matplotlib import pyplot as plt
@@ -663,6 +779,12 @@ def batch_pick_new_experiments(
     """
     Pick a batch of new experiments from a candidate population.
 
+    Distances from the candidates to the existing experiments are
+    computed only once.  During the initial greedy selection, the
+    minimum distance for each candidate is updated incrementally as
+    each new experiment is picked, and during the exchange phase only
+    the distances to the other new experiments are recomputed.
+
     Args:
         existing_experiments (pandas.DataFrame):
             A set of existing experiments.  These experiments have
@@ -693,7 +815,27 @@ def batch_pick_new_experiments(
             This contains `batch_size` rows selected from
             `possible_experiments`.
     """
+    existing_scaled = _scaled_points(existing_experiments, dimension_weights)
+    possible_scaled = _scaled_points(possible_experiments, dimension_weights)
+
+    # Distances to existing experiments and the buffer values of future
+    # experiments do not change as new experiments are picked.
+    base_mwd = _min_sq_distances(existing_scaled, possible_scaled)
+    if future_experiments is not None:
+        cwb = value_within_buffer(
+            future_experiments,
+            future_experiments_std,
+            possible_experiments,
+            dimension_weights,
+            buffer_dist=1,
+        ).astype(float)
+        cwb /= cwb.max()
+    else:
+        cwb = None
+
     proposed_experiments = existing_experiments.copy()
+    picks = []
+    mwd = base_mwd.copy()
 
     # Initial selection, greedy
     for i in range(batch_size):
@@ -706,11 +848,20 @@ def batch_pick_new_experiments(
             future_experiments_std,
             buffer_weighting=buffer_weighting,
             debug=debug,
+            mwd=mwd,
+            cwb=cwb,
         )
-        proposed_experiments = proposed_experiments.append(possible_experiments.iloc[new_candidate_experiment])
-        _logger.info(f"selecting {proposed_experiments.index[-1]}")
+        picks.append(new_candidate_experiment)
+        new_point = possible_scaled[new_candidate_experiment]
+        np.minimum(mwd, ((possible_scaled - new_point) ** 2).sum(1), out=mwd)
+        if debug:
+            proposed_experiments = pd.concat([
+                proposed_experiments,
+                possible_experiments.iloc[[new_candidate_experiment]],
+            ])
+        _logger.info(f"selecting {possible_experiments.index[new_candidate_experiment]}")
 
-    new_experiments = proposed_experiments.iloc[-batch_size:]
+    new_experiments = possible_experiments.iloc[picks].copy()
 
     # Fedorov Exchanges
     n_exchanges = 1
@@ -718,15 +869,16 @@ def batch_pick_new_experiments(
         n_exchanges = 0
         for i in range(batch_size):
             provisionally_dropping = new_experiments.index[i]
-            proposed_experiments = pd.concat([
-                existing_experiments,
-                new_experiments.drop(new_experiments.index[i])
-            ])
-            # new_candidate_experiment = minimum_weighted_distance(
-            #     proposed_experiments,
-            #     possible_experiments,
-            #     dimension_weights
-            # ).argmax()
+            others = picks[:i] + picks[i+1:]
+            mwd = np.minimum(
+                base_mwd,
+                _min_sq_distances(possible_scaled[others], possible_scaled),
+            )
+            if debug:
+                proposed_experiments = pd.concat([
+                    existing_experiments,
+                    new_experiments.drop(new_experiments.index[i])
+                ])
             new_candidate_experiment = _pick_one_new_experiment(
                 existing_experiments,
                 proposed_experiments,
@@ -736,10 +888,13 @@ def batch_pick_new_experiments(
                 future_experiments_std,
                 buffer_weighting=buffer_weighting,
                 debug=debug,
+                mwd=mwd,
+                cwb=cwb,
             )
             provisional_replacement = possible_experiments.index[new_candidate_experiment]
             if provisional_replacement != provisionally_dropping:
                 n_exchanges += 1
+                picks[i] = new_candidate_experiment
                 new_index = new_experiments.index.tolist()
                 new_index[i] = provisional_replacement
                 new_experiments.index = new_index
@@ -788,7 +943,9 @@ def heuristic_batch_pick_experiment(
         plot=True,
 ):
     _logger.info(f"Computing Density")
-    candidate_density = candidate_experiments.apply(lambda x: scope.get_density(x), axis=1)
+    log_density = scope.logpdf(candidate_experiments)
+    # relative to the densest candidate, so the product over many parameters does not underflow
+    candidate_density = np.exp(log_density - log_density.max())
 
     if poorness_of_fit is None:
         _logger.info(f"Computing Poorness of Fit")
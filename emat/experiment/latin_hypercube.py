@@ -2,8 +2,18 @@ import numpy
 from scipy.optimize import minimize_scalar
 from scipy.stats import norm
 
+_BLOCK_BYTES = 2**24
 
-def lhs(n_factors, n_samples, genepool=10000, random_in_cell=True):
+
+def lhs(
+        n_factors,
+        n_samples,
+        genepool=10000,
+        random_in_cell=True,
+        max_pool_bytes=2**28,
+        criterion='correlation',
+        n_designs=5,
+):
     """
 
     Parameters
@@ -18,23 +28,40 @@ def lhs(n_factors, n_samples, genepool=10000, random_in_cell=True):
     random_in_cell : bool, default True
         If true, a uniform random point in each hypercube cell
                 is chosen, otherwise the center point in each cell is chosen.
+    max_pool_bytes : int, default 2**28
+        The maximum memory used to store the gene pool.  If `genepool`
+                permutations of `n_samples` would not fit, a smaller
+                pool is used (but never fewer than `n_factors`).
+    criterion : {'correlation', 'maximin'}, default 'correlation'
+        With 'correlation', columns are greedily picked from the gene
+                pool to minimize the total absolute correlation with the
+                columns already picked.  With 'maximin', `n_designs`
+                such designs are built from different starting columns,
+                and the one with the largest minimum distance between
+                any two samples is returned.
+    n_designs : int, default 5
+        The number of candidate designs compared when `criterion`
+                is 'maximin'.
 
     Returns
     -------
     ndarray
     """
-    candidates = numpy.empty([genepool, n_samples], dtype=numpy.float64)
-    for i in range(genepool):
-        candidates[i, :] = numpy.random.permutation(n_samples)
-    corr = numpy.fabs(numpy.corrcoef(candidates))
-    keepers = [0]
-    keeper_gross_corr = 0
-    for j in range(n_factors - 1):
-        keeper_gross_corr += corr[keepers[-1], :]
-        k = numpy.argmin(keeper_gross_corr)
-        keepers.append(k)
+    pool = _gene_pool(n_factors, n_samples, genepool, max_pool_bytes)
+    if criterion == 'correlation':
+        keepers = _pick_uncorrelated(pool, n_factors, start=0)
+    elif criterion == 'maximin':
+        best_dist = -numpy.inf
+        starts = numpy.random.choice(pool.shape[0], min(n_designs, pool.shape[0]), replace=False)
+        for start in starts:
+            candidate = _pick_uncorrelated(pool, n_factors, start=start)
+            dist = _min_pairwise_sq_distance(pool[candidate, :].T)
+            if dist > best_dist:
+                best_dist, keepers = dist, candidate
+    else:
+        raise ValueError(f"unknown criterion {criterion!r}")
 
-    lhs = candidates[keepers, :].copy()
+    lhs = pool[keepers, :].astype(numpy.float64)
     if random_in_cell:
         lhs += numpy.random.rand(*(lhs.shape))
     else:
@@ -43,6 +70,81 @@ def lhs(n_factors, n_samples, genepool=10000, random_in_cell=True):
     return lhs
 
 
+def _gene_pool(n_factors, n_samples, genepool, max_pool_bytes):
+    """
+    Random permutations of range(n_samples), one per row.
+
+    Rows are stored as compact integers, and the number of rows is
+    capped so the pool fits in `max_pool_bytes`.
+    """
+    dtype = numpy.int16 if n_samples <= numpy.iinfo(numpy.int16).max else numpy.int32
+    row_bytes = n_samples * numpy.dtype(dtype).itemsize
+    n_rows = max(n_factors, min(genepool, max_pool_bytes // row_bytes))
+    pool = numpy.empty([n_rows, n_samples], dtype=dtype)
+    for i in range(n_rows):
+        pool[i, :] = numpy.random.permutation(n_samples)
+    return pool
+
+
+def _rank_correlations(pool, row):
+    """
+    Correlation of one permutation with every permutation in the pool.
+
+    All permutations of range(n) share the same mean and variance,
+    so only one dot product per pool row is needed, and the pool
+    is processed in blocks to bound the size of temporary arrays.
+    """
+    n = pool.shape[1]
+    if n < 2:
+        return numpy.zeros(pool.shape[0])
+    x = row.astype(numpy.float64) - (n - 1) / 2
+    result = numpy.empty(pool.shape[0], dtype=numpy.float64)
+    block = max(1, _BLOCK_BYTES // (8 * n))
+    for start in range(0, pool.shape[0], block):
+        result[start:start + block] = pool[start:start + block] @ x
+    return result / (n * (n * n - 1) / 12)
+
+
+def _pick_uncorrelated(pool, n_factors, start=0):
+    """
+    Greedily pick rows from the pool with low total absolute correlation.
+
+    Only the correlations with rows that are picked are ever computed,
+    instead of the full correlation matrix of the pool.
+    """
+    keepers = [start]
+    keeper_gross_corr = numpy.zeros(pool.shape[0], dtype=numpy.float64)
+    keeper_gross_corr[start] = numpy.inf
+    for j in range(n_factors - 1):
+        keeper_gross_corr += numpy.fabs(_rank_correlations(pool, pool[keepers[-1]]))
+        k = numpy.argmin(keeper_gross_corr)
+        keeper_gross_corr[k] = numpy.inf
+        keepers.append(k)
+    return keepers
+
+
+def _min_pairwise_sq_distance(x):
+    """
+    Minimum squared distance between any two rows of x.
+
+    Distances are computed in blocks of rows, so the full pairwise
+    distance matrix is never built.
+    """
+    x = numpy.asarray(x, dtype=numpy.float64)
+    n = x.shape[0]
+    if n < 2:
+        return numpy.inf
+    sq = (x ** 2).sum(1)
+    block = max(1, _BLOCK_BYTES // (8 * n))
+    best = numpy.inf
+    for start in range(0, n, block):
+        chunk = x[start:start + block]
+        d = sq[start:start + block, None] + sq[None, :] - 2 * (chunk @ x.T)
+        d[numpy.arange(chunk.shape[0]), numpy.arange(start, start + chunk.shape[0])] = numpy.inf
+        best = min(best, d.min())
+    return max(best, 0.0)
+
+
 def _avg_off_diag(a):
     upper = numpy.triu_indices(a.shape[0], 1)
     lower = numpy.tril_indices(a.shape[0], -1)
@@ -12,7 +12,9 @@ from ..workbench.em_framework.samplers import (
     UniformLHSSampler,
     MonteCarloSampler,
     DefaultDesigns,
+    design_generator,
 )
+from ..workbench.em_framework.parameters import IntegerParameter
 
 from ..exceptions import AsymmetricCorrelationError
 
@@ -57,6 +59,48 @@ def induce_correlation(std_uniform_sample, correlation_matrix, inplace=False):
         return cor_uniform_sample
 
 
+def _design_column(parameter, values):
+    """
+    Convert sampled values for one parameter into experimental design values.
+
+    This gives the same values as `design_generator`, but converts only the
+    unique values of integer, boolean and categorical parameters, instead of
+    every row.
+    """
+    values = numpy.asarray(values)
+    if not isinstance(parameter, IntegerParameter) and values.dtype != object:
+        return values
+    unique_values, inverse = numpy.unique(values, return_inverse=True)
+    converted = pandas.Series([
+        next(design_generator([(v,)], [parameter], dict))[parameter.name]
+        for v in unique_values
+    ])
+    return converted.to_numpy()[inverse]
+
+
+def design_frame(sampled_parameters, parameters, nr_samples):
+    """
+    Assemble sampled parameter values into a DataFrame of experiments.
+
+    This is a columnar equivalent of iterating over the `DefaultDesigns`
+    returned by `generate_designs` with `kind=dict`, and building a
+    DataFrame from those records.
+
+    Args:
+        sampled_parameters (Mapping): Sampled values for each parameter,
+            keyed by parameter name.
+        parameters (Collection): The parameters, in column order.
+        nr_samples (int): The number of samples (rows).
+
+    Returns:
+        pandas.DataFrame
+    """
+    return pandas.DataFrame(
+        {p.name: _design_column(p, sampled_parameters[p.name]) for p in parameters},
+        index=pandas.RangeIndex(nr_samples),
+    )
+
+
 class CorrelatedSampler(AbstractSampler):
 
     def sample_std_uniform(self, size):
@@ -145,6 +189,79 @@ class CorrelatedSampler(AbstractSampler):
 
         return correlation
 
+    def generate_std_uniform_design(self, parameters, nr_samples):
+        """
+        Draw a correlated standard uniform sample for a set of parameters.
+
+        This is the first stage of `generate_designs`, before the
+        distribution shape of each parameter is applied, so that
+        candidate designs can be compared cheaply.
+
+        Args:
+            parameters (Collection): Parameters for which to generate the
+                experimental designs
+            nr_samples (int): the number of samples to draw for each parameter
+
+        Returns:
+            Tuple[List, numpy.ndarray]:
+                The parameters sorted by name, and a standard uniform
+                sample with one row per sample and one column for each
+                of the sorted parameters.
+        """
+        parameters = sorted(parameters, key=operator.attrgetter('name'))
+
+        # Define correlation matrix
+        correlation = self.get_correlation_matrix(parameters, presorted=True)
+
+        std_uniform = numpy.empty([nr_samples, len(parameters)], dtype=numpy.float64)
+        for j in range(len(parameters)):
+            std_uniform[:, j] = self.sample_std_uniform(nr_samples)
+
+        # Induce correlation
+        if len(parameters):
+            induce_correlation(std_uniform, correlation.values, inplace=True)
+
+        return parameters, std_uniform
+
+    def std_uniform_to_samples(self, parameters, std_uniform):
+        """
+        Apply distribution shapes to a standard uniform sample.
+
+        Args:
+            parameters (Collection): Parameters, sorted by name.
+            std_uniform (numpy.ndarray): A sample as returned by
+                `generate_std_uniform_design`.
+
+        Returns:
+            dict: The sampled values for each parameter, keyed by name.
+        """
+        return {
+            p.name: p.dist.ppf(std_uniform[:, j])
+            for j, p in enumerate(parameters)
+        }
+
+    def generate_design_frame(self, parameters, nr_samples):
+        """
+        Generate experimental designs as a DataFrame.
+
+        This gives the same experiments as `generate_designs`, but
+        builds the result column by column instead of one row at a time.
+
+        Args:
+            parameters (Collection): Parameters for which to generate the
+                experimental designs
+            nr_samples (int): the number of samples to draw for each parameter
+
+        Returns:
+            pandas.DataFrame
+        """
+        parameters, std_uniform = self.generate_std_uniform_design(parameters, nr_samples)
+        return design_frame(
+            self.std_uniform_to_samples(parameters, std_uniform),
+            parameters,
+            nr_samples,
+        )
+
     def generate_designs(self, parameters, nr_samples):
         """
         External interface to sampler.
@@ -163,22 +280,10 @@ class CorrelatedSampler(AbstractSampler):
                 a generator object that yields the designs resulting from
                 combining the parameters
         """
-        parameters = sorted(parameters, key=operator.attrgetter('name'))
-
-        # Define correlation matrix
-        correlation = self.get_correlation_matrix(parameters, presorted=True)
-
-        if correlation is None:
-            sampled_parameters = self.generate_samples(parameters, nr_samples)
-        else:
-            sampled_parameters = self.generate_std_uniform_samples(parameters, nr_samples)
-
-            # Induce correlation
-            induce_correlation(sampled_parameters.values, correlation.values, inplace=True)
+        parameters, std_uniform = self.generate_std_uniform_design(parameters, nr_samples)
 
-            # Apply distribution shapes
-            for p in parameters:
-                sampled_parameters[p.name] = p.dist.ppf(sampled_parameters[p.name])
+        # Apply distribution shapes
+        sampled_parameters = self.std_uniform_to_samples(parameters, std_uniform)
 
         # Construct designs per usual workbench approach
         designs = zip(*[sampled_parameters[u.name] for u in parameters])
@@ -36,6 +36,11 @@ class AsyncExperimentalDesign:
 		_logger.info("AsyncExperimentalDesign.run start")
 		if stagger_start is not None:
 			self.stagger_start = stagger_start
+		self._short_circuit()
+		self._tasks = []
+		if len(self._pending_ilocs) == 0:
+			_logger.info("AsyncExperimentalDesign.run all experiments already complete")
+			return self._tasks
 		if evaluator is None:
 			evaluator = await AsyncDistributedEvaluator(
 				self.model,
@@ -46,15 +51,14 @@ class AsyncExperimentalDesign:
 		self._client = self.evaluator.client
 		_logger.info("AsyncExperimentalDesign.run dispatching experiments")
 		self.model.run_experiments(
-			design=self._storage[self.params],
+			design=self._storage[self.params].iloc[self._pending_ilocs],
 			evaluator=evaluator,
 		)
-		self._tasks = []
 		for fut, ilocs in zip(evaluator.futures,evaluator.futures_ilocs):
 			t = asyncio.create_task(fut)
 			t.add_done_callback(self._update_storage)
 			self._tasks.append(t)
-			self._status.iloc[ilocs] = 'queued'
+			self._status.iloc[self._pending_ilocs[ilocs]] = 'queued'
 			hold = 0
 			while hold < self.stagger_start:
 				await asyncio.sleep(1)
@@ -62,13 +66,38 @@ class AsyncExperimentalDesign:
 		_logger.info("AsyncExperimentalDesign.run dispatching task complete")
 		return self._tasks
 
+	def _short_circuit(self):
+		"""
+		Fill in results already in the database, before dispatch.
+
+		Experiments with stored results are marked as done, and only
+		the remaining experiments (by position in the design) are
+		recorded in `_pending_ilocs` to be sent to the evaluator.
+		"""
+		stored = None
+		if self.model.allow_short_circuit:
+			stored = self.model._stored_outcomes(self._storage[self.params], self.model.db)
+		if stored is not None and len(stored):
+			columns = [k for k in stored.columns if k in self._storage.columns]
+			self._storage.iloc[
+				stored.index,
+				self._storage.columns.get_indexer(columns),
+			] = stored[columns].to_numpy()
+			self._status.iloc[stored.index] = 'done'
+			_logger.info(
+				f"short circuit {len(stored)} of {len(self._storage)} "
+				f"experiments with results already in the database"
+			)
+		self._pending_ilocs = np.flatnonzero((self._status == 'pending').to_numpy())
+
 	def _update_storage(self, fut):
 		ilocs = []
 		for i in fut.result():
-			ilocs.append(i[0])
+			iloc = self._pending_ilocs[i[0]]
+			ilocs.append(iloc)
 			for k,v in i[1].items():
-				self._storage[k].values[i[0]] = v
-			self._status.iloc[i[0]] = i[2] or 'done'
+				self._storage[k].values[iloc] = v
+			self._status.iloc[iloc] = i[2] or 'done'
 		# SQLite DB handles are stripped from the model on the workers
 		# to prevent database locks from concurrent write attempts
 		# so we need to write results to the database when they return to
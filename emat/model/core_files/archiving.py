@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Asynchronous, deduplicating archives of files-based core model runs.
+
+Archiving the complete outputs of a core model run can take a long
+time, especially when the archive is on a network drive, and when it
+is done inside `run_model` the next experiment cannot start until it
+is finished.  The `ArchiveStage` moves this work onto a small pool of
+background threads.  The model run is first snapshotted (by linking
+files that the model does not write, and cloning or copying the rest),
+and the snapshot is then stored in the background.
+
+Files are stored once each in a content-addressed object store,
+optionally compressed, so identical files (e.g. unchanged inputs) are
+shared across all experiments.  Each experiment archive directory gets
+a manifest that maps relative file paths to stored objects, which
+`restore_archive` uses to rebuild the archived files.
+"""
+
+import os
+import json
+import gzip
+import shutil
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from ...util.loggers import get_module_logger
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+_logger = get_module_logger(__name__)
+
+MANIFEST_FILENAME = "_emat_manifest_.json"
+
+COMPRESSIONS = (None, 'gzip', 'zstd')
+
+_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+_CHUNK_SIZE = 1 << 20
+
+
+def _check_compression(compression):
+	if compression not in COMPRESSIONS:
+		raise ValueError(f"unknown archive compression {compression!r}, must be one of {COMPRESSIONS}")
+	if compression == 'zstd' and zstandard is None:
+		raise ImportError("zstd archive compression requires the `zstandard` package")
+
+
+def _open_object(path, mode, compression):
+	if compression == 'gzip':
+		return gzip.open(path, mode)
+	if compression == 'zstd':
+		if 'r' in mode:
+			return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+		return zstandard.ZstdCompressor().stream_writer(open(path, 'wb'), closefd=True)
+	return open(path, mode)
+
+
+def _hash_file(path):
+	h = hashlib.sha256()
+	with open(path, 'rb') as f:
+		for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+			h.update(chunk)
+	return h.hexdigest()
+
+
+def _object_path(store_path, digest, compression):
+	return os.path.join(store_path, digest[:2], digest + _SUFFIXES[compression])
+
+
+def _write_json_atomic(path, content):
+	fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+	with os.fdopen(fd, 'w') as f:
+		json.dump(content, f, indent=1)
+	os.replace(tmp, path)
+
+
+class ArchiveStage:
+	"""
+	A bounded pool of background threads that store model run archives.
+
+	Args:
+		store_path (str):
+			The directory of the content-addressed object store.
+		max_workers (int, default 2):
+			The number of threads storing archives.
+		max_pending (int, optional):
+			The maximum number of archives waiting to be stored.
+			Submitting another archive blocks until one is finished,
+			so a model that runs faster than its archives can be stored
+			does not fill up the disk with snapshots.  Defaults to
+			twice `max_workers`.
+		compression ({None, 'gzip', 'zstd'}):
+			How newly stored objects are compressed.  Objects already
+			in the store are reused whatever their compression.
+	"""
+
+	def __init__(self, store_path, max_workers=2, max_pending=None, compression=None):
+		_check_compression(compression)
+		self.store_path = os.path.abspath(store_path)
+		self.compression = compression
+		self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='emat-archive')
+		self._slots = threading.BoundedSemaphore(max_pending or 2 * max_workers)
+		self._lock = threading.Lock()
+		self._pending = {}
+		self._errors = {}
+
+	def submit(self, snapshot_dir, archive_path):
+		"""
+		Store a snapshot directory as an archive, in the background.
+
+		The snapshot directory is removed once it has been stored.
+
+		Args:
+			snapshot_dir (str): The files to archive.
+			archive_path (str): The experiment archive directory,
+				where the manifest is written.
+
+		Returns:
+			concurrent.futures.Future: resolves to the manifest path.
+		"""
+		archive_path = os.path.normpath(os.path.abspath(archive_path))
+		self._slots.acquire()
+		try:
+			future = self._executor.submit(self._store, snapshot_dir, archive_path)
+		except Exception:
+			self._slots.release()
+			raise
+		with self._lock:
+			self._pending[archive_path] = future
+		future.add_done_callback(lambda f: self._finished(archive_path, f))
+		return future
+
+	def _finished(self, archive_path, future):
+		self._slots.release()
+		with self._lock:
+			if self._pending.get(archive_path) is future:
+				del self._pending[archive_path]
+		err = future.exception()
+		if err is not None:
+			_logger.error(f"archiving {archive_path} failed: {err!r}")
+
+	def _store_object(self, path):
+		digest = _hash_file(path)
+		for compression in COMPRESSIONS:
+			if os.path.exists(_object_path(self.store_path, digest, compression)):
+				return digest, compression
+		target = _object_path(self.store_path, digest, self.compression)
+		os.makedirs(os.path.dirname(target), exist_ok=True)
+		fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target), suffix='.tmp')
+		os.close(fd)
+		try:
+			with open(path, 'rb') as fsrc, _open_object(tmp, 'wb', self.compression) as fdst:
+				shutil.copyfileobj(fsrc, fdst, _CHUNK_SIZE)
+			os.replace(tmp, target)
+		except BaseException:
+			os.remove(tmp)
+			raise
+		return digest, self.compression
+
+	def _store(self, snapshot_dir, archive_path):
+		try:
+			return self._store_snapshot(snapshot_dir, archive_path)
+		except BaseException as err:
+			# recorded before the future is done, for `wait` to raise
+			with self._lock:
+				self._errors[archive_path] = err
+			raise
+		finally:
+			shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+	def _store_snapshot(self, snapshot_dir, archive_path):
+		files = {}
+		for dirpath, dirnames, filenames in os.walk(snapshot_dir):
+			for filename in filenames:
+				path = os.path.join(dirpath, filename)
+				relpath = os.path.relpath(path, snapshot_dir).replace(os.sep, '/')
+				digest, compression = self._store_object(path)
+				stat = os.stat(path)
+				files[relpath] = {
+					'sha256': digest,
+					'compression': compression,
+					'size': stat.st_size,
+					'mtime': stat.st_mtime,
+				}
+		os.makedirs(archive_path, exist_ok=True)
+		manifest_path = os.path.join(archive_path, MANIFEST_FILENAME)
+		manifest = read_manifest(archive_path) or {'files': {}}
+		manifest['files'].update(files)
+		try:
+			# relative, so archives can be moved together with the store
+			manifest['store'] = os.path.relpath(self.store_path, archive_path).replace(os.sep, '/')
+		except ValueError:
+			# on a different drive
+			manifest['store'] = self.store_path
+		_write_json_atomic(manifest_path, manifest)
+		_logger.debug(f"archived {len(files)} files to {archive_path}")
+		return manifest_path
+
+	def wait(self, archive_path=None):
+		"""
+		Wait for pending archives to be stored.
+
+		Args:
+			archive_path (str, optional): Wait only for this archive.
+
+		Raises:
+			Exception: The error that stopped an archive from being
+				stored, if any did since the last `wait`.  Each error
+				is raised only once.
+		"""
+		with self._lock:
+			if archive_path is None:
+				futures = list(self._pending.values())
+			else:
+				archive_path = os.path.normpath(os.path.abspath(archive_path))
+				futures = [self._pending[archive_path]] if archive_path in self._pending else []
+		wait(futures)
+		with self._lock:
+			if archive_path is None:
+				errors = list(self._errors.values())
+				self._errors.clear()
+			else:
+				errors = [self._errors.pop(archive_path)] if archive_path in self._errors else []
+		if errors:
+			raise errors[0]
+
+	def close(self):
+		"""Wait for all pending archives and stop the worker threads."""
+		try:
+			self.wait()
+		finally:
+			self._executor.shutdown(wait=True)
+
+
+def read_manifest(archive_path):
+	"""
+	Read the manifest of an experiment archive.
+
+	Args:
+		archive_path (str): The experiment archive directory.
+
+	Returns:
+		dict or None: The manifest, or None if the archive has none.
+	"""
+	try:
+		with open(os.path.join(archive_path, MANIFEST_FILENAME)) as f:
+			return json.load(f)
+	except FileNotFoundError:
+		return None
+
+
+def restore_archive(archive_path, destination, include=None):
+	"""
+	Rebuild the archived files of an experiment.
+
+	Files stored directly in the archive directory are linked, and
+	files listed in its manifest are restored from the object store.
+
+	Args:
+		archive_path (str): The experiment archive directory.
+		destination (str): The directory to restore into.
+		include (Collection[str], optional): fnmatch-style patterns,
+			relative to the archive and using '/' as separator, of the
+			files to restore.  If not given, all files are restored.
+
+	Returns:
+		str: The destination directory.
+	"""
+	from ...workbench.em_framework.working_directories import provision_directory, _matches
+	provision_directory(archive_path, destination, 'symlink', writable=(), include=include)
+	manifest_file = os.path.join(destination, MANIFEST_FILENAME)
+	if os.path.lexists(manifest_file):
+		os.remove(manifest_file)
+	manifest = read_manifest(archive_path)
+	if manifest is None:
+		return destination
+	store_path = os.path.normpath(os.path.join(archive_path, manifest['store']))
+	for relpath, info in manifest['files'].items():
+		if include is not None and not _matches(relpath, include):
+			continue
+		target = os.path.join(destination, *relpath.split('/'))
+		os.makedirs(os.path.dirname(target), exist_ok=True)
+		if os.path.lexists(target):
+			os.remove(target)
+		source = _object_path(store_path, info['sha256'], info['compression'])
+		with _open_object(source, 'rb', info['compression']) as fsrc, open(target, 'wb') as fdst:
+			shutil.copyfileobj(fsrc, fdst, _CHUNK_SIZE)
+		os.utime(target, (info['mtime'], info['mtime']))
+	return destination
@@ -3,6 +3,8 @@
 from typing import List, Union, Mapping, Dict, Tuple, Callable
 import yaml
 import os, sys, time
+import atexit
+import tempfile
 import shutil
 import glob
 import numpy as np
@@ -17,6 +19,7 @@ from ...database.database import Database
 from ...util.docstrings import copydoc
 from ...exceptions import *
 from .parsers import *
+from .archiving import MANIFEST_FILENAME, restore_archive
 from ...util.loggers import get_module_logger
 
 _logger = get_module_logger(__name__)
@@ -113,6 +116,35 @@ class FilesCoreModel(AbstractCoreModel):
 		self.archive_path = os.path.expanduser(self.config['model_archive'])
 		"""Path: The directory where archived models are stored."""
 
+		self.working_directory_strategy = self.config.get('working_directory_strategy', None)
+		"""str: How a private working copy of the model directory is provisioned
+		in each process, one of 'copy', 'reflink', 'hardlink', or 'symlink'.
+		If None, the model is run directly in `model_path`."""
+
+		self.writable_files = self.config.get('writable_files', None)
+		"""List[str]: Patterns of the files, relative to `model_path`, that the
+		model writes to.  Only these files are copied into working copies
+		that use a linking strategy.  If None, all files are copied."""
+
+		self.archive_workers = self.config.get('archive_workers', 0)
+		"""int: The number of background threads that store archives.  If zero,
+		archives are copied synchronously, otherwise they are stored in a
+		deduplicated object store by an `ArchiveStage`."""
+
+		self.archive_max_pending = self.config.get('archive_max_pending', None)
+		"""int: The number of archives that can wait to be stored before
+		archiving blocks the model run, see `ArchiveStage`."""
+
+		self.archive_compression = self.config.get('archive_compression', None)
+		"""str: Compression for stored archive objects, None, 'gzip' or 'zstd'."""
+
+		self.load_measures_threads = self.config.get('load_measures_threads', 4)
+		"""int: The number of threads used to read distinct output files
+		in `load_measures`."""
+
+		self._working_directory_pid = None
+		self._owned_working_directory = None
+		self._archive_stage = None
 		self._parsers = []
 
 	@property
@@ -126,6 +158,8 @@ class FilesCoreModel(AbstractCoreModel):
 
 	def __getstate__(self):
 		state = super().__getstate__()
+		# The archive stage holds threads, each process makes its own.
+		state['_archive_stage'] = None
 		# The SQLite Database does not serialize for usage in other
 		# threads or processes, so we will pass through the database path
 		# to open another new connection on the other end, assuming it is
@@ -202,6 +236,25 @@ class FilesCoreModel(AbstractCoreModel):
 		else:
 			return os.path.join(self.local_directory, self.archive_path)
 
+	@property
+	def archive_stage(self):
+		"""
+		ArchiveStage: The background archive stage for this process.
+
+		This is None unless `archive_workers` is set.
+		"""
+		if not getattr(self, 'archive_workers', 0):
+			return None
+		if getattr(self, '_archive_stage', None) is None:
+			from .archiving import ArchiveStage
+			self._archive_stage = ArchiveStage(
+				os.path.join(self.resolved_archive_path, f"scp_{self.scope.name}", "_objects"),
+				max_workers=self.archive_workers,
+				max_pending=self.archive_max_pending,
+				compression=self.archive_compression,
+			)
+		return self._archive_stage
+
 	def add_parser(self, parser):
 		"""
 		Add a FileParser to extract performance measures.
@@ -296,6 +349,75 @@ class FilesCoreModel(AbstractCoreModel):
 			os.makedirs(mod_results_path, exist_ok=True)
 		return mod_results_path
 
+	def provision_working_directory(self, destination=None):
+		"""
+		Provision a private working copy of the model directory.
+
+		The master model directory is provisioned into `destination`
+		according to `working_directory_strategy` and `writable_files`,
+		and `model_path` is then pointed at the working copy, so that
+		subsequent setup, run, and post-processing all happen there.
+		This is called automatically by `setup` the first time it runs
+		in each process, if a `working_directory_strategy` is set.
+		Subclasses that override `setup` without calling it should call
+		`_ensure_working_directory` instead.
+
+		Args:
+			destination (Path, optional):
+				The directory for the working copy, which the caller
+				then owns.  If not given, a new temporary directory
+				alongside the master model directory is used, which is
+				removed by `remove_working_directory` (called by
+				`cleanup`), or else when the process exits.
+
+		Returns:
+			Path: The working copy directory.
+		"""
+		from ...workbench.em_framework.working_directories import provision_directory
+		master = getattr(self, '_master_model_path', None) or self.resolved_model_path
+		master = os.path.normpath(master)
+		self.remove_working_directory()
+		if destination is None:
+			destination = tempfile.mkdtemp(
+				prefix=f"{os.path.basename(master)}-",
+				dir=os.path.dirname(master),
+			)
+			atexit.register(shutil.rmtree, destination, ignore_errors=True)
+			self._owned_working_directory = destination
+		strategy = getattr(self, 'working_directory_strategy', None) or 'copy'
+		writable = getattr(self, 'writable_files', None)
+		methods = provision_directory(master, destination, strategy, writable)
+		self.log(f"provisioned working directory {destination} using {dict(methods)}")
+		self._master_model_path = master
+		self.model_path = os.path.abspath(destination)
+		self._working_directory_pid = os.getpid()
+		return destination
+
+	def remove_working_directory(self):
+		"""
+		Remove the working copy made by `provision_working_directory`.
+
+		Only a working copy in a temporary directory created by this
+		process is removed, and `model_path` is pointed back at the
+		master model directory.  A working copy in a `destination` given
+		by the caller is left in place.
+		"""
+		working_directory = getattr(self, '_owned_working_directory', None)
+		if working_directory is None or self._working_directory_pid != os.getpid():
+			return
+		shutil.rmtree(working_directory, ignore_errors=True)
+		self._owned_working_directory = None
+		self._working_directory_pid = None
+		self.model_path = self._master_model_path
+
+	def _ensure_working_directory(self):
+		"""Provision a working copy for this process, if configured and not yet done."""
+		if (
+				getattr(self, 'working_directory_strategy', None)
+				and getattr(self, '_working_directory_pid', None) != os.getpid()
+		):
+			self.provision_working_directory()
+
 	def setup(self, params):
 		"""
 		Configure the core model with the experiment variable values.
@@ -327,8 +449,10 @@ class FilesCoreModel(AbstractCoreModel):
 		Classes derived from `FilesCoreModel` do not necessarily need to
 		call `super().setup(params)`, but may find it convenient to do so,
 		as this implementation provides some standard functionality,
-		including validation of parameter names, managing existing
-		archive directories, and logging the start time to the archive.
+		including provisioning a private working copy of the model (if
+		`working_directory_strategy` is set), validation of parameter
+		names, managing existing archive directories, and logging the
+		start time to the archive.
 
 		Args:
 			params (dict):
@@ -342,6 +466,9 @@ class FilesCoreModel(AbstractCoreModel):
 		"""
 		experiment_id = params.pop("_experiment_id_", None)
 
+		# Provision a working copy of the model for this process
+		self._ensure_working_directory()
+
 		# Validate parameter names
 		scope_param_names = set(self.scope.get_parameter_names())
 		for key in params.keys():
@@ -370,6 +497,12 @@ class FilesCoreModel(AbstractCoreModel):
 		# Rename any existing archive directories
 		if experiment_id is not None:
 			orig_archive = self.get_experiment_archive_path(experiment_id)
+			if self._archive_stage is not None:
+				try:
+					self._archive_stage.wait(orig_archive)
+				except Exception as err:
+					# this run replaces the failed archive
+					_logger.warning(f"archiving {orig_archive} failed: {err!r}")
 			if os.path.exists(orig_archive):
 				n = 1
 				orig_archive = orig_archive.rstrip(os.path.sep)
@@ -414,22 +547,47 @@ class FilesCoreModel(AbstractCoreModel):
 
 		results = {}
 
-		for parser in self._parsers:
-			if any(is_requested(name) for name in parser.measure_names):
-				try:
-					measures = parser.read(output_path)
-				except FileNotFoundError as err:
-					for name in parser.measure_names:
-						if is_requested(name):
-							warnings.warn(f'{name} unavailable, {err} not found')
-				except Exception as err:
-					for name in parser.measure_names:
-						if is_requested(name):
-							warnings.warn(f'{name} unavailable, {err!r}')
-				else:
-					for k, v in measures.items():
-						if is_requested(k):
-							results[k] = v
+		# Parsers reading the same file share one read, and distinct
+		# files are read concurrently.
+		parsers = [
+			parser for parser in self._parsers
+			if any(is_requested(name) for name in parser.measure_names)
+		]
+		cache = ReadCache()
+		for parser in parsers:
+			if isinstance(parser, TableParser):
+				cache.add_hints(parser, output_path)
+
+		def _read(parser):
+			try:
+				if isinstance(parser, TableParser):
+					return parser.read(output_path, cache=cache), None
+				return parser.read(output_path), None
+			except Exception as err:
+				return None, err
+
+		n_files = len(set(os.path.join(output_path, parser.filename) for parser in parsers))
+		n_threads = min(getattr(self, 'load_measures_threads', 1) or 1, n_files)
+		if n_threads > 1:
+			from concurrent.futures import ThreadPoolExecutor
+			with ThreadPoolExecutor(n_threads) as pool:
+				reads = list(pool.map(_read, parsers))
+		else:
+			reads = [_read(parser) for parser in parsers]
+
+		for parser, (measures, err) in zip(parsers, reads):
+			if isinstance(err, FileNotFoundError):
+				for name in parser.measure_names:
+					if is_requested(name):
+						warnings.warn(f'{name} unavailable, {err} not found')
+			elif err is not None:
+				for name in parser.measure_names:
+					if is_requested(name):
+						warnings.warn(f'{name} unavailable, {err!r}')
+			else:
+				for k, v in measures.items():
+					if is_requested(k):
+						results[k] = v
 
 		# Also assign to outcomes_output instead of returning, for ema_workbench compatibility
 		self.outcomes_output = results
@@ -446,10 +604,25 @@ class FilesCoreModel(AbstractCoreModel):
 				all measures will be loaded.
 		"""
 		experiment_archive_path = self.get_experiment_archive_path(experiment_id)
+		if getattr(self, '_archive_stage', None) is not None:
+			self._archive_stage.wait(experiment_archive_path)
 		experiment_archive_zip = experiment_archive_path.rstrip("/\\")+".zip"
-		if os.path.exists(experiment_archive_zip):
+		if os.path.exists(os.path.join(experiment_archive_path, MANIFEST_FILENAME)):
+			_logger.info(f"archive manifest found, restoring from {experiment_archive_path}")
+			rel_output_path = os.path.normpath(self.rel_output_path).replace(os.sep, '/')
+			include = None if rel_output_path == '.' else [f"{rel_output_path}/*"]
+			with tempfile.TemporaryDirectory() as tmpdir:
+				restore_archive(experiment_archive_path, tmpdir, include=include)
+				return self.load_measures(
+					measure_names,
+					abs_output_path=os.path.join(
+						tmpdir,
+						self.rel_output_path,
+					)
+				)
+		elif os.path.exists(experiment_archive_zip):
 			_logger.info(f"zipped archive found, loading from {experiment_archive_zip}")
-			import tempfile, zipfile
+			import zipfile
 			with tempfile.TemporaryDirectory() as tmpdir:
 				zipfile.ZipFile(experiment_archive_zip).extractall(tmpdir)
 				return self.load_measures(
@@ -472,6 +645,74 @@ class FilesCoreModel(AbstractCoreModel):
 	def archive(self, params, model_results_path, experiment_id:int=0):
 		raise NotImplementedError
 
+	def archive_files(self, model_results_path, source=None, include=None):
+		"""
+		Archive files from a model run.
+
+		This is a helper for implementations of `archive`.  If
+		`archive_workers` is zero, the files are copied (or linked,
+		following `working_directory_strategy`) into the archive
+		directory before returning.  Otherwise the files are snapshotted
+		and then stored by the `archive_stage` in the background, and
+		an archive manifest is written into the archive directory.
+		Either way, `load_archived_measures` reads them back.
+
+		Args:
+			model_results_path (str):
+				The experiment archive directory.
+			source (str, optional):
+				The directory to archive files from, by default the
+				`resolved_model_path`.
+			include (Collection[str], optional):
+				fnmatch-style patterns, relative to `source` and
+				using '/' as separator, of the files to archive.  If
+				not given, all files are archived.
+
+		Returns:
+			concurrent.futures.Future or None:
+				The pending archive, if it is stored in the background.
+		"""
+		from ...workbench.em_framework.working_directories import provision_directory
+		if source is None:
+			source = self.resolved_model_path
+		strategy = getattr(self, 'working_directory_strategy', None) or 'copy'
+		writable = getattr(self, 'writable_files', None)
+		stage = self.archive_stage
+		if stage is None:
+			# Archives must outlive the working copy, so never symlink them.
+			if strategy == 'symlink':
+				strategy = 'hardlink'
+			provision_directory(source, model_results_path, strategy, writable, include)
+			return None
+		# The snapshot must not change when the next experiment reuses the
+		# model directory, so only files the model never writes are linked.
+		staging = os.path.join(os.path.dirname(os.path.normpath(source)), ".emat-archive-staging")
+		os.makedirs(staging, exist_ok=True)
+		snapshot = tempfile.mkdtemp(dir=staging)
+		provision_directory(
+			source, snapshot,
+			'copy' if strategy == 'copy' else 'hardlink',
+			writable, include,
+		)
+		return stage.submit(snapshot, model_results_path)
+
+	def wait_for_archives(self):
+		"""
+		Wait until all archives pending in the background are stored.
+
+		Raises:
+			Exception: The error that stopped an archive from being stored.
+		"""
+		if getattr(self, '_archive_stage', None) is not None:
+			self._archive_stage.wait()
+
+	def cleanup(self):
+		try:
+			self.wait_for_archives()
+		finally:
+			self.remove_working_directory()
+			super().cleanup()
+
 	def run(self):
 		raise NotImplementedError
 
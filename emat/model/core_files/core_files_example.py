@@ -5,10 +5,10 @@ import re
 import pandas as pd
 import numpy as np
 import shutil
-from distutils.dir_util import copy_tree
 
 from .core_files import FilesCoreModel, TableParser, MappingParser, loc, key
 from ... import package_file
+from ...workbench.em_framework.working_directories import provision_directory
 from ...util.loggers import get_module_logger
 
 _logger = get_module_logger(__name__)
@@ -56,8 +56,9 @@ class RoadTestFileModel(FilesCoreModel):
 
 		# Initialize the working directory of the files-based model.
 		# Depending on how large your core model is, you may or may
-		# not want to be copying the whole thing.
-		copy_tree(
+		# not want to be copying the whole thing, see the
+		# `working_directory_strategy` and `writable_files` options.
+		provision_directory(
 			package_file('examples','road-test-files'),
 			os.path.join(self.master_directory.name, "road-test-files"),
 		)
@@ -75,6 +76,18 @@ class RoadTestFileModel(FilesCoreModel):
 			scope = package_file('model','tests','road_test.yaml'),
 		)
 
+		# Declare the files that the model writes to, so that
+		# working copies and archives can link everything else.
+		if self.writable_files is None:
+			self.writable_files = [
+				'levers.yml',
+				'uncertainties.yml',
+				'output.yaml',
+				'output.csv.gz',
+				'prevent_random_crash.txt',
+				f'{self.rel_output_path}/*',
+			]
+
 		# Add parsers to instruct the load_measures function
 		# how to parse the outputs and get the measure values.
 		self.add_parser(
@@ -105,6 +118,9 @@ class RoadTestFileModel(FilesCoreModel):
 
 		_logger.info("RoadTestFileModel SETUP...")
 
+		# Provision a private working copy of the model, if configured
+		self._ensure_working_directory()
+
 		numbers_to_levers_file = [
 			'expand_capacity',
 			'amortization_period',
@@ -215,8 +231,5 @@ class RoadTestFileModel(FilesCoreModel):
 		"""
 		if model_results_path is None:
 			model_results_path = self.get_experiment_archive_path(experiment_id)
-		copy_tree(
-			os.path.join(self.master_directory.name, "road-test-files"),
-			model_results_path,
-		)
+		self.archive_files(model_results_path)
 
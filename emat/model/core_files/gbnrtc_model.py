@@ -3,8 +3,6 @@
 from typing import List, Union, Mapping
 import yaml
 import os, sys, time
-from shutil import copyfile, copy
-import glob
 import pandas as pd
 import numpy as np
 from ...scope.scope import Scope
@@ -12,7 +10,6 @@ from ...database.database import Database
 from .core_files import FilesCoreModel
 from .parsers import TableParser, loc, iloc, loc_sum
 from ...util.docstrings import copydoc
-from .core_files import copy_model_outputs_1, copy_model_outputs_ext
 
 try:
     import emat.model.core_files.caliper as cp
@@ -54,6 +51,22 @@ class GBNRTCModel(FilesCoreModel):
     """
 
     tc = None
+
+    # model outputs copied to the archive, with .bin and .dcb files
+    __ARCHIVE_OUTPUTS_EXT = (
+        "AM_LinkVolumes", "PM_LinkVolumes", "MD_LinkVolumes", "NT_LinkVolumes",
+        "TASN_ONO_pkwk", "TASN_ONO_opwk", "TASN_ONO_pkdr", "TASN_ONO_opdr",
+        "pktrips",
+    )
+
+    # other model outputs copied to the archive
+    __ARCHIVE_OUTPUTS = (
+        "pkdr.mtx", "pkwk.mtx", "opdr.mtx", "opwk.mtx",
+        "skim_walk.mtx", "skim_hwypk.mtx", "skim_hwyop.mtx",
+        "AM_hwytrips.mtx", "PM_hwytrips.mtx",
+        "ModeChoice_Daily_Sum_Trips_pk.mtx", "ModeChoice_Daily_Sum_Trips_op.mtx",
+        "msa_log.txt",
+    )
     
     def __init__(self,
                  configuration:Union[str,Mapping],
@@ -227,20 +240,9 @@ class GBNRTCModel(FilesCoreModel):
         if self.tc is None:
             self.start_transcad()        
 
-        # create output folder
-        if not os.path.exists(model_results_path):
-            os.makedirs(model_results_path)
-            time.sleep(2)
-            os.makedirs(os.path.join(model_results_path, "TAZ"))
-            time.sleep(2)
-            os.makedirs(os.path.join(model_results_path, "Network"))
-            time.sleep(2)
-            os.makedirs(os.path.join(model_results_path, "Inputs"))
-            time.sleep(2)
-            os.makedirs(os.path.join(model_results_path, "Inputs\\Model"))
-            time.sleep(2)
-            os.makedirs(os.path.join(model_results_path, "Outputs"))
-            time.sleep(2)
+        # create output folders
+        for subdir in ("TAZ", "Network", os.path.join("Inputs", "Model"), "Outputs"):
+            os.makedirs(os.path.join(model_results_path, subdir), exist_ok=True)
 
         # record experiment definitions
         xl_df = pd.DataFrame(list(params.items()),columns=['variable','value'])
@@ -255,44 +257,23 @@ class GBNRTCModel(FilesCoreModel):
                          self.mod_path_tc +"\\\\",
                          model_results_path.replace("\\", "\\\\") + "\\\\")
 
-        copy_model_outputs_ext(self.model_path, model_results_path, "AM_LinkVolumes")
-        copy_model_outputs_ext(self.model_path, model_results_path, "PM_LinkVolumes")
-        copy_model_outputs_ext(self.model_path, model_results_path, "MD_LinkVolumes")
-        copy_model_outputs_ext(self.model_path, model_results_path, "NT_LinkVolumes")
-        copy_model_outputs_ext(self.model_path, model_results_path, "TASN_ONO_pkwk")
-        copy_model_outputs_ext(self.model_path, model_results_path, "TASN_ONO_opwk")
-        copy_model_outputs_ext(self.model_path, model_results_path, "TASN_ONO_pkdr")
-        copy_model_outputs_ext(self.model_path, model_results_path, "TASN_ONO_opdr")
-        copy_model_outputs_ext(self.model_path, model_results_path, "pktrips")
-
-        copy_model_outputs_1(self.model_path, model_results_path, "pkdr.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "pkwk.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "opdr.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "opwk.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "skim_walk.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "skim_hwypk.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "skim_hwyop.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "AM_hwytrips.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "PM_hwytrips.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "ModeChoice_Daily_Sum_Trips_pk.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "ModeChoice_Daily_Sum_Trips_op.mtx")
-        copy_model_outputs_1(self.model_path, model_results_path, "msa_log.txt")
-        
-        # copy other files to support performance measures
-        for file in glob.glob(
-                os.path.join(
-                    self.model_path,
-                    "EMAExperimentFiles", "PerfMeasSupport", "*"
-                )
-        ):
-            copy(file, os.path.join(model_results_path, 
-                                    "EMAExperimentFiles", "PerfMeasSupport"))
-            
-        # copy output summaries (all csv's)
-        for file in glob.glob(
-                os.path.join(self.model_path, "Outputs", "*.csv")
-        ):
-            copy(file, os.path.join(model_results_path, "Outputs"))
+        # copy model outputs, other files to support performance
+        # measures, and output summaries (all csv's)
+        self.archive_files(
+            model_results_path,
+            source=self.model_path,
+            include=[
+                f"Outputs/{name}{ext}"
+                for name in self.__ARCHIVE_OUTPUTS_EXT
+                for ext in ('.bin', '.dcb')
+            ] + [
+                f"Outputs/{name}"
+                for name in self.__ARCHIVE_OUTPUTS
+            ] + [
+                "EMAExperimentFiles/PerfMeasSupport/*",
+                "Outputs/*.csv",
+            ],
+        )
 
     # =============================================================================
     #     Experiment variable setting methods
@@ -1,9 +1,11 @@
 
 import os
 import abc
+import threading
 import numpy as np
 import pandas as pd
 from typing import Mapping
+from concurrent.futures import Future
 
 from ...util.loggers import get_module_logger
 _logger = get_module_logger(__name__)
@@ -56,6 +58,128 @@ class FileParser(abc.ABC):
 	def __repr__(self):
 		return f'<emat.model.core_files.{self.__class__.__name__} for "{self.filename}">'
 
+def safeload(f, **kwargs):
+	"""
+	Read a YAML file, the default `reader_method` of a `MappingParser`.
+
+	Args:
+		f (Path-like): The file to read.
+		**kwargs: Passed to `yaml.safe_load`.
+
+	Returns:
+		The data in the file.
+	"""
+	import yaml
+	with open(f, 'rt') as fi:
+		return yaml.safe_load(fi, **kwargs)
+
+
+def _column_labels(usecols):
+	"""Whether usecols is a list of column labels, which can be merged."""
+	return (
+		usecols is not None
+		and not callable(usecols)
+		and all(isinstance(c, str) for c in usecols)
+	)
+
+
+class ReadCache:
+	"""
+	A memo of raw file reads, shared by the parsers in one `load_measures` call.
+
+	Parsers that read the same file with the same `reader_method` and
+	keyword arguments share a single read, which is safe to request
+	from several threads at once.  Their `usecols` and `dtype` hints
+	are merged first, so the shared read loads all the columns that any
+	of them need, and each parser then gets only its own `usecols` from
+	the shared table, in file order, as if it had read the file alone.
+	Only `usecols` given as column labels are merged, parsers that give
+	column positions or a callable share a read only with parsers that
+	give the same.  The cached data is shared, so
+	getters must not modify it.  Entries are keyed on the file
+	modification time, so a file that is rewritten is read again.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._hints = {}
+		self._reads = {}
+
+	@staticmethod
+	def _key(parser, from_dir):
+		usecols = getattr(parser, 'usecols', None)
+		return (
+			os.path.abspath(os.path.join(from_dir, parser.filename)),
+			parser.reader_method,
+			repr(sorted(parser.reader_kwargs.items())),
+			None if usecols is None or _column_labels(usecols) else repr(usecols),
+		)
+
+	def add_hints(self, parser, from_dir):
+		"""
+		Register the column hints of a parser before reading.
+
+		Args:
+			parser (TableParser): The parser that will read through this cache.
+			from_dir (Path-like): The base directory from which it will read.
+		"""
+		key = self._key(parser, from_dir)
+		usecols = getattr(parser, 'usecols', None)
+		dtype = getattr(parser, 'dtype', None)
+		with self._lock:
+			if key not in self._hints:
+				self._hints[key] = (list(usecols) if _column_labels(usecols) else usecols, dtype)
+				return
+			merged_usecols, merged_dtype = self._hints[key]
+			if merged_usecols is not None and key[3] is None:
+				if usecols is None:
+					merged_usecols = None
+				else:
+					merged_usecols += [c for c in usecols if c not in merged_usecols]
+			if dtype is not None:
+				if merged_dtype is None or not isinstance(dtype, Mapping):
+					merged_dtype = dtype
+				elif isinstance(merged_dtype, Mapping):
+					merged_dtype = {**merged_dtype, **dtype}
+			self._hints[key] = (merged_usecols, merged_dtype)
+
+	def read(self, parser, from_dir):
+		"""
+		Read the raw data for a parser, or reuse a matching earlier read.
+
+		Args:
+			parser (TableParser): The parser to read for.
+			from_dir (Path-like): The base directory from which to read the data.
+
+		Returns:
+			The raw data, as returned by the parser's `reader_method`.
+		"""
+		key = self._key(parser, from_dir)
+		f = key[0]
+		if not os.path.exists(f):
+			raise FileNotFoundError(os.path.join(from_dir, parser.filename))
+		read_key = key + (os.stat(f).st_mtime_ns,)
+		with self._lock:
+			future = self._reads.get(read_key)
+			owner = future is None
+			if owner:
+				future = self._reads[read_key] = Future()
+			usecols, dtype = self._hints.get(
+				key, (getattr(parser, 'usecols', None), getattr(parser, 'dtype', None)),
+			)
+		if owner:
+			kwargs = dict(parser.reader_kwargs)
+			if usecols is not None:
+				kwargs['usecols'] = usecols
+			if dtype is not None:
+				kwargs['dtype'] = dtype
+			try:
+				future.set_result(parser.reader_method(f, **kwargs))
+			except BaseException as err:
+				future.set_exception(err)
+		return future.result()
+
+
 class TableParser(FileParser):
 	"""
 	A tool to parse performance measure from an arbitrary table format.
@@ -84,6 +208,14 @@ class TableParser(FileParser):
 			optionally some keyword arguments, and returns a pandas.DataFrame.
 		handle_errors (str, default 'raise'): How to handle errors when
 			reading a table, one of {'raise', 'nan'}
+		usecols (list-like, optional): The columns that the
+			`measure_getters` need, including any index column, passed
+			to `reader_method` so that only these columns are loaded.
+			When several parsers read the same file through a
+			`ReadCache`, their `usecols` are merged.
+		dtype (type or Mapping, optional): Data types for the columns,
+			passed to `reader_method`.  When several parsers read the
+			same file through a `ReadCache`, their `dtype` are merged.
 		**kwargs (Mapping, optional): A set of fixed keyword arguments
 			that will be passed to `reader_method` each time it is called.
 
@@ -95,9 +227,13 @@ class TableParser(FileParser):
 			measure_getters,
 			reader_method = pd.read_csv,
 			handle_errors = 'raise',
+			usecols = None,
+			dtype = None,
 			**kwargs,
 	):
 		super().__init__(filename)
+		self.usecols = usecols
+		self.dtype = dtype
 		if not isinstance(measure_getters, Mapping):
 			raise TypeError('measure_getters must be a mapping')
 		self.measure_getters = measure_getters
@@ -107,7 +243,7 @@ class TableParser(FileParser):
 			raise ValueError("handle_errors not in {'raise', 'nan'}")
 		self.handle_errors = handle_errors
 
-	def raw(self, from_dir):
+	def raw(self, from_dir, cache=None):
 		"""
 		Read the raw tabular data.
 
@@ -121,26 +257,44 @@ class TableParser(FileParser):
 
 		Args:
 			from_dir (Path-like): The base directory from which to read the data.
+			cache (ReadCache, optional): A cache of reads to share with
+				other parsers.
 
 		Returns:
 			pandas.DataFrame
 		"""
+		if cache is not None:
+			data = cache.read(self, from_dir)
+			usecols = getattr(self, 'usecols', None)
+			if isinstance(data, pd.DataFrame) and _column_labels(usecols):
+				# only this parser's columns, in the file order, as if it
+				# had read the file alone, so that positional getters do
+				# not depend on other parsers sharing the read
+				data = data.loc[:, data.columns.isin(usecols)]
+			return data
 		f = os.path.join(from_dir, self.filename)
 		if not os.path.exists(f):
 			raise FileNotFoundError(f)
-		return self.reader_method( f, **self.reader_kwargs, )
-
-	def read(self, from_dir):
+		kwargs = dict(self.reader_kwargs)
+		if getattr(self, 'usecols', None) is not None:
+			kwargs['usecols'] = self.usecols
+		if getattr(self, 'dtype', None) is not None:
+			kwargs['dtype'] = self.dtype
+		return self.reader_method( f, **kwargs, )
+
+	def read(self, from_dir, cache=None):
 		"""
 		Read the performance measures.
 
 		Args:
 			from_dir (Path-like): The base directory from which to read the data.
+			cache (ReadCache, optional): A cache of reads to share with
+				other parsers.
 
 		Returns:
 			Dict: The measures read from this file.
 		"""
-		data = self.raw(from_dir)
+		data = self.raw(from_dir, cache=cache)
 		result = {}
 
 		for measure_name, getter in self.measure_getters.items():
@@ -328,6 +482,8 @@ class MappingParser(TableParser):
 			(i.e. a dict, or something that acts like a dict).
 		handle_errors (str, default 'raise'): How to handle errors when
 			reading a file, one of {'raise', 'nan'}
+		usecols, dtype (optional): Accepted for consistency with
+			`TableParser`, but ignored, as a mapping has no columns.
 		**kwargs (Mapping, optional): A set of fixed keyword arguments
 			that will be passed to `reader_method` each time it is called.
 
@@ -338,50 +494,27 @@ class MappingParser(TableParser):
 			measure_getters,
 			reader_method = None,
 			handle_errors = 'raise',
+			usecols = None,
+			dtype = None,
 			**kwargs,
 	):
 		if reader_method is None:
-			import yaml
-			def safeload(f, **kw):
-				with open(f, 'rt') as fi:
-					return yaml.safe_load(fi, **kw)
 			reader_method = safeload
 		super().__init__(filename, measure_getters, reader_method, handle_errors, **kwargs)
 
-	def raw(self, from_dir):
-		"""
-		Read the raw mapping data.
-
-		This method will read the raw file, using the `reader_method`
-		defined for this `MappingParser` and any designated keyword
-		arguments for that reader, but it will not actually run
-		any of the `measure_getters` that convert the table into
-		individual performance measures.  This method is exposed for
-		users primarily to test be able to conveniently test `MappingParser`
-		objects during development.
-
-		Args:
-			from_dir (Path-like): The base directory from which to read the data.
-
-		Returns:
-			Mapping
-		"""
-		f = os.path.join(from_dir, self.filename)
-		if not os.path.exists(f):
-			raise FileNotFoundError(f)
-		return self.reader_method( f, **self.reader_kwargs, )
-
-	def read(self, from_dir):
+	def read(self, from_dir, cache=None):
 		"""
 		Read the performance measures.
 
 		Args:
 			from_dir (Path-like): The base directory from which to read the data.
+			cache (ReadCache, optional): A cache of reads to share with
+				other parsers.
 
 		Returns:
 			Dict: The measures read from this file.
 		"""
-		data = self.raw(from_dir)
+		data = self.raw(from_dir, cache=cache)
 		result = {}
 
 		for measure_name, getter in self.measure_getters.items():
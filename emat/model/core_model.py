@@ -7,6 +7,7 @@ import pandas as pd
 import numpy as np
 import logging
 import subprocess
+import time
 import warnings
 from contextlib import contextmanager
 from typing import Union, Mapping
@@ -825,6 +826,58 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
         from ..experiment import experimental_design
         return experimental_design.design_experiments(self.scope, *args, **kwargs)
 
+    def _stored_outcomes(self, design, db):
+        """
+        Find experiments in a design that already have results in a database.
+
+        The experiment ids for the whole design are resolved together, and
+        the stored core model results for those experiments are read in
+        one query, so that finished experiments can be dropped from a
+        design before it is dispatched to an evaluator.  Unlike the short circuit in `run_model`, this
+        works for any evaluator, including those whose workers have no
+        database access.
+
+        Args:
+            design (pandas.DataFrame): The experiments to run.
+            db (Database): The database to check for stored results.
+
+        Returns:
+            pandas.DataFrame or None:
+                The stored performance measures of the finished
+                experiments, indexed by their position in `design`,
+                or None if there is no database to check.
+        """
+        if not db:
+            return None
+        try:
+            if design.index.name == 'experiment':
+                ex_ids = list(design.index)
+            else:
+                params = [i for i in self.scope.get_parameter_names() if i in design.columns]
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", category=MissingIdWarning)
+                    ex_ids = db.read_experiment_ids(self.scope.name, design[params])
+            known_ids = sorted({int(i) for i in ex_ids if i is not None})
+            if not known_ids:
+                return None
+            stored = db.read_experiment_measures(
+                self.scope,
+                design_name=None,
+                experiment_id=known_ids,
+                source=0,
+            )
+        except ValueError as err:
+            _logger.warning(f"unable to short circuit design, running all experiments: {err}")
+            return None
+        if isinstance(stored.index, pd.MultiIndex):
+            stored.index = stored.index.get_level_values('experiment')
+        stored = stored[~stored.index.duplicated()].dropna(how='all')
+        ex_ids = np.asarray([-1 if i is None else i for i in ex_ids], dtype=np.int64)
+        found = np.isin(ex_ids, stored.index.to_numpy())
+        result = stored.loc[ex_ids[found]]
+        result.index = np.flatnonzero(found)
+        return result
+
     def async_experiments(
             self,
             design:pd.DataFrame=None,
@@ -1025,6 +1078,30 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
                 db.write_experiment_measures(self.scope.name, metamodel_id, outcomes)
             return result
 
+        evaluator = prepare_evaluator(evaluator, self)
+
+        # Experiments with results already in the database are not
+        # dispatched, unless the evaluator is asynchronous, in which case
+        # AsyncExperimentalDesign does this before calling here.
+        stored_outcomes = None
+        if allow_short_circuit is None:
+            allow_short_circuit_ = self.allow_short_circuit
+        else:
+            allow_short_circuit_ = allow_short_circuit
+        if allow_short_circuit_ and not getattr(evaluator, 'asynchronous', False):
+            stored_outcomes = self._stored_outcomes(design, db)
+        if stored_outcomes is not None and len(stored_outcomes):
+            self.log(
+                f"short circuit {len(stored_outcomes)} of {len(design)} "
+                f"experiments with results already in the database"
+            )
+            full_design = design
+            pending = np.ones(len(full_design), dtype=bool)
+            pending[stored_outcomes.index] = False
+            design = full_design.iloc[pending]
+        else:
+            stored_outcomes = None
+
         scenarios = []
         scenario_cols = self.scope._get_uncertainty_and_constant_names()
         design_scenarios = design[scenario_cols]
@@ -1047,8 +1124,6 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             for n,i in enumerate(design[lever_names].itertuples(index=False, name='ExperimentL'))
         ]
 
-        evaluator = prepare_evaluator(evaluator, self)
-
         if getattr(evaluator, 'asynchronous', False):
             # When the evaluator is in asynchronous mode, the core model runs will be
             # dispatched here but the function will not block waiting on the result, and
@@ -1085,19 +1160,24 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
                     self.allow_short_circuit = allow_short_circuit
                 else:
                     _stored_allow_short_circuit = None
+                start_time = time.time()
                 try:
-                    experiments, outcomes = perform_experiments(
-                        self,
-                        scenarios=scenarios,
-                        policies=policies,
-                        zip_over={'scenarios', 'policies'},
-                        evaluator=evaluator,
-                    )
+                    if len(design):
+                        experiments, outcomes = perform_experiments(
+                            self,
+                            scenarios=scenarios,
+                            policies=policies,
+                            zip_over={'scenarios', 'policies'},
+                            evaluator=evaluator,
+                        )
+                    else:
+                        experiments, outcomes = pd.DataFrame(index=design.index), {}
                 finally:
                     if _stored_db:
                         self.db = _stored_db
                     if _stored_allow_short_circuit is not None:
                         self.allow_short_circuit = _stored_allow_short_circuit
+                run_time = time.time() - start_time
             experiments.index = design.index
 
             outcomes = pd.DataFrame.from_dict(outcomes)
@@ -1117,10 +1197,21 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             for i in self.scope.get_constants():
                 experiments_[i.name] = i.value
 
-            result = self.ensure_dtypes(pd.concat([
+            result = pd.concat([
                 experiments_,
                 outcomes
-            ], axis=1, sort=False))
+            ], axis=1, sort=False)
+
+            if stored_outcomes is not None:
+                if len(design):
+                    self.log(
+                        f"short circuit saved an estimated "
+                        f"{run_time / len(design) * len(stored_outcomes):.1f} seconds"
+                    )
+                result = self._merge_stored_outcomes(result, full_design, stored_outcomes)
+                design = full_design
+
+            result = self.ensure_dtypes(result)
             from ..experiment.experimental_design import ExperimentalDesign
             result = ExperimentalDesign(result)
             result.scope = self.scope
@@ -1128,6 +1219,43 @@ class AbstractCoreModel(abc.ABC, AbstractWorkbenchModel):
             result.sampler_name = getattr(design, 'sampler_name', None)
             return result
 
+    def _merge_stored_outcomes(self, result, design, stored_outcomes):
+        """
+        Merge results from the database back into the results of a run.
+
+        Args:
+            result (pandas.DataFrame): The inputs and outcomes of the
+                experiments in `design` that were actually run.
+            design (pandas.DataFrame): The complete design.
+            stored_outcomes (pandas.DataFrame): Stored outcomes of the
+                rest of the experiments, indexed by position in `design`.
+
+        Returns:
+            pandas.DataFrame
+        """
+        stored_inputs = design.iloc[stored_outcomes.index].reindex(
+            columns=self.scope.get_uncertainty_names() + self.scope.get_lever_names(),
+        )
+        for i in self.scope.get_constants():
+            stored_inputs[i.name] = i.value
+        stored = pd.concat([
+            stored_inputs.set_axis(stored_outcomes.index, axis=0),
+            stored_outcomes.reindex(columns=self.scope.get_measure_names()),
+        ], axis=1, sort=False)
+        pending = np.ones(len(design), dtype=bool)
+        pending[stored_outcomes.index] = False
+        if len(result):
+            columns = result.columns.append(stored.columns.difference(result.columns, sort=False))
+        else:
+            columns = stored.columns
+        merged = pd.concat([
+            result.set_axis(np.flatnonzero(pending), axis=0),
+            stored,
+        ], sort=False).sort_index()
+        merged = merged.reindex(columns=columns)
+        merged.index = design.index
+        return merged
+
     def run_reference_experiment(
             self,
             evaluator=None,
@@ -3,6 +3,7 @@
 import pandas
 import numpy
 import warnings
+from collections import OrderedDict
 from typing import Mapping
 from ..learn.base import clone_or_construct
 from ..learn.boosting import LinearAndGaussian
@@ -132,7 +133,8 @@ def create_metamodel(
 
     if find_best_metamodeltype:
         output_transforms, metamodeltype_tabulation = select_best_metamodeltype(
-            experiment_inputs, experiment_outputs, return_tabulation=True
+            experiment_inputs, experiment_outputs, return_tabulation=True,
+            regressor=regressor,
         )
         output_transforms = dict(output_transforms)
     else:
@@ -267,6 +269,10 @@ class MetaModel:
         'clip': (lambda x: (lambda y: y), lambda x: (lambda y: numpy.clip(y, *x))),
     }
 
+    prediction_chunk_size = 10000
+    """int: The maximum number of experiments evaluated in a single
+    call to the regression when evaluating a DataFrame of inputs."""
+
     def __init__(
             self,
             input_sample,
@@ -394,10 +400,10 @@ class MetaModel:
         """
         if len(args) == 1:
             if isinstance(args[0], pandas.DataFrame):
-                return args[0].apply(
-                    lambda x: pandas.Series(self.__call__(**x)),
-                    axis=1,
-                )
+                result, _ = self._predict_chunked(args[0])
+                for i in (self.disabled_outputs or ()):
+                    result[i] = None
+                return result
             else:
                 raise TypeError(f'mm(...) optionally takes a DataFrame as a '
                                 f'positional argument, not {type(args[0])}')
@@ -406,7 +412,7 @@ class MetaModel:
                             f'positional argument, not {len(args)}')
 
         input_row = pandas.DataFrame.from_dict(kwargs, orient='index').T[self.raw_input_columns]
-        input_row = self.preprocess_raw_input(input_row, to_type=numpy.float)
+        input_row = self.preprocess_raw_input(input_row, to_type=numpy.float64)
 
         output_row = self.regression.predict(input_row)
         result = dict(output_row.iloc[0])
@@ -437,10 +443,10 @@ class MetaModel:
         """
         if len(args) == 1:
             if isinstance(args[0], pandas.DataFrame):
-                return args[0].apply(
-                    lambda x: pandas.Series(self.compute_std(**x)),
-                    axis=1,
-                )
+                _, result = self._predict_chunked(args[0], return_std=True)
+                for i in (self.disabled_outputs or ()):
+                    result[i] = None
+                return result
             else:
                 raise TypeError(f'compute_std() optionally takes a DataFrame as a '
                                 f'positional argument, not {type(args[0])}')
@@ -449,7 +455,7 @@ class MetaModel:
                             f'positional argument, not {len(args)}')
 
         input_row = pandas.DataFrame.from_dict(kwargs, orient='index').T[self.raw_input_columns]
-        input_row = self.preprocess_raw_input(input_row, to_type=numpy.float)
+        input_row = self.preprocess_raw_input(input_row, to_type=numpy.float64)
 
         output_row, output_std = self.regression.predict(input_row, return_std=True)
 
@@ -464,6 +470,85 @@ class MetaModel:
 
         return result
 
+    def predict_std(self, df):
+        """
+        Generate predictions and their standard deviations together.
+
+        This evaluates the regression once per chunk of
+        `prediction_chunk_size` experiments, which is much faster
+        than calling the meta-model and `compute_std` separately.
+
+        Args:
+            df (pandas.DataFrame):
+                The raw input data, with one row per experiment.
+
+        Returns:
+            Tuple[pandas.DataFrame, pandas.DataFrame]:
+                The predicted performance measures, with output
+                transforms undone, and the standard deviations of
+                these estimates, which (as in `compute_std`) are in
+                the transformed space.  Disabled outputs are omitted.
+        """
+        result, result_std = self._predict_chunked(df, return_std=True)
+        if self.disabled_outputs:
+            drop_cols = [i for i in self.disabled_outputs if i in result.columns]
+            result = result.drop(drop_cols, axis=1)
+            result_std = result_std.drop(drop_cols, axis=1)
+        return result, result_std
+
+    def _predict_chunked(self, df, return_std=False):
+        """
+        Evaluate the regression on raw inputs, one chunk of rows at a time.
+
+        Args:
+            df (pandas.DataFrame): The raw input data.
+            return_std (bool, default False): Also compute standard
+                deviations of the estimates.
+
+        Returns:
+            Tuple[pandas.DataFrame, pandas.DataFrame or None]:
+                Predictions with output transforms undone, and
+                standard deviations in the transformed space.
+        """
+        chunk_size = max(int(self.prediction_chunk_size), 1)
+        output_columns = self.output_sample.columns
+
+        def as_frame(y, index):
+            if isinstance(y, pandas.DataFrame):
+                y = y.copy(deep=False)
+                y.index = index
+                return y
+            return pandas.DataFrame(y, index=index, columns=output_columns)
+
+        predictions, stds = [], []
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size]
+            input_rows = self.preprocess_raw_input(chunk, to_type=numpy.float64)
+            if return_std:
+                y, y_std = self.regression.predict(input_rows, return_std=True)
+                stds.append(as_frame(y_std, chunk.index))
+            else:
+                y = self.regression.predict(input_rows)
+            predictions.append(as_frame(y, chunk.index))
+
+        if predictions:
+            result = pandas.concat(predictions) if len(predictions) > 1 else predictions[0]
+        else:
+            result = pandas.DataFrame(index=df.index, columns=output_columns, dtype=numpy.float64)
+        if return_std:
+            if stds:
+                result_std = pandas.concat(stds) if len(stds) > 1 else stds[0]
+            else:
+                result_std = result.copy()
+        else:
+            result_std = None
+
+        # undo the output transforms
+        for k, (_, v_func) in self.output_transforms.items():
+            result[k] = v_func(result[k])
+
+        return result, result_std
+
     def predict(self, *args, trend_only=False, residual_only=False, **kwargs):
         """
         Generate predictions using the meta-model.
@@ -849,7 +934,9 @@ class MetaModel:
             plot=True,
     ):
         _logger.info(f"computing density")
-        candidate_density = candidate_experiments.apply(lambda x: scope.get_density(x), axis=1)
+        log_density = scope.logpdf(candidate_experiments)
+        # relative to the densest candidate, so the product over many parameters does not underflow
+        candidate_density = numpy.exp(log_density - log_density.max())
 
         if poorness_of_fit is None:
             _logger.info(f"computing poorness of fit")
@@ -899,6 +986,55 @@ class MetaModel:
         return proposed_candidates
 
 
+_metamodeltype_cache = OrderedDict()
+
+_METAMODELTYPE_CACHE_SIZE = 16
+"""int: The number of `select_best_metamodeltype` results cached in memory."""
+
+
+def _estimator_params(estimator):
+    """
+    Describe an estimator by all its (nested) parameters, for a cache key.
+
+    Parameters that are themselves estimators or kernels are described
+    by their type, as their own parameters are also included.
+    """
+    return [
+        (k, f"{type(v).__module__}.{type(v).__qualname__}" if hasattr(v, 'get_params') else repr(v))
+        for k, v in sorted(estimator.get_params(deep=True).items())
+    ]
+
+
+def _cross_val_fold_scores(
+        regressor,
+        X,
+        Y,
+        train,
+        test,
+        suppress_converge_warnings=True,
+):
+    """
+    Fit a clone of `regressor` on one training fold and score each output.
+
+    Returns:
+        numpy.ndarray: The R^2 score of each column of `Y` on the
+            testing fold, or all NaN if the fit fails.
+    """
+    from sklearn.base import clone
+    from ..learn.model_selection import multiscore
+    estimator = clone(regressor)
+    try:
+        with warnings.catch_warnings():
+            if suppress_converge_warnings:
+                from sklearn.exceptions import ConvergenceWarning
+                warnings.filterwarnings("ignore", category=ConvergenceWarning)
+            estimator.fit(X.iloc[train], Y.iloc[train])
+            return multiscore(Y.iloc[test], estimator.predict(X.iloc[test]))
+    except Exception as err:
+        warnings.warn(f"cross-validation fit failed: {err!r}")
+        return numpy.full(Y.shape[1], numpy.nan)
+
+
 def select_best_metamodeltype(
         params,
         measures,
@@ -908,53 +1044,188 @@ def select_best_metamodeltype(
         n_repeats=3,
         regressor=None,
         return_tabulation=False,
+        n_jobs=-1,
+        client=None,
+        use_cache=True,
+        cache_dir=None,
 ):
+    """
+    Find the best metamodeltype for each performance measure.
+
+    Each candidate transform is scored by cross-validation of the
+    regressor on the transformed measures.  The inputs are preprocessed
+    and the cross-validation splits are drawn only once, and then every
+    (transform, fold, repeat) combination is fit as an independent job,
+    either on a local process pool or on a dask.distributed cluster.
+
+    Args:
+        params (pandas.DataFrame): The experimental inputs.
+        measures (pandas.DataFrame): The experimental outputs.
+        random_state (int, default 0): Random state used to draw the
+            cross-validation splits, and passed to the regressor
+            if it has a `random_state` parameter.
+        suppress_converge_warnings (bool, default True):
+            Suppress convergence warnings during fitting.
+        possible_types (Collection[str], optional): The candidate
+            metamodeltypes, by default 'linear', 'log', 'log1p',
+            'logit', and 'exp'.
+        n_repeats (int, default 3): The number of times to repeat
+            the cross-validation with different random splits.
+        regressor (Estimator, optional): The regressor to
+            cross-validate, by default `LinearAndGaussian`.
+        return_tabulation (bool, default False): Also return the
+            table of cross-validation scores.
+        n_jobs (int, default -1): The number of worker processes
+            used to fit the cross-validation jobs locally.
+        client (dask.distributed.Client, optional): If given, the
+            cross-validation jobs are run on this client instead
+            of a local process pool.
+        use_cache (bool, default True): Reuse results from a recent
+            search on identical data in this session.  Results are
+            never cached when `random_state` is None, so that each
+            search uses fresh random splits.
+        cache_dir (path-like, optional): A directory in which to
+            cache results on disk, so they persist across sessions.
+
+    Returns:
+        pandas.Series: The best metamodeltype for each measure.
+        pandas.DataFrame: The cross-validation scores of each
+            metamodeltype, only if `return_tabulation` is True.
+    """
     if possible_types is None:
         possible_types = {'linear', 'log', 'log1p', 'logit', 'exp'}
 
     if regressor is None:
-        from ..learn.boosting import LinearAndGaussian
         regressor = LinearAndGaussian
+    regressor = clone_or_construct(regressor)
+    if random_state is not None and 'random_state' in regressor.get_params():
+        regressor.set_params(random_state=random_state)
 
-    def _metamodel_scores(t, filter_cols):
-        if t in possible_types and len(filter_cols):
-            result = MetaModel(
-                params,
-                measures[filter_cols],
-                {
-                    i: t
-                    for i in filter_cols
-                },
-                disabled_outputs=None,
-                random_state=random_state,
-                suppress_converge_warnings=suppress_converge_warnings,
-                regressor=LinearAndGaussian,
-            ).cross_val_scores(
-                random_state=random_state,
-                n_repeats=n_repeats,
-            ).data
-            result.columns = [t]
-            return result
-        else:
-            return pandas.Series(-2.0, index=filter_cols, name=t)
-
-    scores = [pandas.Series(-1.0, index=measures.columns, name='linear')]
-    scores.append(_metamodel_scores('linear', measures.columns))
-
-    check_log = measures.columns[(measures.min() > 0)]
-    scores.append(_metamodel_scores('log', check_log))
+    if random_state is None:
+        use_cache = False
+        cache_dir = None
 
-    check_log1p = measures.columns[(measures.min() > -1)]
-    scores.append(_metamodel_scores('log1p', check_log1p))
+    from ..util.hasher import hash_it
+    cache_key = hash_it(
+        params,
+        measures,
+        sorted(possible_types),
+        random_state,
+        n_repeats,
+        type(regressor).__qualname__,
+        _estimator_params(regressor),
+    )
+    tabulation = _metamodeltype_cache.get(cache_key) if use_cache else None
+    cache_file = None
+    if tabulation is None and cache_dir is not None:
+        from ..util.disk_cache import load_cache_if_available
+        tabulation, cache_file = load_cache_if_available(
+            cache_dir=cache_dir,
+            cache_key=cache_key,
+        )
 
-    check_logit = measures.columns[(measures.min() > 0) & (measures.max() < 1)]
-    scores.append(_metamodel_scores('logit', check_logit))
+    if tabulation is None:
+        tabulation = _tabulate_metamodeltype_scores(
+            params,
+            measures,
+            random_state=random_state,
+            suppress_converge_warnings=suppress_converge_warnings,
+            possible_types=possible_types,
+            n_repeats=n_repeats,
+            regressor=regressor,
+            n_jobs=n_jobs,
+            client=client,
+        )
+        if cache_file is not None:
+            from ..util.disk_cache import save_cache
+            save_cache(tabulation, cache_file)
 
-    check_exp = measures.columns[(measures.max() < 10)]
-    scores.append(_metamodel_scores('exp', check_exp))
+    if use_cache:
+        _metamodeltype_cache[cache_key] = tabulation
+        _metamodeltype_cache.move_to_end(cache_key)
+        while len(_metamodeltype_cache) > _METAMODELTYPE_CACHE_SIZE:
+            _metamodeltype_cache.popitem(last=False)
+    tabulation = tabulation.copy()
 
-    tabulation = pandas.concat(scores, axis=1)
     if return_tabulation:
         return tabulation.idxmax(axis=1), tabulation
     else:
-        return tabulation.idxmax(axis=1)
\ No newline at end of file
+        return tabulation.idxmax(axis=1)
+
+
+def _tabulate_metamodeltype_scores(
+        params,
+        measures,
+        random_state,
+        suppress_converge_warnings,
+        possible_types,
+        n_repeats,
+        regressor,
+        n_jobs,
+        client,
+):
+    from ..learn.model_selection import check_cv
+
+    # Preprocess the inputs exactly as MetaModel does, once for all transforms
+    X = OneHotCatEncoder().fit(params).transform(params).astype(numpy.float64)
+    X = VarianceThreshold().fit(X).transform(X)
+    measures = measures.astype(float)
+    splits = list(
+        check_cv(5, random_state=random_state, n_repeats=n_repeats).split(X, measures)
+    )
+
+    candidates = {
+        'linear': measures.columns,
+        'log': measures.columns[(measures.min() > 0)],
+        'log1p': measures.columns[(measures.min() > -1)],
+        'logit': measures.columns[(measures.min() > 0) & (measures.max() < 1)],
+        'exp': measures.columns[(measures.max() < 10)],
+    }
+    transformed = {}
+    for t, filter_cols in candidates.items():
+        if t in possible_types and len(filter_cols):
+            Y = measures[filter_cols].copy()
+            if t != 'linear':
+                v_func = MetaModel._metamodel_types[t][0]
+                for k in filter_cols:
+                    Y[k] = v_func(Y[k])
+            transformed[t] = Y
+
+    jobs = [(t, train, test) for t in transformed for train, test in splits]
+    if client is not None:
+        X_ = client.scatter(X, broadcast=True)
+        Y_ = {t: client.scatter(Y, broadcast=True) for t, Y in transformed.items()}
+        futures = [
+            client.submit(
+                _cross_val_fold_scores, regressor, X_, Y_[t], train, test,
+                suppress_converge_warnings, pure=False,
+            )
+            for t, train, test in jobs
+        ]
+        fold_scores = client.gather(futures)
+    else:
+        from joblib import Parallel, delayed
+        from ..util import n_jobs_cap
+        fold_scores = Parallel(n_jobs=n_jobs_cap(n_jobs))(
+            delayed(_cross_val_fold_scores)(
+                regressor, X, transformed[t], train, test,
+                suppress_converge_warnings,
+            )
+            for t, train, test in jobs
+        )
+
+    by_transform = {}
+    for (t, _, _), s in zip(jobs, fold_scores):
+        by_transform.setdefault(t, []).append(s)
+
+    scores = [pandas.Series(-1.0, index=measures.columns, name='linear')]
+    for t, filter_cols in candidates.items():
+        if t in transformed:
+            scores.append(pandas.Series(
+                numpy.mean(by_transform[t], axis=0),
+                index=filter_cols,
+                name=t,
+            ))
+        else:
+            scores.append(pandas.Series(-2.0, index=filter_cols, name=t))
+    return pandas.concat(scores, axis=1)
@@ -0,0 +1,222 @@
+import numpy
+
+from scipy.linalg import cholesky, cho_solve, solve_triangular
+from scipy.optimize import minimize
+
+from sklearn.base import RegressorMixin, BaseEstimator, clone
+from sklearn.utils import check_random_state
+from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
+
+from .cross_val import CrossValMixin
+
+
+def _log_marginal_likelihood(theta, kernel, X, Y, alpha):
+	"""
+	Total log marginal likelihood of all targets, and its gradient.
+
+	All targets share the kernel, so the kernel matrix is factorized
+	once, and the targets are solved together.
+	"""
+	kernel = kernel.clone_with_theta(theta)
+	K, K_gradient = kernel(X, eval_gradient=True)
+	K[numpy.diag_indices_from(K)] += alpha
+	try:
+		L = cholesky(K, lower=True, check_finite=False)
+	except numpy.linalg.LinAlgError:
+		return -numpy.inf, numpy.zeros_like(theta)
+	n_samples, n_targets = Y.shape
+	A = cho_solve((L, True), Y, check_finite=False)
+	lml = (
+		- 0.5 * numpy.einsum("ik,ik->", Y, A)
+		- n_targets * numpy.log(numpy.diag(L)).sum()
+		- n_targets * n_samples / 2 * numpy.log(2 * numpy.pi)
+	)
+	inner = A @ A.T - n_targets * cho_solve((L, True), numpy.eye(n_samples), check_finite=False)
+	gradient = 0.5 * numpy.einsum("ij,jik->k", inner, K_gradient)
+	return lml, gradient
+
+
+def _optimize_from(initial_theta, kernel, X, Y, alpha, bounds):
+	def obj(theta):
+		lml, grad = _log_marginal_likelihood(theta, kernel, X, Y, alpha)
+		return -lml, -grad
+	result = minimize(obj, initial_theta, method="L-BFGS-B", jac=True, bounds=bounds)
+	return result.x, -result.fun
+
+
+class SharedKernelGaussianProcess(BaseEstimator, RegressorMixin, CrossValMixin):
+	"""
+	Gaussian process regression for multiple targets sharing one kernel.
+
+	Unlike wrapping a `GaussianProcessRegressor` in a `MultiOutputRegressor`,
+	which fits an independent process (with its own hyperparameter search
+	and O(n³) factorization) for every target, this estimator fits one
+	set of kernel hyperparameters that maximizes the total log marginal
+	likelihood of all targets.  The kernel matrix is factorized once per
+	likelihood evaluation, all targets are solved together, and the
+	optimizer restarts run in parallel.  This works best when the targets
+	are on comparable scales, e.g. after standardization.
+
+	Parameters
+	----------
+	kernel : kernel object, optional
+		The kernel specifying the covariance function of the GP. Defaults
+		to a constant times an isotropic RBF kernel.
+
+	alpha : float, optional (default: 1e-10)
+		Value added to the diagonal of the kernel matrix during fitting.
+
+	n_restarts_optimizer : int, optional (default: 0)
+		The number of restarts of the optimizer, from thetas sampled
+		log-uniform randomly from the space of allowed theta-values.
+
+	random_state : int, RandomState instance or None, optional (default: None)
+		The generator used to draw the optimizer restarts.
+
+	n_jobs : int, optional
+		The number of jobs used to run optimizer restarts in parallel.
+
+	Attributes
+	----------
+	kernel_ : kernel object
+		The kernel with optimized hyperparameters.
+
+	L_ : array-like, shape = (n_samples, n_samples)
+		Lower-triangular Cholesky factor of the kernel matrix, shared
+		by all targets.
+
+	alpha_ : array-like, shape = (n_samples, n_targets)
+		Dual coefficients of the training data points in kernel space.
+	"""
+
+	def __init__(
+			self,
+			kernel=None,
+			alpha=1e-10,
+			n_restarts_optimizer=0,
+			random_state=None,
+			n_jobs=None,
+	):
+		self.kernel = kernel
+		self.alpha = alpha
+		self.n_restarts_optimizer = n_restarts_optimizer
+		self.random_state = random_state
+		self.n_jobs = n_jobs
+
+	def fit(self, X, Y):
+		"""
+		Fit the shared-kernel Gaussian process model.
+
+		Parameters
+		----------
+		X : array-like, shape = (n_samples, n_features)
+			Training data
+		Y : array-like, shape = (n_samples, n_targets)
+			Target values.
+
+		Returns
+		-------
+		self
+		"""
+		if self.kernel is None:
+			kernel = C() * RBF()
+		else:
+			kernel = clone(self.kernel)
+		X = numpy.asarray(X, dtype=float)
+		Y = numpy.asarray(Y, dtype=float)
+		if Y.ndim == 1:
+			Y = Y[:, None]
+
+		if kernel.n_dims and kernel.theta.size:
+			bounds = kernel.bounds
+			starts = [kernel.theta]
+			if self.n_restarts_optimizer > 0:
+				if not numpy.isfinite(bounds).all():
+					raise ValueError(
+						"Multiple optimizer restarts (n_restarts_optimizer>0) "
+						"requires that all bounds are finite."
+					)
+				rng = check_random_state(self.random_state)
+				starts += [
+					rng.uniform(bounds[:, 0], bounds[:, 1])
+					for _ in range(self.n_restarts_optimizer)
+				]
+			from joblib import Parallel, delayed
+			from ..util import n_jobs_cap
+			optima = Parallel(n_jobs=n_jobs_cap(self.n_jobs))(
+				delayed(_optimize_from)(theta, kernel, X, Y, self.alpha, bounds)
+				for theta in starts
+			)
+			best_theta, best_lml = max(optima, key=lambda i: i[1])
+			kernel = kernel.clone_with_theta(best_theta)
+			self.log_marginal_likelihood_value_ = best_lml
+		else:
+			self.log_marginal_likelihood_value_ = _log_marginal_likelihood(
+				kernel.theta, kernel, X, Y, self.alpha,
+			)[0]
+
+		self.kernel_ = kernel
+		self._set_training_data(X, Y)
+		return self
+
+	def _set_training_data(self, X, Y):
+		"""
+		Factorize the kernel matrix for new training data.
+
+		The kernel hyperparameters are not changed.
+		"""
+		self.X_train_ = X
+		self.y_train_ = Y
+		K = self.kernel_(X)
+		K[numpy.diag_indices_from(K)] += self.alpha
+		try:
+			self.L_ = cholesky(K, lower=True)
+		except numpy.linalg.LinAlgError as exc:
+			exc.args = ("The kernel, %s, is not returning a "
+						"positive definite matrix. Try gradually "
+						"increasing the 'alpha' parameter of your "
+						"SharedKernelGaussianProcess estimator."
+						% self.kernel_,) + exc.args
+			raise
+		self.alpha_ = cho_solve((self.L_, True), Y)
+
+	@property
+	def estimators_(self):
+		"""list: This estimator once per target, for compatibility with MultiOutputRegressor."""
+		return [self] * self.alpha_.shape[1]
+
+	def predict(self, X, return_std=False):
+		"""
+		Predict using the Gaussian process model.
+
+		Parameters
+		----------
+		X : array-like, shape = (n_samples, n_features)
+		return_std : bool, default False
+			Also return the standard deviation of the predictions.
+
+		Returns
+		-------
+		y_mean : array, shape = (n_samples, n_targets)
+		y_std : array, shape = (n_samples, n_targets), optional
+		"""
+		X = numpy.asarray(X, dtype=float)
+		K_trans = self.kernel_(X, self.X_train_)
+		y_mean = K_trans @ self.alpha_
+		if not return_std:
+			return y_mean
+		v = solve_triangular(self.L_, K_trans.T, lower=True, check_finite=False)
+		y_var = self.kernel_.diag(X) - numpy.einsum("ij,ij->j", v, v)
+		y_std = numpy.sqrt(numpy.clip(y_var, 0, None))
+		return y_mean, numpy.repeat(y_std[:, None], y_mean.shape[1], axis=1)
+
+	def predict_std(self, X, return_std=True):
+		"""
+		Predict using the model, also returning standard deviations.
+
+		This mirrors the `predict_std` method used on
+		`MultiOutputRegressor`, but reuses the shared factorization.
+		"""
+		if not return_std:
+			raise TypeError('only use predict_std to access return_std')
+		return self.predict(X, return_std=True)
@@ -5,7 +5,7 @@ import numpy
 import scipy.stats
 import warnings
 
-from scipy.linalg import cholesky, cho_solve
+from scipy.linalg import cholesky, cho_solve, solve_triangular
 
 from sklearn.base import RegressorMixin, BaseEstimator
 from sklearn.gaussian_process import GaussianProcessRegressor
@@ -24,6 +24,48 @@ from .detrend import DetrendMixin
 from .base import MultiOutputRegressor
 from .select import SelectNAndKBest, feature_concat
 from .frameable import FrameableMixin
+from .shared_kernel import SharedKernelGaussianProcess
+
+def _cholesky_append(L, K12, K22):
+	"""
+	Extend a lower Cholesky factor with new rows and columns.
+
+	Given the factor `L` of a matrix K11, this returns the factor of
+	[[K11, K12], [K12ᵀ, K22]], at a cost of O(n²m) for m new rows
+	instead of the O((n+m)³) of factorizing from scratch.
+	"""
+	n, m = L.shape[0], K22.shape[0]
+	L21 = solve_triangular(L, K12, lower=True, check_finite=False).T
+	out = numpy.zeros((n + m, n + m))
+	out[:n, :n] = L
+	out[n:, :n] = L21
+	out[n:, n:] = cholesky(K22 - L21 @ L21.T, lower=True, check_finite=False)
+	return out
+
+
+def _cholesky_delete(L, i):
+	"""
+	Remove row and column `i` from the matrix factorized by `L`.
+
+	The rows before `i` are unchanged, and the trailing block gets a
+	rank-one update, at a cost of O((n-i)²).
+	"""
+	n = L.shape[0]
+	out = numpy.zeros((n - 1, n - 1))
+	out[:i, :i] = L[:i, :i]
+	out[i:, :i] = L[i + 1:, :i]
+	L33 = L[i + 1:, i + 1:].copy()
+	x = L[i + 1:, i].copy()
+	for k in range(n - i - 1):
+		r = numpy.hypot(L33[k, k], x[k])
+		c = r / L33[k, k]
+		s = x[k] / L33[k, k]
+		L33[k, k] = r
+		L33[k + 1:, k] = (L33[k + 1:, k] + s * x[k + 1:]) / c
+		x[k + 1:] = c * x[k + 1:] - s * L33[k + 1:, k]
+	out[i:, i:] = L33
+	return out
+
 
 def _make_as_vector(y):
 	# if isinstance(y, (pandas.DataFrame, pandas.Series)):
@@ -38,6 +80,37 @@ class MultipleTargetRegression(
 		CrossValMixin,
 		FrameableMixin,
 ):
+	"""
+	Multi-target Gaussian process regression (GPR).
+
+	Parameters
+	----------
+	standardize_before_fit : bool, optional (default: True)
+		Whether to rescale the columns of Y to have unit variance
+		before fitting.
+
+	n_restarts_optimizer : int, optional (default: 250)
+		The number of restarts of the optimizer for finding the kernel's
+		parameters which maximize the log-marginal likelihood.
+
+	copy_X_train : bool, optional (default: True)
+		If True, a persistent copy of the training data is stored in the
+		object.
+
+	random_state : int, RandomState instance or None, optional (default: None)
+		The generator used to initialize the optimizer restarts.
+
+	shared_kernel : bool, optional (default: False)
+		If True, all targets share one kernel, fitted with a
+		`SharedKernelGaussianProcess`, so the kernel matrix is factorized
+		once for all targets instead of once per target.  Otherwise an
+		independent Gaussian process is fitted for each target.
+
+	n_jobs : int, optional
+		The number of jobs to run in parallel, for fitting the independent
+		per-target processes, or for the optimizer restarts of the shared
+		kernel.
+	"""
 
 	def __init__(
 			self,
@@ -45,11 +118,15 @@ class MultipleTargetRegression(
 			n_restarts_optimizer=250,
 			copy_X_train=True,
 			random_state=None,
+			shared_kernel=False,
+			n_jobs=None,
 	):
 		self.standardize_before_fit = standardize_before_fit
 		self.n_restarts_optimizer = n_restarts_optimizer
 		self.copy_X_train = copy_X_train
 		self.random_state = random_state
+		self.shared_kernel = shared_kernel
+		self.n_jobs = n_jobs
 		if standardize_before_fit:
 			self._kernel_generator = lambda dims: RBF([1.0] * dims)
 		else:
@@ -78,12 +155,20 @@ class MultipleTargetRegression(
 			self.X_train_ = numpy.copy(X) if self.copy_X_train else X
 			self.Y_train_ = numpy.copy(Y) if (self.copy_X_train or self.standardize_before_fit) else Y
 
-			self.step1 = MultiOutputRegressor(GaussianProcessRegressor(
-				kernel=self._kernel_generator(X.shape[1]),
-				n_restarts_optimizer=self.n_restarts_optimizer,
-				copy_X_train=False,
-				random_state=self.random_state,
-			))
+			if getattr(self, 'shared_kernel', False):
+				self.step1 = SharedKernelGaussianProcess(
+					kernel=self._kernel_generator(X.shape[1]),
+					n_restarts_optimizer=self.n_restarts_optimizer,
+					random_state=self.random_state,
+					n_jobs=self.n_jobs,
+				)
+			else:
+				self.step1 = MultiOutputRegressor(GaussianProcessRegressor(
+					kernel=self._kernel_generator(X.shape[1]),
+					n_restarts_optimizer=self.n_restarts_optimizer,
+					copy_X_train=False,
+					random_state=self.random_state,
+				), n_jobs=getattr(self, 'n_jobs', None))
 
 			if self.standardize_before_fit:
 				self.standardize_Y = self.Y_train_.std(axis=0, ddof=0)
@@ -240,6 +325,13 @@ class DetrendedMultipleTargetRegression(
 		random_state is the random number generator; If None, the random number
 		generator is the RandomState instance used by `np.random`.
 
+	shared_kernel : bool, optional (default: False)
+		If True, all targets share one kernel, so the kernel matrix is
+		factorized once for all targets instead of once per target.
+
+	n_jobs : int, optional
+		The number of jobs to run in parallel when fitting.
+
 	Attributes
 	----------
 
@@ -256,12 +348,16 @@ class DetrendedMultipleTargetRegression(
 			n_restarts_optimizer=250,
 			copy_X_train=True,
 			random_state=None,
+			shared_kernel=False,
+			n_jobs=None,
 	):
 		super().__init__(
 			standardize_before_fit=standardize_before_fit,
 			n_restarts_optimizer=n_restarts_optimizer,
 			copy_X_train=copy_X_train,
 			random_state=random_state,
+			shared_kernel=shared_kernel,
+			n_jobs=n_jobs,
 		)
 
 	def fit(self, X, Y):
@@ -384,31 +480,105 @@ class DetrendedMultipleTargetRegression(
 	# 		Y = numpy.stack([i.y_train_ for i in self.step1.estimators_]).T
 	# 	return super().cross_val_scores(X,Y,cv)
 
-	def _change_training_data(self, X, Y):
+	def _gaussian_processes(self):
+		"""The step1 estimators that hold a kernel matrix factorization."""
+		if isinstance(self.step1, SharedKernelGaussianProcess):
+			return [self.step1]
+		return list(self.step1.estimators_)
+
+	def _factor_groups(self):
 		"""
-		Swap out X and Y in training data for new arrays.
+		Group the Gaussian processes that share a kernel.
 
-		This method will also pass the new array references to the step1
-		submodels.
+		Returns a list of (estimators, target columns) tuples, where
+		all the estimators in a group have identical kernel matrices,
+		and so share one Cholesky factor.
+		"""
+		if isinstance(self.step1, SharedKernelGaussianProcess):
+			return [([self.step1], slice(None))]
+		groups = []
+		for n, estimator in enumerate(self.step1.estimators_):
+			for members, columns in groups:
+				if members[0].kernel_ == estimator.kernel_ and numpy.array_equal(members[0].alpha, estimator.alpha):
+					members.append(estimator)
+					columns.append(n)
+					break
+			else:
+				groups.append(([estimator], [n]))
+		return groups
 
-		The replacement Y should be pre-standardized if the previous
-		Y was standardized.
+	def set_hypothetical_training_points(self, hX):
 		"""
-		self.X_train_ = numpy.copy(X) if self.copy_X_train else X
-		self.Y_train_ = numpy.copy(Y) if (self.copy_X_train or self.standardize_before_fit) else Y
-
-		if hasattr(self, 'step1'):
-			for n, estimator in enumerate(self.step1.estimators_):
-				estimator.X_train_ = self.X_train_
-				estimator.y_train_ = self.Y_train_[:,n]
-
-				# Precompute quantities required for predictions which are independent
-				# of actual query points
-				K = estimator.kernel_(estimator.X_train_)
-				K[numpy.diag_indices_from(K)] += estimator.alpha
+		Temporarily add hypothetical points to the training data.
+
+		The hypothetical points get the targets currently predicted for
+		them, so they leave the mean prediction nearby unchanged but
+		reduce its standard error.  Points that were already set are
+		kept, and the Cholesky factors of the kernel matrices are
+		downdated for points that are dropped and extended for points
+		that are added, so each change costs O(n²) per point instead of
+		refactorizing the whole kernel matrix.
+
+		Parameters
+		----------
+		hX : array-like, shape = (n_hypothetical, n_features) or None
+			The hypothetical points, replacing any set previously.
+			Give None to clear them.
+		"""
+		if not hasattr(self, 'X_train_original_'):
+			self.X_train_original_ = self.X_train_.copy()
+			self.Y_train_original_ = self.Y_train_.copy()
+			self._hypothetical_X_ = numpy.empty((0, numpy.shape(self.X_train_)[1]))
+			self._original_factors_ = [
+				(estimator.L_, estimator.alpha_)
+				for estimator in self._gaussian_processes()
+			]
+
+		if hX is None or len(hX) == 0:
+			self._restore_original_training_data()
+			return
+
+		if self.standardize_Y is None:
+			hY = self.residual_predict(hX)
+		else:
+			hY = self.residual_predict(hX) / self.standardize_Y
+		hX = numpy.asarray(hX, dtype=float)
+		hY = numpy.asarray(hY, dtype=float)
+
+		# Match the new points to those already in the training data,
+		# which keep their current positions.
+		current = {}
+		for j, row in enumerate(self._hypothetical_X_):
+			current.setdefault(row.tobytes(), []).append(j)
+		kept, added = {}, []
+		for i, row in enumerate(hX):
+			positions = current.get(row.tobytes())
+			if positions:
+				kept[positions.pop(0)] = i
+			else:
+				added.append(i)
+		dropped = [j for positions in current.values() for j in positions]
+		order = [kept[j] for j in sorted(kept)] + added
+
+		n_original = len(self.X_train_original_)
+		X_kept = numpy.vstack([
+			numpy.asarray(self.X_train_original_, dtype=float),
+			self._hypothetical_X_[sorted(kept)],
+		])
+		X_added = hX[added]
+		X = numpy.vstack([X_kept, X_added])
+		Y = numpy.vstack([self.Y_train_original_, hY[order]])
+
+		for members, columns in self._factor_groups():
+			estimator = members[0]
+			L = estimator.L_
+			for j in sorted(dropped, reverse=True):
+				L = _cholesky_delete(L, n_original + j)
+			if added:
+				K22 = estimator.kernel_(X_added)
+				K22[numpy.diag_indices_from(K22)] += estimator.alpha
 				try:
-					estimator.L_ = cholesky(K, lower=True)  # Line 2
-					estimator._K_inv = None  # because self.L_ changed
+					L = _cholesky_append(L, estimator.kernel_(X_kept, X_added), K22)
 				except numpy.linalg.LinAlgError as exc:
 					exc.args = ("The kernel, %s, is not returning a "
 								"positive definite matrix. Try gradually "
@@ -416,32 +586,39 @@ class DetrendedMultipleTargetRegression(
 								"GaussianProcessRegressor estimator."
 								% estimator.kernel_,) + exc.args
 					raise
-				estimator.alpha_ = cho_solve((estimator.L_, True), estimator.y_train_)  # Line 3
-
-	def set_hypothetical_training_points(self, hX):
-
-		if not hasattr(self, 'X_train_original_'):
-			self.X_train_original_ = self.X_train_.copy()
-		if not hasattr(self, 'Y_train_original_'):
-			self.Y_train_original_ = self.Y_train_.copy()
-
-		if hX is None:
-			hY = None
-		else:
-			if self.standardize_Y is None:
-				hY = self.residual_predict(hX).values
+			dual = cho_solve((L, True), Y[:, columns])
+			for k, member in enumerate(members):
+				member.X_train_ = X
+				member.L_ = L
+				if isinstance(member, SharedKernelGaussianProcess):
+					member.y_train_ = Y
+					member.alpha_ = dual
+				else:
+					member.y_train_ = Y[:, columns[k]]
+					member.alpha_ = dual[:, k]
+					member._K_inv = None
+
+		self._hypothetical_X_ = hX[order]
+		self.X_train_ = X
+		self.Y_train_ = Y
+
+	def _restore_original_training_data(self):
+		"""Drop all hypothetical points, restoring the fitted factorizations."""
+		self.X_train_ = self.X_train_original_
+		self.Y_train_ = self.Y_train_original_
+		for n, (estimator, (L, alpha)) in enumerate(zip(self._gaussian_processes(), self._original_factors_)):
+			estimator.X_train_ = self.X_train_
+			estimator.L_ = L
+			estimator.alpha_ = alpha
+			if isinstance(estimator, SharedKernelGaussianProcess):
+				estimator.y_train_ = self.Y_train_
 			else:
-				hY = (
-					self.residual_predict(hX) / self.standardize_Y
-				).values
-
-		extra_X = [hX] if hX is not None else []
-		extra_Y = [hY] if hY is not None else []
-
-		self._change_training_data(
-			numpy.vstack([self.X_train_original_]+extra_X),
-			numpy.vstack([self.Y_train_original_]+extra_Y)
-		)
+				estimator.y_train_ = self.Y_train_[:, n]
+				estimator._K_inv = None
+		del self.X_train_original_
+		del self.Y_train_original_
+		del self._hypothetical_X_
+		del self._original_factors_
 
 	def clear_hypothetical_training_points(self):
 		return self.set_hypothetical_training_points(None)
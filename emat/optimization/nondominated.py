@@ -1,26 +1,14 @@
+import numpy
+import pandas
 
 from ..scope.measure import Measure
 
-def nondominated_solutions(df, scope, robustness_functions, nearly=1e-5):
-	"""
-	Identify the set of non-dominated solutions among a set of candidate solutions.
-
-	Parameters
-	----------
-	df : pandas.DataFrame
-		Candidate solutions
-	scope : emat.Scope
-		The model scope
-	robustness_functions : Collection[emat.Measure], optional
-		Robustness functions
-	nearly : float
-		Threshold for removing nearly duplicate (or actually duplicate) solutions.
+# the number of array cells compared at once in the blocked algorithms
+_BLOCK_CELLS = 1 << 22
 
-	Returns
-	-------
-	pandas.DataFrame
-	"""
 
+def _objectives(df, scope, robustness_functions):
+	"""Get the objectives in `df` as an array, all to be maximized."""
 	keeps = set()
 	flips = set()
 
@@ -41,32 +29,157 @@ def nondominated_solutions(df, scope, robustness_functions, nearly=1e-5):
 	keeps = [k for k in keeps if k in df.columns]
 	flips = [k for k in flips if k in df.columns]
 
-	solutions = df[keeps+flips].copy()
-	solutions[flips] = -solutions[flips]
+	solutions = df[keeps+flips].to_numpy(dtype=float, copy=True)
+	solutions[:, len(keeps):] *= -1
+	return solutions
+
+
+def _dominated_by(a, b):
+	"""Whether each row of `a` is dominated by any row of `b`."""
+	out = numpy.zeros(len(a), dtype=bool)
+	step = max(1, _BLOCK_CELLS // max(1, len(a)))
+	for s in range(0, len(b), step):
+		bb = b[s:s+step]
+		ge = numpy.ones((len(bb), len(a)), dtype=bool)
+		gt = numpy.zeros((len(bb), len(a)), dtype=bool)
+		for c in range(a.shape[1]):
+			ge &= bb[:, c, None] >= a[None, :, c]
+			gt |= bb[:, c, None] > a[None, :, c]
+		out |= (ge & gt).any(axis=0)
+	return out
+
+
+def _pareto_dominated(solutions):
+	"""
+	Find the dominated rows of a finite array of objectives to maximize.
+
+	Two objectives use Kung's sweep over the sorted solutions, more use
+	a blocked sweep that compares each block of sorted solutions against
+	the front found so far.  Identical solutions do not dominate each other.
+	"""
+	n, k = solutions.shape
+	dominated = numpy.zeros(n, dtype=bool)
+	if n == 0 or k == 0:
+		return dominated
+	if k == 1:
+		return solutions[:, 0] < solutions[:, 0].max()
+
+	# sorted descending, a dominating solution always comes first
+	order = numpy.lexsort(-solutions.T[::-1])
+	s = solutions[order]
+
+	if k == 2:
+		first = numpy.ones(n, dtype=bool)
+		first[1:] = s[1:, 0] != s[:-1, 0]
+		group_start = numpy.maximum.accumulate(numpy.where(first, numpy.arange(n), 0))
+		running_max = numpy.maximum.accumulate(s[:, 1])
+		prev_max = numpy.full(n, -numpy.inf)
+		has_prev = group_start > 0
+		prev_max[has_prev] = running_max[group_start[has_prev] - 1]
+		dominated[order] = (s[:, 1] < s[group_start, 1]) | (s[:, 1] <= prev_max)
+		return dominated
 
-	solutions_ = solutions.values
+	front = s[:0]
+	step = max(1, int(numpy.sqrt(_BLOCK_CELLS // k)))
+	for a in range(0, n, step):
+		block = s[a:a+step]
+		dom = _dominated_by(block, front) | _dominated_by(block, block)
+		dominated[order[a:a+step]] = dom
+		front = numpy.concatenate([front, block[~dom]])
+	return dominated
 
-	dominated_solutions = set()
 
-	for i in range(len(solutions)):
-		if i in dominated_solutions:
+def _dominated_in_order(solutions, nearly, start=0):
+	"""
+	Find the dominated rows of an array of objectives to maximize.
+
+	This gives exactly the result of comparing each remaining solution
+	to every later remaining solution in turn, removing the dominated
+	one, or the later one of two nearly identical solutions.  The pairs
+	of solutions are compared in blocks, and only the pairs that are
+	dominated or nearly identical are visited one at a time.  Solutions
+	before `start` are known not to dominate each other, and are only
+	compared to the others.
+	"""
+	n, k = solutions.shape
+	dominated = numpy.zeros(n, dtype=bool)
+	if n == 0 or k == 0:
+		return dominated
+	step = max(1, _BLOCK_CELLS // n)
+	for a in range(0, n, step):
+		rows = numpy.arange(a, min(a+step, n))
+		rows = rows[~dominated[rows]]
+		if len(rows) == 0:
+			continue
+		lo = rows[0] + 1 if rows[-1] >= start else max(rows[0] + 1, start)
+		cols = numpy.flatnonzero(~dominated[lo:]) + lo
+		if len(cols) == 0:
 			continue
-		for j in range(i+1, len(solutions)):
-			if j in dominated_solutions:
+		dmax = numpy.full((len(rows), len(cols)), -numpy.inf)
+		dmin = numpy.full((len(rows), len(cols)), numpy.inf)
+		with numpy.errstate(invalid='ignore'):
+			for c in range(k):
+				diff = solutions[rows, c, None] - solutions[None, cols, c]
+				numpy.maximum(dmax, diff, out=dmax)
+				numpy.minimum(dmin, diff, out=dmin)
+		later = (cols[None, :] > rows[:, None]) & ((rows[:, None] >= start) | (cols[None, :] >= start))
+		drop_i = later & (dmax <= 0) & (dmin < 0)
+		drop_j = later & ~drop_i & (
+			((dmin >= 0) & (dmax > 0)) | ((dmax < nearly) & (dmin > -nearly))
+		)
+		for r in numpy.flatnonzero((drop_i | drop_j).any(axis=1)):
+			if dominated[rows[r]]:
 				continue
-			diff = (solutions_[i] - solutions_[j])
-			dmax, dmin = diff.max(), diff.min()
-			if dmax < 0:
-				dominated_solutions.add(i)
-			elif dmax == 0 and dmin < 0:
-				dominated_solutions.add(i)
-			elif dmin > 0:
-				dominated_solutions.add(j)
-			elif dmin == 0 and dmax > 0:
-				dominated_solutions.add(j)
-			elif nearly and dmax < nearly and dmin > -nearly:
-				dominated_solutions.add(j)
-
-	return df.loc[[k for k in range(len(solutions)) if k not in dominated_solutions]]
+			live = ~dominated[cols]
+			if (drop_i[r] & live).any():
+				dominated[rows[r]] = True
+			dominated[cols[drop_j[r] & live]] = True
+	return dominated
+
+
+def nondominated_solutions(df, scope, robustness_functions, nearly=1e-5, front=None):
+	"""
+	Identify the set of non-dominated solutions among a set of candidate solutions.
+
+	Parameters
+	----------
+	df : pandas.DataFrame
+		Candidate solutions
+	scope : emat.Scope
+		The model scope
+	robustness_functions : Collection[emat.Measure], optional
+		Robustness functions
+	nearly : float
+		Threshold for removing nearly duplicate (or actually duplicate) solutions.
+		Of two nearly duplicate solutions, the one that appears first is kept.
+	front : pandas.DataFrame, optional
+		An existing set of non-dominated solutions, typically the result of
+		an earlier call to this function with the same `nearly`.  The
+		candidate solutions are inserted into this front, which gives the
+		same result as finding the non-dominated solutions of the front
+		followed by the candidates, but the solutions already in the front
+		are not compared to each other again.
+
+	Returns
+	-------
+	pandas.DataFrame
+	"""
+	start = 0
+	if front is not None:
+		start = len(front)
+		df = pandas.concat([front, df])
+
+	solutions = _objectives(df, scope, robustness_functions)
 
+	finite = numpy.isfinite(solutions).all(axis=1)
+	missing = numpy.isnan(solutions).any(axis=1)
+	if nearly or not (finite | missing).all():
+		# infinite objectives cannot be compared to each other, so the
+		# order of comparisons matters and it is followed exactly
+		dominated = _dominated_in_order(solutions, nearly, start)
+	else:
+		# solutions with missing objectives are never dominated
+		dominated = numpy.zeros(len(solutions), dtype=bool)
+		dominated[finite] = _pareto_dominated(solutions[finite])
 
+	return df.iloc[numpy.flatnonzero(~dominated)]
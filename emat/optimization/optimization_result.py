@@ -18,6 +18,7 @@ class OptimizationResult:
 		self.scenarios = scenarios
 		self.policies = policies
 		self.__visualizer = None
+		self._front = None
 
 	@property
 	def scenario(self):
@@ -65,11 +66,21 @@ class OptimizationResult:
 
 		_prev_count = len(self.result)
 
-		self.result = nondominated_solutions(
-			pandas.concat([self.result, alternate_solutions[self.result.columns]]).reset_index(drop=True),
-			self.scope,
-			self.robustness_functions,
-		)
+		if getattr(self, '_front', None) is not None and self._front is self.result:
+			# the result is already non-dominated, only insert the alternates
+			self.result = nondominated_solutions(
+				alternate_solutions[self.result.columns],
+				self.scope,
+				self.robustness_functions,
+				front=self.result,
+			).reset_index(drop=True)
+		else:
+			self.result = nondominated_solutions(
+				pandas.concat([self.result, alternate_solutions[self.result.columns]]).reset_index(drop=True),
+				self.scope,
+				self.robustness_functions,
+			)
+		self._front = self.result
 		net_gain = len(self.result)-_prev_count
 		if net_gain >= 0:
 			_logger.info(f"add_solutions: net gain of {net_gain} solutions")
@@ -21,6 +21,38 @@ _logger = get_module_logger(__name__)
 
 from ..exceptions import *
 
+def _marginal_log_density(parameter, values):
+    """
+    Evaluate the marginal distribution of a parameter on a column of values.
+
+    Categorical and boolean values are evaluated at their position in
+    the parameter's values, the same way they are sampled.
+
+    Returns:
+        Tuple[numpy.ndarray, numpy.ndarray]:
+            The log density (or log probability mass, for discrete
+            parameters), and the cumulative probability at each value.
+            For discrete parameters this is the midpoint of the jump in
+            the cumulative distribution at each value, which is where a
+            Gaussian copula is evaluated.
+    """
+    dist = parameter.dist
+    if parameter.dtype in ('cat', 'bool'):
+        codes = pandas.Categorical(values, categories=parameter.values).codes
+        x = numpy.where(codes >= 0, codes, numpy.nan)
+    else:
+        x = numpy.asarray(values, dtype=float)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        if hasattr(dist, 'logpmf'):
+            log_density = dist.logpmf(x)
+            cdf = (dist.cdf(x) + dist.cdf(x - 1)) / 2
+        else:
+            log_density = dist.logpdf(x)
+            cdf = dist.cdf(x)
+    log_density = numpy.where(numpy.isnan(x), -numpy.inf, log_density)
+    return log_density, cdf
+
+
 def _name_or_dict(x):
     if isinstance(x, rv_frozen):
         x = rv_frozen_as_dict(x)
@@ -834,27 +866,96 @@ class Scope:
         return experimental_design.design_experiments(self, *args, **kwargs)
 
     def _any_correlated_parameters(self):
-        for p in self.get_parameters():
+        for p in self.get_uncertainties() + self.get_levers():
             if len(p.corr):
                 return True
         return False
 
-    def get_density(self, *args, **kwargs):
+    def logpdf(self, experiments):
         """
-        Compute the parametric density at any point.
+        Compute the log of the parametric density of many experiments.
+
+        Each parameter's distribution is evaluated on its whole column
+        at once, and the results are summed in log space, so the joint
+        density of many parameters does not underflow.  Discrete
+        parameters contribute their probability mass.  Parameters
+        missing from `experiments` are evaluated at their default
+        values, and constants are ignored.
+
+        When parameters are correlated, the joint density is that of
+        the Gaussian copula the experimental design samplers use to
+        induce the correlation.  For discrete parameters the copula
+        is evaluated at the middle of the jump in their cumulative
+        distribution, which is an approximation.
+
+        Args:
+            experiments (pandas.DataFrame or Mapping):
+                The experiments, with a column for each parameter.
+
+        Returns:
+            pandas.Series: The log density of each experiment, which is
+                -inf for experiments outside the support of any parameter.
         """
+        if not isinstance(experiments, pandas.DataFrame):
+            experiments = pandas.DataFrame(experiments)
+        parameters = self.get_uncertainties() + self.get_levers()
+        n = len(experiments)
+        total = numpy.zeros(n)
+        cdfs = {}
+        for p in parameters:
+            if p.name in experiments.columns:
+                values = experiments[p.name]
+            else:
+                values = numpy.full(n, p.default, dtype=object)
+            log_density, cdfs[p.name] = _marginal_log_density(p, values)
+            total += log_density
+
         if self._any_correlated_parameters():
-            raise NotImplementedError("density with correlated parameters is coming soon")
+            from scipy.stats import norm
+            from ..experiment.samplers import CorrelatedSampler
+            correlation = CorrelatedSampler().get_correlation_matrix(parameters, none_if_none=True)
+            if correlation is not None:
+                # only the correlated parameters contribute to the copula
+                correlated = (correlation.values != numpy.eye(len(correlation))).any(axis=0)
+                correlation = correlation.loc[correlated, correlated]
+                tiny = numpy.finfo(float).eps
+                z = norm.ppf(numpy.clip(
+                    numpy.column_stack([cdfs[name] for name in correlation.index]),
+                    tiny, 1 - tiny,
+                ))
+                inv = numpy.linalg.inv(correlation.values) - numpy.eye(len(correlation))
+                sign, logdet = numpy.linalg.slogdet(correlation.values)
+                copula = -0.5 * logdet - 0.5 * numpy.einsum('ij,jk,ik->i', z, inv, z)
+                finite = numpy.isfinite(total)
+                total[finite] += copula[finite]
+
+        return pandas.Series(total, index=experiments.index)
+
+    def pdf(self, experiments):
+        """
+        Compute the parametric density of many experiments.
+
+        See `logpdf` for details.
+
+        Args:
+            experiments (pandas.DataFrame or Mapping):
+                The experiments, with a column for each parameter.
+
+        Returns:
+            pandas.Series: The density of each experiment.
+        """
+        return numpy.exp(self.logpdf(experiments))
 
+    def get_density(self, *args, **kwargs):
+        """
+        Compute the parametric density at any point.
+
+        To evaluate many points, use `pdf` instead.
+        """
         if args:
             for arg in args:
                 kwargs.update(arg)
-
-        density = 1.0
-        for p in self.get_parameters():
-            value = kwargs.get(p.name, p.default)
-            density *= p.dist.pdf(value)
-        return density
+        return self.pdf({k: [v] for k, v in kwargs.items()}).iloc[0]
 
     def shortname(self, name):
         """
@@ -1,6 +1,7 @@
 
 import pandas as pd
 import numpy as np
+import hashlib
 from typing import Iterable, cast
 from pandas import Index
 from pandas.core import algorithms as _algorithms
@@ -81,3 +82,107 @@ def report_diff_rows(df_a, df_b):
 	b_in_b = df_b.index.isin(df_b_.index)
 	added_rows = set(df_b.index[~b_in_b])
 	return sorted(changed_rows), sorted(removed_rows), sorted(added_rows)
+
+
+_MAX_EXACT_INT = 2**53
+
+def _canonical_scalar(v):
+	"""
+	Convert a scalar to a (float, str) pair for fingerprinting.
+
+	Numbers and booleans become floats, and text that SQLite would store
+	as a number (under NUMERIC column affinity) is treated as that number,
+	so that values compare the same before and after a database round trip.
+	"""
+	if v is None:
+		return np.nan, ''
+	if isinstance(v, (bool, np.bool_, int, np.integer)):
+		if abs(int(v)) > _MAX_EXACT_INT:
+			return np.nan, f'i{int(v)}'
+		return float(v), ''
+	if isinstance(v, (float, np.floating)):
+		return float(v), ''
+	if isinstance(v, bytes):
+		v = v.decode('utf8', errors='replace')
+	v = str(v)
+	if v == v.strip() and '_' not in v:
+		try:
+			f = float(v)
+		except ValueError:
+			pass
+		else:
+			if np.isfinite(f):
+				return f, ''
+	return np.nan, f's{v}'
+
+
+def fingerprint_rows(df, columns=None):
+	"""
+	Compute a canonical fingerprint for each row of a DataFrame.
+
+	The fingerprint is a 16 byte digest of the row values, normalized
+	so that it does not depend on the dtype used to carry each value:
+	integers, booleans and floats with the same numeric value (and numeric
+	text) share a fingerprint, negative zero matches zero, and all kinds
+	of missing values match each other.  Columns are hashed in sorted name
+	order, so the column order of `df` does not matter.
+
+	Args:
+		df (pandas.DataFrame): The frame to fingerprint.
+		columns (Collection[str], optional): Only these columns are used
+			to compute the fingerprint.  All of these columns must appear
+			in `df`.
+
+	Returns:
+		pandas.Series: The fingerprints (as `bytes`), with the same index as `df`.
+
+	Raises:
+		KeyError: If any of `columns` are not in `df`.
+	"""
+	if columns is None:
+		columns = df.columns
+	columns = sorted(columns)
+	diff = Index(columns).difference(df.columns)
+	if not diff.empty:
+		raise KeyError(diff)
+
+	n = len(df)
+	numbers = np.full([n, len(columns)], np.nan)
+	strings = None
+	for j, col in enumerate(columns):
+		s = df[col]
+		if (
+				(pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s))
+				and not isinstance(s.dtype, pd.CategoricalDtype)
+		):
+			if pd.api.types.is_integer_dtype(s) and len(s) and np.abs(s.to_numpy()).max() > _MAX_EXACT_INT:
+				vals = s.to_numpy(dtype=object)
+			else:
+				numbers[:, j] = s.to_numpy(dtype=float, na_value=np.nan)
+				continue
+		else:
+			vals = np.asarray(s, dtype=object)
+		if strings is None:
+			strings = [[''] * len(columns) for _ in range(n)]
+		for i, v in enumerate(vals):
+			if not isinstance(v, str) and pd.isna(v):
+				continue
+			numbers[i, j], strings[i][j] = _canonical_scalar(v)
+
+	numbers += 0.0  # negative zero becomes zero
+	numbers[np.isnan(numbers)] = np.nan  # one canonical nan
+	if len(columns):
+		rows = np.ascontiguousarray(numbers).view(np.dtype((np.void, 8 * len(columns)))).ravel()
+	else:
+		rows = [b''] * n
+	if strings is None:
+		digests = [
+			hashlib.blake2b(bytes(r), digest_size=16).digest()
+			for r in rows
+		]
+	else:
+		digests = [
+			hashlib.blake2b(bytes(r) + "\x1f".join(t).encode('utf8'), digest_size=16).digest()
+			for r, t in zip(rows, strings)
+		]
+	return pd.Series(digests, index=df.index, dtype=object)
@@ -203,7 +203,7 @@ def run_constrained_prim(experiments, y, issignificant=True,
         peeling = box.peeling_trajectory
         lims = box.box_lims
 
-        logical = np.ones(box.peeling_trajectory.shape[0], dtype=np.bool)
+        logical = np.ones(box.peeling_trajectory.shape[0], dtype=bool)
 
         for i in range(box.peeling_trajectory.shape[0]):
             lim = lims[i]
@@ -595,14 +595,29 @@ class PrimBox(object):
 
         return chart & layered
 
-    def resample(self, i=None, iterations=10, p=1 / 2):
+    def resample(self, i=None, iterations=10, p=1 / 2, n_jobs=None,
+                 client=None, random_state=None):
         '''Calculate resample statistics for candidate box i
 
+        Each resample finds a box on a random subsample of the data.
+        Every resample has its own seed, derived from `random_state`,
+        so the results do not depend on how the resamples are run.
+        Resamples already found are reused by later calls with the
+        same `p` and `random_state`.
+
         Parameters
         ----------
         i : int, optional
         iterations : int, optional
         p : float, optional
+        n_jobs : int, optional
+                 the number of processes to find resampled boxes,
+                 None means 1 and -1 means one per cpu
+        client : dask.distributed.Client, optional
+                 find resampled boxes on this client instead
+        random_state : int, optional
+                       seed for the resamples, if not given one is
+                       drawn from numpy's global random state
 
 
         Returns
@@ -616,44 +631,69 @@ class PrimBox(object):
         x = self.prim.x.loc[self.yi_initial, :]
         y = self.prim.y[self.yi_initial]
 
+        if random_state is None:
+            seed = getattr(self, '_resample_seed', None)
+            if seed is None or seed[1] != p:
+                seed = (np.random.randint(2**31), p)
+        else:
+            seed = (random_state, p)
+        if seed != getattr(self, '_resample_seed', None):
+            self._resample_seed = seed
+            self._resampled = []
+
         if len(self._resampled) < iterations:
+            presorted = {dtype: self.prim._presorted(dtype)
+                         for dtype in ('float', 'int')}
+            rows = np.asarray(self.yi_initial)
+            seeds = [np.random.SeedSequence(seed[0], spawn_key=(j,))
+                     for j in range(len(self._resampled), iterations)]
+            args = (self.prim.peel_alpha, self.prim.paste_alpha)
             with temporary_filter(__name__, INFO, 'find_box'):
-                for j in range(len(self._resampled), iterations):
-                    _logger.info('resample {}'.format(j))
-                    index = np.random.choice(x.index, size=int(x.shape[0] * p),
-                                             replace=False)
-                    x_temp = x.loc[index, :].reset_index(drop=True)
-                    y_temp = y[index]
-
-                    box = Prim(x_temp, y_temp, threshold=0.1,
-                               peel_alpha=self.prim.peel_alpha,
-                               paste_alpha=self.prim.paste_alpha).find_box()
-                    self._resampled.append(box)
-
-        counters = []
-        for _ in range(2):
-            counter = {column: 0.0 for column in x.columns}
-            counters.append(counter)
-
+                if client is not None:
+                    x_, y_, presorted_ = client.scatter(
+                        [x, y, presorted], broadcast=True)
+                    futures = [client.submit(_resample_box, x_, y_,
+                                             presorted_, rows, s, p, *args,
+                                             pure=False)
+                               for s in seeds]
+                    resampled = client.gather(futures)
+                else:
+                    from joblib import Parallel, delayed
+                    resampled = Parallel(n_jobs=n_jobs)(
+                        delayed(_resample_box)(x, y, presorted, rows, s, p,
+                                               *args)
+                        for s in seeds)
+            self._resampled.extend(resampled)
+
+        resampled = self._resampled[:iterations]
         coverage = self.peeling_trajectory.coverage[i]
         density = self.peeling_trajectory.density[i]
 
-        for box in self._resampled:
-            coverage_index = (
-                box.peeling_trajectory.coverage -
-                coverage).abs().idxmin()
-            density_index = (
-                box.peeling_trajectory.density -
-                density).abs().idxmin()
-            for counter, index in zip(counters, [coverage_index,
-                                                 density_index]):
-                for unc in box.qp[index].keys():
-                    counter[unc] += 1 / iterations
+        # for each resample, the restricted dimensions of the box on its
+        # peeling trajectory closest in coverage and in density
+        length = max(len(r['coverage']) for r in resampled)
+        trajectories = {}
+        for key in ['coverage', 'density']:
+            trajectories[key] = np.full((len(resampled), length), np.nan)
+            for j, r in enumerate(resampled):
+                trajectories[key][j, :len(r[key])] = r[key]
+        closest = [
+            np.nanargmin(np.abs(trajectories['coverage'] - coverage), axis=1),
+            np.nanargmin(np.abs(trajectories['density'] - density), axis=1),
+        ]
+        columns = resampled[-1]['columns']
+        counters = []
+        for index in closest:
+            restricted = pd.DataFrame(
+                [dict.fromkeys(r['res_dims'][k], 1)
+                 for r, k in zip(resampled, index)],
+                columns=x.columns).fillna(0)
+            counters.append(restricted.sum() / iterations)
 
         scores = pd.DataFrame(counters,
                               index=['reproduce coverage',
                                      'reproduce density'],
-                              columns=box.box_lim.columns).T * 100
+                              columns=columns).T * 100
         return scores.sort_values(by=['reproduce coverage',
                                       'reproduce density'],
                                   ascending=False)
@@ -838,6 +878,65 @@ class PrimBox(object):
         return qp_values
 
 
+def _resample_box(x, y, presorted, rows, seed, p, peel_alpha, paste_alpha):
+    '''find a box on a random subsample of x and y, for PrimBox.resample
+
+    Parameters
+    ----------
+    x : DataFrame
+    y : ndarray
+    presorted : dict
+                the presorted column order of the Prim that x and y
+                were taken from
+    rows : ndarray
+           the rows of that Prim's data that are in x and y
+    seed : numpy.random.SeedSequence
+    p : float
+        the fraction of x and y to sample
+    peel_alpha : float
+    paste_alpha : float
+
+    Returns
+    -------
+    dict
+        the coverage, density and restricted dimensions along the
+        peeling trajectory of the box, and the columns of the box lims
+
+    '''
+    rng = np.random.default_rng(seed)
+    index = rng.choice(x.shape[0], size=int(x.shape[0] * p), replace=False)
+    x_temp = x.iloc[index, :].reset_index(drop=True)
+    y_temp = y[index]
+
+    prim = Prim(x_temp, y_temp, threshold=0.1, peel_alpha=peel_alpha,
+                paste_alpha=paste_alpha)
+
+    # derive the sort order of the subsample from the full data
+    position = np.full(presorted['float'].shape[1], -1, dtype=np.intp)
+    position[rows[index]] = np.arange(index.shape[0])
+    prim._presorted_columns = {}
+    for dtype, order in presorted.items():
+        order = position[order]
+        prim._presorted_columns[dtype] = order[order >= 0].reshape(
+            order.shape[0], index.shape[0]).astype(presorted[dtype].dtype)
+
+    box = prim.find_box()
+    return {'coverage': box.peeling_trajectory.coverage.values,
+            'density': box.peeling_trajectory.density.values,
+            'res_dims': [list(qp.keys()) for qp in box.qp],
+            'columns': box.box_lim.columns}
+
+
+def _mean_and_count(y_old, y_new):
+    '''the mean and count of y in the old and new boxes, with a mean
+    of 0 for an empty new box'''
+    if y_new.shape[0] > 0:
+        mean_new = np.mean(y_new)
+    else:
+        mean_new = 0
+    return np.mean(y_old), y_old.shape[0], mean_new, y_new.shape[0]
+
+
 class Prim(sdutil.OutputFormatterMixin):
     '''Patient rule induction algorithm
 
@@ -904,11 +1003,11 @@ class Prim(sdutil.OutputFormatterMixin):
             pass
         x = x.reset_index(drop=True)
 
-        x_float = x.select_dtypes([np.float, np.float32, np.float64, float])
+        x_float = x.select_dtypes([np.float32, np.float64, float])
         self.x_float = x_float.values
         self.x_float_colums = x_float.columns.values
 
-        x_int = x.select_dtypes([np.int, np.int32, np.int64, int])
+        x_int = x.select_dtypes([np.int32, np.int64, int])
         self.x_int = x_int.values
         self.x_int_columns = x_int.columns.values
 
@@ -951,6 +1050,7 @@ class Prim(sdutil.OutputFormatterMixin):
         self.threshold = threshold
         self.threshold_type = threshold_type
         self.obj_func = self._obj_functions[obj_function]
+        self._obj_stat_func = self._obj_stat_functions[obj_function]
 
         # set the indices
         self.yi = x.index.values
@@ -1086,7 +1186,7 @@ class Prim(sdutil.OutputFormatterMixin):
         '''
 
         # set the indices
-        logical = np.ones(self.yi.shape[0], dtype=np.bool)
+        logical = np.ones(self.yi.shape[0], dtype=bool)
         for box in self._boxes:
             logical[box.yi] = False
         self.yi_remaining = self.yi[logical]
@@ -1105,236 +1205,245 @@ class Prim(sdutil.OutputFormatterMixin):
 
         self.yi_remaining = self.yi
 
-    def _peel(self, box):
+    def _presorted(self, dtype):
         '''
 
-        Executes the peeling phase of the PRIM algorithm. Delegates
-        peeling to data type specific helper methods.
+        returns the row indices that sort each float or int column, as
+        an array with a row per column. These are computed once for
+        all the data, and reused for every box.
 
         '''
+        try:
+            presorted = self._presorted_columns
+        except AttributeError:
+            presorted = self._presorted_columns = {}
+        if dtype not in presorted:
+            x = {'float': self.x_float, 'int': self.x_int}[dtype]
+            index_dtype = np.int32 if self.n < np.iinfo(np.int32).max else np.intp
+            presorted[dtype] = np.ascontiguousarray(
+                np.argsort(x, axis=0, kind='stable').T.astype(index_dtype))
+        return presorted[dtype]
 
-        mass_old = box.yi.shape[0] / self.n
-
-        x_float = self.x_float[box.yi]
-        x_int = self.x_int[box.yi]
-        x_nominal = self.x_nominal[box.yi]
-
-        # identify all possible peels
-        possible_peels = []
-
-        for x, columns, dtype, in [(x_float, self.x_float_colums,
-                                    'float'),
-                                   (x_int, self.x_int_columns,
-                                    'int'),
-                                   (x_nominal, self.x_nominal_columns,
-                                    'object')]:
-            for j, u in enumerate(columns):
-                peels = self._peels[dtype](self, box, u, j, x)
-                [possible_peels.append(entry) for entry in peels]
-
-        if not possible_peels:
-            # there is no peel identified, so return box
-            return box
-
-        # determine the scores for each peel in order
-        # to identify the next candidate box
-        scores = []
-        for entry in possible_peels:
-            i, box_lim = entry
-            obj = self.obj_func(self, self.y[box.yi], self.y[i])
-            non_res_dim = self.n_cols -\
-                sdutil._determine_nr_restricted_dims(box_lim,
-                                                     self.box_init)
-            score = (obj, non_res_dim, box_lim, i)
-            scores.append(score)
-
-        scores.sort(key=itemgetter(0, 1), reverse=True)
-        entry = scores[0]
-
-        obj_score = entry[0]
-        box_new, indices = entry[2:]
-
-        mass_new = self.y[indices].shape[0] / self.n
-
-        if (mass_new >= self.mass_min) &\
-           (mass_new < mass_old) &\
-           (obj_score > 0):
-            box.update(box_new, indices)
-            return self._peel(box)
-        else:
-            # else return received box
-            return box
-
-    def _real_peel(self, box, u, j, x):
+    def _peel(self, box):
         '''
 
-        returns two candidate new boxes, peel along upper and lower
-        dimension
+        Executes the peeling phase of the PRIM algorithm.
 
-        Parameters
-        ----------
-        box : a PrimBox instance
-        u : str
-            the uncertainty for which to peel
-        j : int
-            column for which to peel
-        x : ndarray
-
-        Returns
-        -------
-        tuple
-            two box lims and the associated indices
+        Peeling is done iteratively. For each numeric column the points
+        in the box are kept in sorted order, so every candidate peel
+        is a contiguous range of that order. The mean and mass of a
+        candidate are then found without copying the data or the box
+        limits, and only the selected peel is turned into a new box.
+        The peeling trajectory is the same as evaluating every
+        candidate box in full.
 
         '''
+        in_box = np.zeros(self.n, dtype=bool)
+        in_box[box.yi] = True
+        orders = [self._presorted('float'), self._presorted('int')]
+
+        while True:
+            mass_old = box.yi.shape[0] / self.n
+            orders = [order[in_box[order]].reshape(order.shape[0],
+                                                   box.yi.shape[0])
+                      for order in orders]
+
+            entry = self._best_peel(box, *orders)
+            if entry is None:
+                # there is no peel identified, so return box
+                return box
+            obj_score, box_new, indices = entry
 
-        peels = []
-        for direction in ['upper', 'lower']:
-            xj = x[:, j]
-
-            peel_alpha = self.peel_alpha
+            mass_new = self.y[indices].shape[0] / self.n
 
-            i = 0
-            if direction == 'upper':
-                peel_alpha = 1 - self.peel_alpha
-                i = 1
+            if (mass_new >= self.mass_min) &\
+               (mass_new < mass_old) &\
+               (obj_score > 0):
+                box.update(box_new, indices)
+                in_box[:] = False
+                in_box[indices] = True
+            else:
+                # else return received box
+                return box
 
-            box_peel = get_quantile(xj, peel_alpha)
-            if direction == 'lower':
-                logical = xj >= box_peel
-                indices = box.yi[logical]
-            if direction == 'upper':
-                logical = xj <= box_peel
-                indices = box.yi[logical]
-            temp_box = copy.deepcopy(box.box_lims[-1])
-            temp_box.loc[i, u] = box_peel
-            peels.append((indices, temp_box))
-
-        return peels
-
-    def _discrete_peel(self, box, u, j, x):
+    def _best_peel(self, box, float_order, int_order):
         '''
 
-        returns two candidate new boxes, peel along upper and lower
-        dimension
+        Identifies the best candidate peel of a box.
 
         Parameters
         ----------
         box : a PrimBox instance
-        u : str
-            the uncertainty for which to peel
-        j : int
-            column for which to peel
-        x : ndarray
+        float_order : ndarray
+                      for each float column, the indices of the points
+                      in the box sorted by that column
+        int_order : ndarray
+                    for each int column, the indices of the points in
+                    the box sorted by that column
 
         Returns
         -------
-        tuple
-            two box lims and the associated indices
+        tuple or None
+            the objective score, box lims and indices of the best peel,
+            or None if there are no possible peels
 
         '''
-        peels = []
-        for direction in ['upper', 'lower']:
-            peel_alpha = self.peel_alpha
-            xj = x[:, j]
-            box_lim = box.box_lims[-1]
-
-            i = 0
-            if direction == 'upper':
-                peel_alpha = 1 - self.peel_alpha
-                i = 1
-
-            box_peel = get_quantile(xj, peel_alpha)
-            box_peel = int(box_peel)
-
-            # determine logical associated with peel value
-            if direction == 'lower':
-                if box_peel == box_lim.loc[i, u]:
-                    logical = (xj > box_lim.loc[i, u]) &\
-                              (xj <= box_lim.loc[i + 1, u])
-                else:
-                    logical = (xj >= box_peel) &\
-                              (xj <= box_lim.loc[i + 1, u])
-            if direction == 'upper':
-                if box_peel == box_lim.loc[i, u]:
-                    logical = (xj < box_lim.loc[i, u]) &\
-                              (xj >= box_lim.loc[i - 1, u])
-                else:
-                    logical = (xj <= box_peel) &\
-                              (xj >= box_lim.loc[i - 1, u])
-
-            # determine value of new limit given logical
-            if xj[logical].shape[0] == 0:
-                if direction == 'upper':
-                    new_limit = np.max(xj)
-                else:
-                    new_limit = np.min(xj)
-            else:
-                if direction == 'upper':
-                    new_limit = np.max(xj[logical])
-                else:
-                    new_limit = np.min(xj[logical])
-
-            indices = box.yi[logical]
-            temp_box = copy.deepcopy(box_lim)
-            temp_box.loc[i, u] = new_limit
-            peels.append((indices, temp_box))
-
-        return peels
-
-    def _categorical_peel(self, box, u, j, x):
-        '''
-
-        returns candidate new boxes for each possible removal of a
-        single  category. So. if the box[u] is a categorical variable
-        with 4 categories, this method will return 4 boxes.
-
-        Parameters
-        ----------
-        box : a PrimBox instance
-        u : str
-            the uncertainty for which to peel
-        j : int
-            column for which to peel
-        x : ndarray
+        yi = box.yi
+        y_box = self.y[yi]
+        n_old = yi.shape[0]
+        mean_old = np.mean(y_box)
+        box_lim = box.box_lims[-1]
 
-        Returns
-        -------
-        tuple
-            a list of box lims and the associated indices
+        # sums of integer valued y are exact, so candidate means can be
+        # computed from cumulative sums and still match np.mean exactly
+        exact_sums = ((y_box.dtype.kind in 'biu' or
+                       np.all(np.mod(y_box, 1) == 0)) and
+                      np.sum(np.abs(y_box)) < 2 ** 53)
+        box_position = np.empty(self.n, dtype=np.intp)
+        box_position[yi] = np.arange(n_old)
+
+        init_values = self.box_init.values
+        restricted = dict(zip(self.box_init.columns,
+                              np.all(init_values == box_lim.values,
+                                     axis=0) == False))
+        n_restricted = sum(restricted.values())
+
+        def non_res_dim(u, lower, upper):
+            restricted_u = not ((self.box_init.loc[0, u] == lower) and
+                                (self.box_init.loc[1, u] == upper))
+            return self.n_cols - (n_restricted - restricted[u] +
+                                  restricted_u)
+
+        def selected(order, lo, hi):
+            logical = np.zeros(n_old, dtype=bool)
+            logical[box_position[order[lo:hi]]] = True
+            return logical
+
+        # candidate peels, in the same order as they have always been
+        # considered, as (score, non_res_dim, u, i, limit, logical) or
+        # (score, non_res_dim, u, i, limit, (order, lo, hi))
+        scores = []
 
-        '''
-        entries = box.box_lims[-1].loc[0, u]
+        for x, columns, order, discrete in [
+                (self.x_float, self.x_float_colums, float_order, False),
+                (self.x_int, self.x_int_columns, int_order, True)]:
+            if len(columns):
+                y_sorted = self.y[order]
+                if exact_sums:
+                    cumulative = np.zeros((order.shape[0], order.shape[1] + 1))
+                    np.cumsum(y_sorted, axis=1, out=cumulative[:, 1:])
 
-        if len(entries) > 1:
-            peels = []
+            for j, u in enumerate(columns):
+                xj = x[order[j], j]
+                m = xj.shape[0]
+                # nan sorts last and is never inside a peeled box
+                m_valid = m - np.count_nonzero(np.isnan(xj)) if not discrete else m
+                lower = box_lim.loc[0, u]
+                upper = box_lim.loc[1, u]
+
+                for direction in ['upper', 'lower']:
+                    if direction == 'upper':
+                        peel_alpha = 1 - self.peel_alpha
+                        i = 1
+                    else:
+                        peel_alpha = self.peel_alpha
+                        i = 0
+
+                    box_peel = get_quantile(xj, peel_alpha, presorted=True)
+
+                    if not discrete:
+                        new_limit = box_peel
+                        if np.isnan(box_peel):
+                            lo, hi = 0, 0
+                        elif direction == 'lower':
+                            lo = np.searchsorted(xj[:m_valid], box_peel, 'left')
+                            hi = m_valid
+                        else:
+                            lo = 0
+                            hi = np.searchsorted(xj[:m_valid], box_peel, 'right')
+                    else:
+                        box_peel = int(box_peel)
+                        if direction == 'lower':
+                            if box_peel == lower:
+                                lo = np.searchsorted(xj, lower, 'right')
+                            else:
+                                lo = np.searchsorted(xj, box_peel, 'left')
+                            hi = np.searchsorted(xj, upper, 'right')
+                        else:
+                            lo = np.searchsorted(xj, lower, 'left')
+                            if box_peel == upper:
+                                hi = np.searchsorted(xj, upper, 'left')
+                            else:
+                                hi = np.searchsorted(xj, box_peel, 'right')
+                        hi = max(lo, hi)
+                        if hi == lo:
+                            new_limit = xj[-1] if direction == 'upper' else xj[0]
+                        else:
+                            new_limit = xj[hi - 1] if direction == 'upper' else xj[lo]
+
+                    n_new = hi - lo
+                    if n_new == 0:
+                        mean_new = 0
+                    elif exact_sums:
+                        mean_new = (cumulative[j, hi] - cumulative[j, lo]) / n_new
+                    else:
+                        mean_new = np.mean(y_box[selected(order[j], lo, hi)])
+                    obj = self._obj_stat_func(self, mean_old, n_old, mean_new, n_new)
+
+                    if i == 0:
+                        nrd = non_res_dim(u, new_limit, upper)
+                    else:
+                        nrd = non_res_dim(u, lower, new_limit)
+                    scores.append((obj, nrd, u, i, new_limit,
+                                   (order[j], lo, hi)))
+
+        x_nominal = self.x_nominal[yi]
+        for j, u in enumerate(self.x_nominal_columns):
+            entries = box_lim.loc[0, u]
+            if len(entries) <= 1:
+                # no peels possible
+                continue
             for entry in entries:
-                bools = []
-
-                temp_box = box.box_lims[-1].copy()
                 peel = copy.deepcopy(entries)
                 peel.discard(entry)
-                temp_box[u] = [peel, peel]
 
-                if type(list(entries)[0]) not in (str, float,
-                                                  int, bool):
-                    for element in x[:, j]:
-                        if element != entry:
-                            bools.append(True)
-                        else:
-                            bools.append(False)
-                    logical = np.asarray(bools, dtype=bool)
+                if type(list(entries)[0]) not in (str, float, int, bool):
+                    logical = np.asarray([element != entry
+                                          for element in x_nominal[:, j]],
+                                         dtype=bool)
                 else:
-                    logical = x[:, j] != entry
-                indices = box.yi[logical]
-                peels.append((indices, temp_box))
-            return peels
+                    logical = x_nominal[:, j] != entry
+                y_new = y_box[logical]
+                n_new = y_new.shape[0]
+                mean_new = np.mean(y_new) if n_new > 0 else 0
+                obj = self._obj_stat_func(self, mean_old, n_old, mean_new, n_new)
+                scores.append((obj, non_res_dim(u, peel, peel), u, None,
+                               peel, logical))
+
+        if not scores:
+            return None
+
+        # the first of the best scoring peels, as after a stable sort
+        obj, _, u, i, limit, logical = max(scores, key=itemgetter(0, 1))
+        if i is None:
+            box_new = box_lim.copy()
+            box_new[u] = [limit, limit]
         else:
-            # no peels possible, return empty list
-            return []
+            box_new = copy.deepcopy(box_lim)
+            box_new.loc[i, u] = limit
+            logical = selected(*logical)
+        return obj, box_new, yi[logical]
 
     def _paste(self, box):
-        ''' Executes the pasting phase of the PRIM. Delegates pasting
-        to data type specific helper methods.'''
+        ''' Executes the pasting phase of the PRIM, iteratively.'''
+        while self._paste_once(box):
+            pass
+        return box
+
+    def _paste_once(self, box):
+        ''' Executes one step of the pasting phase of the PRIM, returns
+        whether the box was pasted. Delegates pasting to data type
+        specific helper methods.'''
 
         mass_old = box.yi.shape[0] / self.n
 
@@ -1361,8 +1470,8 @@ class Prim(sdutil.OutputFormatterMixin):
                                              restricted_dims)
                 [possible_pastes.append(entry) for entry in pastes]
             if not possible_pastes:
-                # there is no peel identified, so return box
-                return box
+                # there is no peel identified, so keep box
+                return False
 
         # determine the scores for each peel in order
         # to identify the next candidate box
@@ -1389,10 +1498,10 @@ class Prim(sdutil.OutputFormatterMixin):
            (obj > 0) &\
            (mean_new > mean_old):
             box.update(box_new, indices)
-            return self._paste(box)
+            return True
         else:
-            # else return received box
-            return box
+            # else keep received box
+            return False
 
     def _real_paste(self, box, u, x, resdim):
         ''' returns two candidate new boxes, pasted along upper and
@@ -1448,7 +1557,7 @@ class Prim(sdutil.OutputFormatterMixin):
 
             dtype = box_paste[u].dtype
             if dtype == np.int32:
-                paste_value = np.int(paste_value)
+                paste_value = int(paste_value)
 
             box_paste.loc[i, u] = paste_value
             logical = sdutil._in_box(x[resdim], box_paste[resdim])
@@ -1528,19 +1637,15 @@ class Prim(sdutil.OutputFormatterMixin):
         data.
 
         '''
-        mean_old = np.mean(y_old)
-
-        if y_new.shape[0] > 0:
-            mean_new = np.mean(y_new)
-        else:
-            mean_new = 0
+        return self._lenient1_obj_stat(*_mean_and_count(y_old, y_new))
 
+    def _lenient1_obj_stat(self, mean_old, n_old, mean_new, n_new):
         obj = 0
         if mean_old != mean_new:
-            if y_old.shape[0] > y_new.shape[0]:
-                obj = (mean_new - mean_old) / (y_old.shape[0] - y_new.shape[0])
-            elif y_old.shape[0] < y_new.shape[0]:
-                obj = (mean_new - mean_old) / (y_new.shape[0] - y_old.shape[0])
+            if n_old > n_new:
+                obj = (mean_new - mean_old) / (n_old - n_new)
+            elif n_old < n_new:
+                obj = (mean_new - mean_old) / (n_new - n_old)
             else:
                 raise PrimException(
                     '''mean is different {} vs {}, while shape is the same,
@@ -1555,24 +1660,20 @@ class Prim(sdutil.OutputFormatterMixin):
 
 
         '''
-        mean_old = np.mean(y_old)
-
-        if y_new.shape[0] > 0:
-            mean_new = np.mean(y_new)
-        else:
-            mean_new = 0
+        return self._lenient2_obj_stat(*_mean_and_count(y_old, y_new))
 
+    def _lenient2_obj_stat(self, mean_old, n_old, mean_new, n_new):
         obj = 0
         if mean_old != mean_new:
-            if y_old.shape == y_new.shape:
+            if n_old == n_new:
                 raise PrimException(
                     '''mean is different {} vs {}, while shape is the same,
                                        this cannot be the case'''.format(
                         mean_old, mean_new))
 
             change_mean = mean_new - mean_old
-            change_mass = abs(y_old.shape[0] - y_new.shape[0])
-            mass_new = y_new.shape[0]
+            change_mass = abs(n_old - n_new)
+            mass_new = n_new
 
             obj = mass_new * change_mean / change_mass
 
@@ -1581,9 +1682,11 @@ class Prim(sdutil.OutputFormatterMixin):
     def _original_obj_func(self, y_old, y_new):
         ''' The original objective function: the mean of the data
         inside the box'''
+        return self._original_obj_stat(*_mean_and_count(y_old, y_new))
 
-        if y_new.shape[0] > 0:
-            return np.mean(y_new)
+    def _original_obj_stat(self, mean_old, n_old, mean_new, n_new):
+        if n_new > 0:
+            return mean_new
         else:
             return -1
 
@@ -1606,10 +1709,6 @@ class Prim(sdutil.OutputFormatterMixin):
                     "%s has dtype object and can thus not be rotated" % key)
         return True
 
-    _peels = {'object': _categorical_peel,
-              'int': _discrete_peel,
-              'float': _real_peel}
-
     _pastes = {'object': _categorical_paste,
                'int': _real_paste,
                'float': _real_paste}
@@ -1620,5 +1719,12 @@ class Prim(sdutil.OutputFormatterMixin):
                       PRIMObjectiveFunctions.LENIENT1: _lenient1_obj_func,
                       PRIMObjectiveFunctions.ORIGINAL: _original_obj_func}
 
+    # the same objective functions, given the mean and count of y in the
+    # old and new boxes
+    _obj_stat_functions = {
+        PRIMObjectiveFunctions.LENIENT2: _lenient2_obj_stat,
+        PRIMObjectiveFunctions.LENIENT1: _lenient1_obj_stat,
+        PRIMObjectiveFunctions.ORIGINAL: _original_obj_stat}
+
     _update_functions = {'default': _update_yi_remaining_default,
                          'guivarch': _update_yi_remaining_guivarch}
@@ -31,7 +31,7 @@ class PRIMObjectiveFunctions(Enum):
     ORIGINAL = 'original'
 
 
-def get_quantile(data, quantile):
+def get_quantile(data, quantile, presorted=False):
     '''
     quantile calculation modeled on the implementation used in sdtoolkit
 
@@ -41,12 +41,15 @@ def get_quantile(data, quantile):
            dataset for which quantile is needed
     quantile : float
                the desired quantile
+    presorted : bool, optional
+                whether data is already sorted
 
     '''
     assert quantile > 0
     assert quantile < 1
 
-    data = np.sort(data)
+    if not presorted:
+        data = np.sort(data)
 
     i = (len(data) - 1) * quantile
     index_lower = int(math.floor(i))
@@ -55,15 +58,16 @@ def get_quantile(data, quantile):
     value = 0
 
     if quantile > 0.5:
-        # upper
-        while (data[index_lower] == data[index_higher]) & (index_lower > 0):
-            index_lower -= 1
+        # upper, move index_lower down past values tied with index_higher
+        if data[index_lower] == data[index_higher]:
+            first = np.searchsorted(data, data[index_higher], side='left')
+            index_lower = max(int(first) - 1, 0)
         value = (data[index_lower] + data[index_higher]) / 2
     else:
-        # lower
-        while (data[index_lower] == data[index_higher]) & \
-              (index_higher < len(data) - 1):
-            index_higher += 1
+        # lower, move index_higher up past values tied with index_lower
+        if data[index_lower] == data[index_higher]:
+            last = np.searchsorted(data, data[index_lower], side='right')
+            index_higher = min(int(last), len(data) - 1)
         value = (data[index_lower] + data[index_higher]) / 2
 
     return value
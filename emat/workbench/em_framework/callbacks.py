@@ -33,7 +33,8 @@ from .parameters import (CategoricalParameter, IntegerParameter,
 
 __all__ = ['AbstractCallback',
            'DefaultCallback',
-           'FileBasedCallback']
+           'FileBasedCallback',
+           'RobustCallback']
 _logger = get_module_logger(__name__)
 
 
@@ -101,12 +102,29 @@ class AbstractCallback(object):
         # can we detect whether we are running within Jupyter?
         # yes:
         # https://stackoverflow.com/questions/15411967/how-can-i-check-if-code-is-executed-in-the-ipython-notebook
-        self.i += 1
+        self._report_progress(1)
+
+    def _report_progress(self, n):
+        previous = self.i
+        self.i += n
         _logger.debug(str(self.i) + " cases completed")
 
-        if self.i % self.reporting_interval == 0:
+        if self.i // self.reporting_interval > previous // self.reporting_interval:
             _logger.info(str(self.i) + " cases completed")
 
+    def extend(self, results):
+        '''
+        Store a batch of results. The implementation in this class
+        calls the callback for each result in turn.
+
+        Parameters
+        ----------
+        results : iterable of (Experiment, dict) tuples
+
+        '''
+        for experiment, outcomes in results:
+            self(experiment, outcomes)
+
     @abc.abstractmethod
     def get_results(self):
         """
@@ -125,9 +143,13 @@ class DefaultCallback(AbstractCallback):
     one can be overwritten or replaced with a callback of your own
     design. For example if you prefer to store the result in a database
     or write them to a text file
+
+    The experiments are stored in numpy column buffers, preallocated
+    from the parameter data types, and the `cases` DataFrame is only
+    built by `get_results`. Evaluators that receive results in batches
+    can store a whole batch at once with `extend`.
     """
     i = 0
-    cases = None
     results = {}
 
     shape_error_msg = "can only save up to 2d arrays, this array is {}d"
@@ -158,39 +180,33 @@ class DefaultCallback(AbstractCallback):
                                               reporting_interval,
                                               reporting_frequency)
         self.i = 0
-        self.cases = None
         self.results = {}
 
         self.outcomes = [outcome.name for outcome in outcomes]
 
         # determine data types of parameters
-        columns = []
-        dtypes = []
         self.parameters = []
+        self._columns = {}
 
         for parameter in uncs + levers:
             name = parameter.name
             self.parameters.append(name)
-            dataType = 'float'
 
             if isinstance(parameter, CategoricalParameter):
-                dataType = 'object'
+                column = np.full(nr_experiments, np.nan, dtype=object)
             elif isinstance(parameter, BooleanParameter):
-                dataType = 'bool'
+                column = np.zeros(nr_experiments, dtype=bool)
             elif isinstance(parameter, IntegerParameter):
-                dataType = 'int'
-            columns.append(name)
-            dtypes.append(dataType)
+                column = np.zeros(nr_experiments, dtype=int)
+            else:
+                column = np.full(nr_experiments, np.nan)
+            self._columns[name] = column
 
         for name in ['scenario', 'policy', 'model']:
-            columns.append(name)
-            dtypes.append('object')
-
-        df = pd.DataFrame(index=np.arange(nr_experiments))
+            self._columns[name] = np.full(nr_experiments, np.nan,
+                                          dtype=object)
 
-        for name, dtype in zip(columns, dtypes):
-            df[name] = pd.Series(dtype=dtype)
-        self.cases = df
+        self._stored = np.zeros(nr_experiments, dtype=bool)
         self.nr_experiments = nr_experiments
 
         for outcome in outcomes:
@@ -201,48 +217,167 @@ class DefaultCallback(AbstractCallback):
                 data[:] = np.nan
                 self.results[outcome.name] = data
 
-    def _store_case(self, experiment):
-        scenario = experiment.scenario
-        policy = experiment.policy
-        index = experiment.experiment_id
-
-        self.cases.at[index, 'scenario'] = scenario.name
-        self.cases.at[index, 'policy'] = policy.name
-        self.cases.at[index, 'model'] = experiment.model_name
-
-        for k, v in scenario.items():
-            self.cases.at[index, k] = v
-
-        for k, v in policy.items():
-            self.cases.at[index, k] = v
-
-    def _store_outcomes(self, case_id, outcomes):
-        for outcome in self.outcomes:
-
+    def _store_cases(self, index, experiments):
+        columns = self._columns
+        columns['scenario'][index] = [e.scenario.name for e in experiments]
+        columns['policy'][index] = [e.policy.name for e in experiments]
+        columns['model'][index] = [e.model_name for e in experiments]
+
+        values = [{**getattr(e.scenario, 'data', e.scenario),
+                   **getattr(e.policy, 'data', e.policy)}
+                  for e in experiments]
+        names = dict.fromkeys(name for v in values for name in v)
+        for name in names:
             try:
-                outcome_res = outcomes[outcome]
+                column = columns[name]
             except KeyError:
+                # not a parameter, stored as given
+                column = columns[name] = np.full(self.nr_experiments,
+                                                 np.nan, dtype=object)
+            if all(name in v for v in values):
+                column[index] = [v[name] for v in values]
+            else:
+                for i, v in zip(index, values):
+                    if name in v:
+                        column[i] = v[name]
+        self._stored[index] = True
+
+    def _new_outcome(self, outcome, value):
+        a = np.asarray(value)
+        if len(a.shape) > 2:
+            message = self.shape_error_msg.format(len(a.shape))
+            raise ema_exceptions.EMAError(message)
+
+        data = np.empty((self.nr_experiments, ) + a.shape, dtype=a.dtype)
+        try:
+            data[:] = np.nan
+        except ValueError:
+            data[:] = 0
+        self.results[outcome] = data
+        return data
+
+    def _store_outcomes(self, index, outcomes):
+        for outcome in self.outcomes:
+            present = [(i, o[outcome]) for i, o in zip(index, outcomes)
+                       if outcome in o]
+            if len(present) < len(outcomes):
                 message = "%s not specified as outcome in msi" % outcome
                 _logger.debug(message)
+            if not present:
+                continue
+            data = self.results.get(outcome)
+            if data is None:
+                data = self._new_outcome(outcome, present[0][1])
+            ids, values = zip(*present)
+            if len(values) == 1:
+                data[ids[0], ] = values[0]
             else:
-                _logger.debug("outcome {} = {}".format(outcome, outcome_res))
-                try:
-                    self.results[outcome][case_id, ] = outcome_res
-                except KeyError:
-                    a = np.asarray(outcome_res)
+                data[list(ids), ] = values
 
-                    shape = a.shape
+    def __call__(self, experiment, outcomes):
+        '''
+        Method responsible for storing results. This method calls
+        :meth:`super` first, thus utilizing the logging provided there.
 
-                    if len(shape) > 2:
-                        message = self.shape_error_msg.format(len(shape))
-                        raise ema_exceptions.EMAError(message)
+        Parameters
+        ----------
+        experiment: Experiment instance
+        outcomes: dict
+                the outcomes dict
 
-                    shape = list(shape)
-                    shape.insert(0, self.nr_experiments)
+        '''
+        self.extend([(experiment, outcomes)])
 
-                    self.results[outcome] = np.empty(shape, dtype=a.dtype)
-                    self.results[outcome][:] = np.nan
-                    self.results[outcome][case_id, ] = outcome_res
+    def extend(self, results):
+        '''
+        Store a batch of results at once.
+
+        Parameters
+        ----------
+        results : iterable of (Experiment, dict) tuples
+
+        '''
+        results = list(results)
+        if not results:
+            return
+        experiments, outcomes = zip(*results)
+        index = [e.experiment_id for e in experiments]
+
+        self._report_progress(len(results))
+        self._store_cases(index, experiments)
+        self._store_outcomes(index, outcomes)
+
+    @property
+    def cases(self):
+        '''pandas.DataFrame: the experiments stored so far'''
+        cases = {}
+        complete = self._stored.all()
+        for name, column in self._columns.items():
+            if not complete and column.dtype.kind in 'bi':
+                # unstored rows are missing
+                column = column.astype(float if column.dtype.kind == 'i'
+                                       else object)
+                column[~self._stored] = np.nan
+            cases[name] = column
+        return pd.DataFrame(cases, index=np.arange(self.nr_experiments))
+
+    def get_results(self):
+        return self.cases, self.results
+
+
+class RobustCallback(AbstractCallback):
+    '''
+    callback that applies robustness functions to the outcomes of each
+    policy
+
+    The experiments over the cross product of policies and scenarios can
+    arrive in any order, and are grouped by policy. As soon as all the
+    scenarios of a policy are complete, the robustness functions are
+    applied to the outcomes of that policy, which are then discarded.
+
+    Parameters
+    ----------
+    robustness_functions : collection of ScalarOutcome instances
+    n_scenarios : int
+                  the number of scenarios evaluated for each policy
+    n_policies : int
+                 the number of policies
+    n_models : int, optional
+               the number of models
+    reporting_interval : int, optional
+                         the interval between progress logs
+    reporting_frequency: int, optional
+                         the total number of progress logs
+
+    Attributes
+    ----------
+    robust_outcomes : dict
+                      the values of the robustness functions for each
+                      completed policy, as a list in the order of
+                      `robustness_functions`, keyed by the position of
+                      the policy
+
+    '''
+
+    def __init__(self, robustness_functions, n_scenarios, n_policies,
+                 n_models=1, reporting_interval=None,
+                 reporting_frequency=10):
+        nr_experiments = n_models * n_policies * n_scenarios
+        super(RobustCallback, self).__init__([], [], [], nr_experiments,
+                                             reporting_interval,
+                                             reporting_frequency)
+        self.i = 0
+        self.robustness_functions = list(robustness_functions)
+        self.n_scenarios = n_scenarios
+        self.n_policies = n_policies
+        self.n_models = n_models
+        self.nr_experiments = nr_experiments
+        self.policy_size = n_models * n_scenarios
+        self.variable_names = {name for rf in self.robustness_functions
+                               for name in rf.variable_name}
+        self.robust_outcomes = {}
+        self._outcomes = {}
+        self._counts = {}
 
     def __call__(self, experiment, outcomes):
         '''
@@ -256,16 +391,49 @@ class DefaultCallback(AbstractCallback):
                 the outcomes dict
 
         '''
-        super(DefaultCallback, self).__call__(experiment, outcomes)
+        super(RobustCallback, self).__call__(experiment, outcomes)
 
-        # store the case
-        self._store_case(experiment)
+        # experiments are generated for each model, for each policy,
+        # for each scenario
+        policy_index, scenario_index = divmod(experiment.experiment_id,
+                                              self.n_scenarios)
+        model_index, policy_index = divmod(policy_index, self.n_policies)
+        position = model_index * self.n_scenarios + scenario_index
 
-        # store outcomes
-        self._store_outcomes(experiment.experiment_id, outcomes)
+        stored = self._outcomes.setdefault(policy_index, {})
+        for name in self.variable_names:
+            try:
+                value = outcomes[name]
+            except KeyError:
+                _logger.debug("%s not specified as outcome in msi" % name)
+                continue
+            try:
+                stored[name][position, ] = value
+            except KeyError:
+                a = np.asarray(value)
+                dtype = float if a.dtype.kind in 'biuf' else a.dtype
+                stored[name] = np.full((self.policy_size, ) + a.shape,
+                                       np.nan, dtype=dtype)
+                stored[name][position, ] = value
+
+        self._counts[policy_index] = self._counts.get(policy_index, 0) + 1
+        if self._counts[policy_index] == self.policy_size:
+            self._finish_policy(policy_index)
+
+    def _finish_policy(self, policy_index):
+        stored = self._outcomes.pop(policy_index)
+        del self._counts[policy_index]
+        scores = []
+        for rf in self.robustness_functions:
+            data = [stored.get(name, np.full(self.policy_size, np.nan))
+                    for name in rf.variable_name]
+            scores.append(rf.function(*data))
+        self.robust_outcomes[policy_index] = scores
+        _logger.debug("robustness functions applied for policy {}".format(
+            policy_index))
 
     def get_results(self):
-        return self.cases, self.results
+        return self.robust_outcomes
 
 
 class FileBasedCallback(AbstractCallback):
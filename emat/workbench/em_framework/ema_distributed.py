@@ -211,17 +211,7 @@ class DistributedEvaluator(BaseEvaluator):
 			async def f(_b):
 				future = self.client.submit(run_experiments_on_worker, _b)
 				result_batch = await self.client.gather(future, asynchronous=True)
-				for (experiment_id, outcome, comment_on_run) in result_batch:
-					experiment = experiments[experiment_id]
-					_logger.debug(
-						log_message,
-						experiment.scenario.name,
-						experiment.policy.name,
-						experiment.model_name,
-					)
-					callback(experiment, outcome)
-					if comment_on_run:
-						_logger.warning(comment_on_run)
+				callback.extend(_batch_results(experiments, result_batch, log_message))
 				return result_batch
 
 			for b in batches:
@@ -239,23 +229,42 @@ class DistributedEvaluator(BaseEvaluator):
 			_logger.debug("waiting to receive experiment results")
 
 			for future, result_batch in as_completed(outcomes, with_results=True):
-				for (experiment_id, outcome, comment_on_run) in result_batch:
-					experiment = experiments[experiment_id]
-					_logger.debug(
-						log_message,
-						experiment.scenario.name,
-						experiment.policy.name,
-						experiment.model_name,
-					)
-					callback(experiment, outcome)
-					if comment_on_run:
-						_logger.warning(comment_on_run)
+				callback.extend(_batch_results(experiments, result_batch, log_message))
 
 			os.chdir(cwd)
 
 			_logger.debug("completed evaluate_experiments")
 
 
+def _batch_results(experiments, result_batch, log_message):
+	"""
+	Pair a batch of results from a worker with their experiments.
+
+	Args:
+		experiments (Mapping): Experiments by experiment_id.
+		result_batch (list): The (experiment_id, outcome, comment_on_run)
+			tuples returned by `run_experiments_on_worker`.
+		log_message (str): Debug message, formatted with the scenario,
+			policy, and model names of each experiment.
+
+	Returns:
+		list: (experiment, outcome) tuples, for `callback.extend`.
+	"""
+	batch = []
+	for (experiment_id, outcome, comment_on_run) in result_batch:
+		experiment = experiments[experiment_id]
+		_logger.debug(
+			log_message,
+			experiment.scenario.name,
+			experiment.policy.name,
+			experiment.model_name,
+		)
+		batch.append((experiment, outcome))
+		if comment_on_run:
+			_logger.warning(comment_on_run)
+	return batch
+
+
 async def AsyncDistributedEvaluator(
 		msis,
 		*,
@@ -18,6 +18,7 @@ from ..util import get_module_logger, ema_logging
 from .experiment_runner import ExperimentRunner
 from .util import NamedObjectMap
 from .model import AbstractModel
+from .working_directories import provision_directory
 
 
 # Created on 22 Feb 2017
@@ -45,7 +46,7 @@ def initializer(*args):
     global experiment_runner, current_process
 
     current_process = multiprocessing.current_process()
-    models, queue, log_level, root_dir = args
+    models, queue, log_level, root_dir, strategy = args
 
     # setup the experiment runner
     msis = NamedObjectMap(AbstractModel)
@@ -57,8 +58,8 @@ def initializer(*args):
 
     # setup the working directories
     # make a root temp
-    # copy each model directory
-    tmpdir = setup_working_directories(models, root_dir)
+    # provision each model directory
+    tmpdir = setup_working_directories(models, root_dir, strategy)
 
     # register a cleanup finalizer function
     # remove the root temp
@@ -110,14 +111,24 @@ def setup_logging(queue, log_level):
     logger.setLevel(log_level)
 
 
-def setup_working_directories(models, root_dir):
-    '''copies the working directory of each model to a process specific
-    temporary directory and update the working directory of the model
+def setup_working_directories(models, root_dir, strategy=None):
+    '''provisions the working directory of each model in a process
+    specific temporary directory and update the working directory of the
+    model
 
     Parameters
     ----------
     models : list
     root_dir : str
+    strategy : {'copy', 'reflink', 'hardlink', 'symlink'}, optional
+               how to provision the working directories, see
+               :func:`provision_directory`. If not given, the
+               `working_directory_strategy` attribute of the models is
+               used, or 'copy' if they have none.
+
+    Models can declare the files they write to, relative to their
+    working directory, in a `writable_files` attribute. Only these files
+    are copied for each process when using a linking strategy.
 
     '''
 
@@ -147,8 +158,20 @@ def setup_working_directories(models, root_dir):
             subdir = os.path.basename(os.path.normpath(key))
             new_wd = os.path.join(tmpdir, subdir)
 
-            # the copy operation
-            shutil.copytree(key, new_wd)
+            # models sharing a directory share the strategy of the first,
+            # and every file any of them writes is materialized
+            wd_strategy = strategy
+            if wd_strategy is None:
+                wd_strategy = getattr(value[0], 'working_directory_strategy', None) or 'copy'
+            writable = set()
+            for model in value:
+                model_writable = getattr(model, 'writable_files', None)
+                if model_writable is None:
+                    writable = None
+                    break
+                writable.update(model_writable)
+
+            provision_directory(key, new_wd, wd_strategy, writable)
 
             for model in value:
                 model.working_directory = new_wd
@@ -245,15 +268,21 @@ class ResultsReader(threading.Thread):
         self.daemon = True
 
     def run(self):
-        while True:
+        finished = False
+        while not finished:
             try:
-                result = self.queue.get()
-                # get the logger for this record
-                if result is None:
+                # results that are already queued are stored together
+                results = [self.queue.get()]
+                while not self.queue.empty():
+                    results.append(self.queue.get_nowait())
+
+                # the sentinel is always queued last
+                if results[-1] is None:
                     _logger.debug("none received")
-                    break
+                    finished = True
+                    results.pop()
 
-                self.callback(*result.get())
+                self.callback.extend(self._get_results(results))
             except (KeyboardInterrupt, SystemExit):
                 raise
             except EOFError:
@@ -263,6 +292,18 @@ class ResultsReader(threading.Thread):
             except BaseException:
                 traceback.print_exc(file=sys.stderr)
 
+    @staticmethod
+    def _get_results(results):
+        batch = []
+        for result in results:
+            try:
+                batch.append(result.get())
+            except (KeyboardInterrupt, SystemExit, EOFError, TypeError):
+                raise
+            except BaseException:
+                traceback.print_exc(file=sys.stderr)
+        return batch
+
 
 def add_tasks(n_processes, pool, experiments, callback):
     '''add experiments to pool
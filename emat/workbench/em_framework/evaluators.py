@@ -41,7 +41,7 @@ from .optimization import (evaluate_robust, evaluate, EpsNSGAII,
 from .model import AbstractModel
 from .experiment_runner import ExperimentRunner
 from .ema_multiprocessing import LogQueueReader, initializer, add_tasks
-from .callbacks import DefaultCallback
+from .callbacks import DefaultCallback, RobustCallback
 
 # =======
 # from .outcomes import ScalarOutcome, AbstractOutcome
@@ -275,16 +275,23 @@ class MultiprocessingEvaluator(BaseEvaluator):
     msis : collection of models
     n_processes : int (optional)
     max_tasks : int (optional)
+    working_directory_strategy : {'copy', 'reflink', 'hardlink', 'symlink'}, optional
+                                 how the working directory of each model is
+                                 provisioned for each process, overriding
+                                 the `working_directory_strategy` of the
+                                 models themselves.
 
     '''
 
     def __init__(self, msis, n_processes=None,
-                 maxtasksperchild=None, **kwargs):
+                 maxtasksperchild=None, working_directory_strategy=None,
+                 **kwargs):
         super(MultiprocessingEvaluator, self).__init__(msis, **kwargs)
 
         self._pool = None
         self.n_processes = n_processes
         self.maxtasksperchild = maxtasksperchild
+        self.working_directory_strategy = working_directory_strategy
 
     def initialize(self):
         log_queue = multiprocessing.Queue()
@@ -313,7 +320,9 @@ class MultiprocessingEvaluator(BaseEvaluator):
 
         self._pool = multiprocessing.Pool(self.n_processes, initializer,
                                           (self._msis, log_queue, loglevel,
-                                           self.root_dir), self.maxtasksperchild)
+                                           self.root_dir,
+                                           self.working_directory_strategy),
+                                          self.maxtasksperchild)
         self.n_processes = self._pool._processes
         _logger.info("pool started")
         return self
@@ -725,11 +734,18 @@ def robust_evaluate(model, robustness_functions, scenarios, policies,
                     evaluator=None):
     '''perform one-time evaluation of a model with robustness functions
 
+    The full cross product of policies and scenarios is submitted to the
+    evaluator as a single job, so workers are not left idle between
+    policies. The robustness functions are applied to the outcomes of
+    each policy as soon as all its scenarios are complete.
+
     Parameters
     ----------
     model : model instance
     robustness_functions : collection of ScalarOutcomes
     scenarios : int, or collection
+                if an int, this number of scenarios is sampled once,
+                and used for all policies
     policies : int, or collection
     evaluator : Evaluator instance
     constraints : list
@@ -748,43 +764,41 @@ def robust_evaluate(model, robustness_functions, scenarios, policies,
 
     if isinstance(policies, pandas.DataFrame):
         policies_df = policies
-        policies_it = designed_levers(model, policies)
+        policies_it = list(designed_levers(model, policies))
     else:
-        policies_it = policies
+        policies_it = list(policies)
         policies_df = pandas.DataFrame(policies)
 
+    if not scenarios:
+        scenarios = [Scenario("None", **{})]
+    elif isinstance(scenarios, numbers.Integral):
+        scenarios = sample_uncertainties(model, scenarios)
+    elif isinstance(scenarios, Scenario):
+        scenarios = [scenarios]
+    try:
+        n_scenarios = scenarios.n
+    except AttributeError:
+        n_scenarios = len(scenarios)
 
     # solve the optimization problem
     if not evaluator:
         evaluator = SequentialEvaluator(model)
 
-    from collections import OrderedDict
-    robust_outcomes = OrderedDict()
-
     with evaluator as e:
+        callback = RobustCallback(robustness_functions, n_scenarios,
+                                  len(policies_it), n_models=len(e._msis))
+        e.evaluate_experiments(scenarios, policies_it, callback)
 
-        for policy_id,policy in zip(policies_df.index, policies_it):
-
-            experiments, outcomes = e.perform_experiments(
-                scenarios=scenarios,
-                policies=[policy],
-                reporting_interval=1e6,
-            )
-
-            job_outcomes_dict = {}
-            job_outcomes = []
-            for rf in robustness_functions:
-                data = [outcomes[var_name] for var_name in
-                        rf.variable_name]
-                score = rf.function(*data)
-                job_outcomes_dict[rf.name] = score
-                job_outcomes.append(score)
-
-            robust_outcomes[policy_id] = job_outcomes
+    if callback.i != callback.nr_experiments:
+        raise EMAError(('some fatal error has occurred while '
+                        'running the experiments, not all runs have '
+                        'completed. expected {}, got {}').format(
+                            callback.nr_experiments, callback.i))
 
-    robust_outcomes = pandas.DataFrame.from_dict(
-        robust_outcomes,
-        orient='index',
+    robust_outcomes = callback.get_results()
+    robust_outcomes = pandas.DataFrame(
+        [robust_outcomes[i] for i in range(len(policies_it))],
+        index=policies_df.index,
         columns=[rf.name for rf in robustness_functions],
     )
 
@@ -411,6 +411,35 @@ def transform_variables(problem, variables):
     return converted_vars
 
 
+def _group_rows(experiments, column):
+    '''Helper function mapping each policy or scenario name to the
+    positions of its experiments
+
+    Experiments are generated for each policy for each scenario, so the
+    rows of one name are usually contiguous, and are then given as a
+    slice, which takes outcomes without copying them.'''
+    rows = {}
+    for name, index in experiments.groupby(column, sort=False).indices.items():
+        if index[-1] - index[0] + 1 == len(index):
+            index = slice(index[0], index[-1] + 1)
+        rows[name] = index
+    return rows
+
+
+def _first_row(index):
+    if isinstance(index, slice):
+        return index.start
+    return index[0]
+
+
+def _constraint_parameters(experiments, constraints):
+    '''Helper function extracting the parameter columns used by the
+    constraints'''
+    names = {name for constraint in constraints
+             for name in constraint.parameter_names}
+    return {name: experiments[name].to_numpy() for name in names}
+
+
 def evaluate(jobs_collection, experiments, outcomes, problem):
     '''Helper function for mapping the results from perform_experiments back
     to what platypus needs'''
@@ -424,18 +453,21 @@ def evaluate(jobs_collection, experiments, outcomes, problem):
     else:
         column = 'scenario'
 
-    for entry, job in jobs_collection:
-        logical = experiments[column] == entry.name
-        job_outcomes = {key: outcomes[key][logical][0]
-                        for key in outcome_names}
-
-        # TODO:: only retain uncertainties
-        job_experiment = experiments[logical]
+    rows = _group_rows(experiments, column)
+    parameters = _constraint_parameters(experiments, constraints)
 
-        data = {k: v[logical][0] for k, v in outcomes.items()}
-        job_constraints = _evaluate_constraints(job_experiment, data,
-                                                constraints)
-        job_outcomes = [outcomes[key][logical][0] for key in outcome_names]
+    for entry, job in jobs_collection:
+        i = _first_row(rows[entry.name])
+
+        if constraints:
+            # TODO:: only retain uncertainties
+            job_experiment = {k: v[i] for k, v in parameters.items()}
+            data = {k: v[i] for k, v in outcomes.items()}
+            job_constraints = _evaluate_constraints(job_experiment, data,
+                                                    constraints)
+        else:
+            job_constraints = []
+        job_outcomes = [outcomes[key][i] for key in outcome_names]
 
         if job_constraints:
             job.solution.problem.function = lambda _: (job_outcomes,
@@ -452,20 +484,24 @@ def evaluate_robust(jobs_collection, experiments, outcomes, problem):
     robustness_functions = problem.robustness_functions
     constraints = problem.ema_constraints
 
+    rows = _group_rows(experiments, 'policy')
+    parameters = _constraint_parameters(experiments, constraints)
+
     for entry, job in jobs_collection:
-        logical = experiments['policy'] == entry.name
+        index = rows[entry.name]
 
         job_outcomes_dict = {}
         job_outcomes = []
         for rf in robustness_functions:
-            data = [outcomes[var_name][logical] for var_name in
+            data = [outcomes[var_name][index] for var_name in
                     rf.variable_name]
             score = rf.function(*data)
             job_outcomes_dict[rf.name] = score
             job_outcomes.append(score)
 
         # TODO:: only retain levers
-        job_experiment = experiments[logical].iloc[0]
+        i = _first_row(index)
+        job_experiment = {k: v[i] for k, v in parameters.items()}
         job_constraints = _evaluate_constraints(job_experiment,
                                                 job_outcomes_dict,
                                                 constraints)
@@ -0,0 +1,157 @@
+'''
+provisioning of private working directories for models
+
+A model that needs its own working directory is given one that is
+provisioned from its master directory. Copying the whole master
+directory is the most isolated approach, but for large models it makes
+process startup slow and uses a full copy of disk space per process.
+The available strategies are
+
+* 'copy' : every file is copied.
+* 'reflink' : files are cloned copy-on-write where the file system
+  supports it (e.g. btrfs or XFS on Linux), and copied otherwise.
+* 'hardlink' : files are hard linked, and copied where that is not
+  possible (e.g. across devices).
+* 'symlink' : files are symbolically linked to the master copy, and
+  copied where that is not possible.
+
+Directories are always created anew, so files newly created by a model
+never appear in the master directory. Symbolically linked directories
+in the master directory are provisioned as directories with their
+contents. Files the model is declared to
+write are cloned or copied whatever the strategy, because writing in
+place into a linked file would also change the master copy.
+
+'''
+import errno
+import fnmatch
+import os
+import shutil
+import sys
+from collections import Counter
+
+from ..util import get_module_logger
+
+__all__ = ['PROVISIONING_STRATEGIES', 'provision_directory']
+
+_logger = get_module_logger(__name__)
+
+PROVISIONING_STRATEGIES = ('copy', 'reflink', 'hardlink', 'symlink')
+
+# ioctl request code to clone a file, from linux/fs.h
+_FICLONE = 0x40049409
+
+
+def _reflink(src, dst):
+    '''clone src to dst copy-on-write, raises OSError if not supported'''
+    if not sys.platform.startswith('linux'):
+        raise OSError(errno.EOPNOTSUPP, 'reflink is not supported on this platform', src)
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+
+def _provision_file(src, dst, strategy):
+    '''create dst from src, returns the method actually used'''
+    try:
+        if strategy == 'hardlink':
+            os.link(src, dst)
+            return strategy
+        if strategy == 'symlink':
+            os.symlink(os.path.abspath(src), dst)
+            return strategy
+        if strategy == 'reflink':
+            _reflink(src, dst)
+            return strategy
+    except OSError:
+        pass
+    shutil.copy2(src, dst)
+    return 'copy'
+
+
+def _matches(relpath, patterns):
+    '''whether relpath matches any of the patterns, or patterns is None'''
+    if patterns is None:
+        return True
+    relpath = relpath.replace(os.sep, '/')
+    return any(fnmatch.fnmatch(relpath, pattern) for pattern in patterns)
+
+
+def provision_directory(source, destination, strategy='copy', writable=None,
+                        include=None):
+    '''provision a working directory from a master directory
+
+    Parameters
+    ----------
+    source : str
+             the master directory
+    destination : str
+                  the working directory to provision, which is created
+                  if it does not exist. Files already in it are replaced.
+    strategy : {'copy', 'reflink', 'hardlink', 'symlink'}, optional
+               how to provision files that the model does not write
+    writable : collection of str, optional
+               fnmatch-style patterns, relative to `source` and using
+               '/' as separator, of the files that the model writes to.
+               These are always cloned or copied. If not given, the
+               model might write to any file, so all files are cloned
+               or copied.
+    include : collection of str, optional
+              fnmatch-style patterns, in the same form as `writable`, of
+              the files to provision. If given, other files are skipped
+              and only directories that contain provisioned files are
+              created. If not given, all files are provisioned.
+
+    Returns
+    -------
+    Counter
+        the number of files provisioned by each method
+
+    Raises
+    ------
+    ValueError
+        if `strategy` is unknown
+
+    '''
+    if strategy not in PROVISIONING_STRATEGIES:
+        raise ValueError("unknown provisioning strategy {!r}, must be one "
+                         "of {}".format(strategy, PROVISIONING_STRATEGIES))
+    if writable is not None and isinstance(writable, str):
+        writable = [writable]
+    if include is not None and isinstance(include, str):
+        include = [include]
+
+    source = os.fspath(source)
+    methods = Counter()
+    ancestors = {source: frozenset()}
+    for dirpath, dirnames, filenames in os.walk(source, followlinks=True):
+        # symlinked directories are followed, but not back into a
+        # directory that is being walked, which would never end
+        walking = ancestors.pop(dirpath) | {os.path.realpath(dirpath)}
+        dirnames[:] = [d for d in dirnames if
+                       os.path.realpath(os.path.join(dirpath, d)) not in walking]
+        for d in dirnames:
+            ancestors[os.path.join(dirpath, d)] = walking
+        reldir = os.path.relpath(dirpath, source)
+        target_dir = os.path.normpath(os.path.join(destination, reldir))
+        if include is None:
+            os.makedirs(target_dir, exist_ok=True)
+        for filename in filenames:
+            relpath = os.path.normpath(os.path.join(reldir, filename))
+            if not _matches(relpath, include):
+                continue
+            os.makedirs(target_dir, exist_ok=True)
+            src = os.path.join(dirpath, filename)
+            dst = os.path.join(target_dir, filename)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            if _matches(relpath, writable):
+                file_strategy = 'reflink' if strategy != 'copy' else 'copy'
+            else:
+                file_strategy = strategy
+            methods[_provision_file(src, dst, file_strategy)] += 1
+
+    _logger.debug("provisioned {} from {}: {}".format(
+        destination, source, dict(methods)))
+    return methods
@@ -77,3 +77,182 @@ def test_feature_scoring_with_nan():
 	assert isinstance(fs, pd.io.formats.style.Styler)
 	stable_df("./road_test_feature_scores_bogus_1.pkl.gz", fs.data)
 
+
+
+def test_prim_peeling_trajectory():
+	from emat.workbench.analysis import prim
+	rng = np.random.default_rng(1)
+	n = 2000
+	x = pd.DataFrame({
+		'a': rng.random(n), 'b': rng.normal(size=n), 'c': rng.integers(0, 10, n),
+		'd': rng.choice(['p', 'q', 'r'], n), 'e': np.round(rng.random(n), 1),
+		'f': rng.integers(0, 3, n),
+	})
+	score = x.a + 0.5 * x.b + 0.1 * x.c + (x.d == 'q') + x.e
+	y = (score > np.quantile(score, 0.7)).astype(int).values
+	p = prim.Prim(x, y, threshold=0.5)
+
+	# same trajectory as peeling by evaluating every candidate box in full
+	box1 = p.find_box()
+	assert len(box1.box_lims) == 24
+	assert len(box1.yi) == 192
+	assert dict(box1.peeling_trajectory.iloc[-1]) == approx({
+		'coverage': 0.31833333333333336, 'density': 0.9947916666666666, 'id': 23,
+		'mass': 0.096, 'mean': 0.9947916666666666, 'res_dim': 5,
+	})
+	lims = box1.box_lims[-1]
+	assert list(lims['a']) == approx([0.071708, 0.999791], abs=1e-6)
+	assert list(lims['b']) == approx([-0.48354, 3.71764], abs=1e-5)
+	assert list(lims['c']) == [2, 9]
+	assert list(lims['d']) == [{'q'}, {'q'}]
+	assert list(lims['e']) == approx([0.45, 1.0])
+
+	box2 = p.find_box()
+	assert len(box2.box_lims) == 22
+	assert len(box2.yi) == 127
+	assert box2.peeling_trajectory.iloc[-1]['density'] == approx(0.7874015748031497)
+
+
+def test_prim_get_quantile_presorted():
+	import math
+	from emat.workbench.analysis.prim_util import get_quantile
+	def get_quantile_by_walking(data, quantile):
+		data = np.sort(data)
+		i = (len(data) - 1) * quantile
+		lo, hi = int(math.floor(i)), int(math.ceil(i))
+		if quantile > 0.5:
+			while (data[lo] == data[hi]) & (lo > 0):
+				lo -= 1
+		else:
+			while (data[lo] == data[hi]) & (hi < len(data) - 1):
+				hi += 1
+		return (data[lo] + data[hi]) / 2
+	rng = np.random.default_rng(0)
+	for data in [rng.integers(0, 4, 101), np.round(rng.random(57), 1), np.ones(9), rng.random(20)]:
+		for q in [0.05, 0.3, 0.7, 0.95]:
+			expected = get_quantile_by_walking(data, q)
+			assert get_quantile(data, q) == expected
+			assert get_quantile(np.sort(data), q, presorted=True) == expected
+
+
+def test_prim_only_float_columns():
+	from emat.workbench.analysis import prim
+	rng = np.random.default_rng(2)
+	x = pd.DataFrame(rng.random((500, 3)), columns=['a', 'b', 'c'])
+	y = ((x.a + x.b) > 1.2).astype(int).values
+	box = prim.Prim(x, y, threshold=0.5).find_box()
+	assert box.density > 0.9
+
+
+def test_prim_resample():
+	from emat.workbench.analysis import prim
+	rng = np.random.default_rng(1)
+	n = 1000
+	x = pd.DataFrame({
+		'a': rng.random(n), 'b': rng.normal(size=n), 'c': rng.integers(0, 10, n),
+		'd': rng.choice(['p', 'q', 'r'], n),
+	})
+	score = x.a + 0.5 * x.b + 0.1 * x.c + (x.d == 'q')
+	y = (score > np.quantile(score, 0.7)).astype(int).values
+	box = prim.Prim(x, y, threshold=0.5).find_box()
+
+	scores = box.resample(iterations=4, random_state=3)
+	assert sorted(scores.index) == ['a', 'b', 'c', 'd']
+	assert list(scores.columns) == ['reproduce coverage', 'reproduce density']
+	assert ((scores >= 0) & (scores <= 100)).all().all()
+	assert (scores.values % 25 == 0).all()
+
+	# resamples are seeded individually, so they are reproducible and
+	# can be extended or recomputed in any order
+	more = box.resample(iterations=6, random_state=3)
+	box._resampled = []
+	pd.testing.assert_frame_equal(box.resample(iterations=4, random_state=3), scores)
+	pd.testing.assert_frame_equal(box.resample(iterations=6, random_state=3), more)
+
+def test_visualizer_bin_index_updates():
+	from emat.analysis import Visualizer
+	from emat.analysis.explore_2.components import BinIndex, new_hmm_figure
+	x = np.array([0.0, 0.5, 1.0, 1.5, 2.0, np.nan, 3.0])
+	edges = np.array([0.0, 1.0, 2.0])
+	b = BinIndex.from_edges(x, edges)
+	assert b.codes.dtype == np.uint8
+	np.testing.assert_array_equal(b.totals, np.histogram(x[~np.isnan(x)], bins=edges)[0])
+	np.testing.assert_array_equal(b.counts(x > 0.7), [0, 3])
+	b2 = BinIndex.product(BinIndex.from_range(x, 2, (0, 2)), BinIndex.from_range(-x, 4, (-2, 0)))
+	assert b2.totals.shape == (2, 4)
+	assert b2.totals.sum() == 5
+
+	road_scope = emat.Scope(emat.package_file('model','tests','road_test.yaml'))
+	road_test = PythonCoreModel(Road_Capacity_Investment, scope=road_scope)
+	data = road_test.run_experiments(design=road_test.design_experiments(n_samples=200, random_seed=2))
+	viz = Visualizer(data=data, scope=road_scope)
+	rows = ['expand_capacity', 'debt_type']
+	cols = ['net_benefits', 'expand_capacity']
+	fig = viz.hmm(rows=rows, cols=cols)
+	hist = viz.get_histogram_figure('net_benefits').children[0]
+	box = emat.Box(name='Explore', scope=road_scope)
+	box.set_lower_bound('expand_capacity', 50)
+	viz.new_selection(box, name='Explore')
+	viz._active_selection_changed()
+	selection = viz.active_selection()
+	expected = np.histogram(
+		data['net_benefits'][selection],
+		bins=np.histogram_bin_edges(data['net_benefits'], bins=20),
+	)[0]
+	np.testing.assert_array_equal(hist.data[0].y, expected)
+	# patched figure matches a figure built for the new selection
+	fresh = new_hmm_figure(
+		road_scope, viz.data, rows=rows, cols=cols, row_titles='side',
+		selection=selection, box=box, refpoint=viz._reference_point, show_points=30,
+		selected_color=viz.active_selection_color(),
+	)
+	assert len(fig.data) == len(fresh.data)
+	for patched, new in zip(fig.data, fresh.data):
+		if new.type == 'heatmap':
+			np.testing.assert_array_equal(np.asarray(patched.z), np.asarray(new.z))
+			assert patched.zmax == new.zmax
+		else:
+			np.testing.assert_array_equal(np.asarray(patched.y, dtype=float), np.asarray(new.y, dtype=float))
+	assert len(fig.layout.shapes) == len(fresh.layout.shapes)
+
+def test_visualizer_feature_scores_background():
+	import asyncio
+	from emat.analysis import Visualizer
+	road_scope = emat.Scope(emat.package_file('model','tests','road_test.yaml'))
+	road_test = PythonCoreModel(Road_Capacity_Investment, scope=road_scope)
+	data = road_test.run_experiments(design=road_test.design_experiments(n_samples=200, random_seed=3))
+	viz = Visualizer(data=data, scope=road_scope)
+	viz._feature_score_debounce = 0.05
+	computed = []
+	score_features = viz._score_features
+	def counting_score_features(target, *args):
+		computed.append(None if target is None else int(target.sum()))
+		return score_features(target, *args)
+	viz._score_features = counting_score_features
+
+	def select(lower_bound):
+		box = emat.Box(name='Explore', scope=road_scope)
+		box.set_lower_bound('net_benefits', lower_bound)
+		viz.new_selection(box, name='Explore')
+		return int(viz.active_selection().sum())
+
+	fig = viz.selection_feature_scores()
+	n0 = select(0)
+	assert computed == [None, n0]
+	scores0 = list(fig.data[0].x)
+
+	async def brush():
+		# rapid changes are debounced, only the last is scored
+		select(-100)
+		select(-50)
+		n1 = select(50)
+		await asyncio.sleep(1.0)
+		assert computed == [None, n0, n1]
+		assert fig.data[0].marker.color != 'yellow'
+		# returning to an earlier selection is served from the cache
+		select(0)
+		assert fig.data[0].marker.color != 'yellow'
+		assert list(fig.data[0].x) == scores0
+
+	asyncio.run(brush())
+	assert len(computed) == 3
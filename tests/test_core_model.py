@@ -83,7 +83,46 @@ class TestCoreModelMethods(unittest.TestCase):
                        '190 Daily VHT':272612.499025}
         self.assertEqual(expected_pm, pm_vals)
 
-        
+    def test_short_circuit_before_dispatch(self):
+        import pandas as pd
+        import emat.examples
+        s, db, m = emat.examples.road_test()
+        design = m.design_experiments(n_samples=10, sampler='lhs', random_seed=3)
+        calls = []
+        function = m.function
+        def counting_function(**kwargs):
+            calls.append(kwargs)
+            return function(**kwargs)
+        m.function = counting_function
+        first = m.run_experiments(design.iloc[:6])
+        self.assertEqual(len(calls), 6)
+
+        # without a db on the model (as on distributed workers), only
+        # experiments without stored results are run
+        m.db = None
+        calls.clear()
+        full = m.run_experiments(design, db=db)
+        self.assertEqual(len(calls), 4)
+        self.assertEqual(list(full.index), list(design.index))
+        pd.testing.assert_frame_equal(full.iloc[:6], first)
+
+        calls.clear()
+        again = m.run_experiments(design.iloc[:6], db=db)
+        self.assertEqual(len(calls), 0)
+        pd.testing.assert_frame_equal(again, first)
+
+        # results from another source, e.g. a meta-model, are not used
+        # and do not prevent short circuiting core model results
+        meta = first[[i for i in s.get_measure_names() if i in first.columns]] + 1
+        db.write_experiment_measures(s.name, 1, meta)
+        again = m.run_experiments(design.iloc[:6], db=db)
+        self.assertEqual(len(calls), 0)
+        pd.testing.assert_frame_equal(again, first)
+
+        again = m.run_experiments(design.iloc[:6], db=db, allow_short_circuit=False)
+        self.assertEqual(len(calls), 6)
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -193,6 +193,47 @@ def test_write_measures(db_setup):
     pd.testing.assert_frame_equal(exp_with_ids, xlm_readback)
 
 
+def test_write_measures_staging(db_setup):
+    # write experiment definition
+    xl_df = pd.DataFrame(
+        {"constant": [1, 1, 1], "exp_var1": [1.1, 1.2, 1.3], "exp_var2": [2.1, 2.2, 2.3]}
+    )
+    design = "lhs"
+    db_setup.db_test.write_experiment_parameters(db_setup.scope_name, design, xl_df)
+
+    # get experiment ids
+    exp_with_ids = db_setup.db_test.read_experiment_parameters(
+        db_setup.scope_name, design
+    )
+    exp_with_ids["pm_1"] = [4.4, 5.5, 6.6]
+    exp_with_ids["pm_2"] = [6.6, 7.7, 8.8]
+
+    # write performance measures through the staging table, with given run ids
+    import uuid
+    run_ids = [uuid.uuid1() for _ in range(len(exp_with_ids))]
+    db_setup.db_test.write_experiment_measures(
+        db_setup.scope_name, SOURCE_IS_CORE_MODEL, exp_with_ids,
+        run_ids=run_ids, staging=True,
+    )
+    xlm_readback = db_setup.db_test.read_experiment_all(
+        db_setup.scope_name, design, with_run_ids=True,
+    )
+    assert list(xlm_readback.index.get_level_values(1)) == run_ids
+    xlm_readback.index = xlm_readback.index.droplevel(1)
+    pd.testing.assert_frame_equal(exp_with_ids, xlm_readback)
+
+    # writing again with the same run ids replaces values, not runs
+    exp_with_ids["pm_2"] = [16.6, 17.7, 18.8]
+    db_setup.db_test.write_experiment_measures(
+        db_setup.scope_name, SOURCE_IS_CORE_MODEL, exp_with_ids,
+        run_ids=run_ids, staging=True,
+    )
+    xlm_readback = db_setup.db_test.read_experiment_all(
+        db_setup.scope_name, design, runs='all',
+    )
+    pd.testing.assert_frame_equal(exp_with_ids, xlm_readback)
+
+
 def test_write_measure_runs(db_setup):
     # write experiment definition
     xl_df = pd.DataFrame(
@@ -496,6 +537,169 @@ def test_duplicate_experiments():
     assert len(db.read_experiment_all(None, None)) == 5
 
 
+def test_duplicate_experiment_fingerprints(db_setup):
+    db = db_setup.db_test
+    xl_df = pd.DataFrame(
+        {"constant": [1, 1], "exp_var1": [1.1, 1.2], "exp_var2": [2, 2.2]}
+    )
+    ids = db.write_experiment_parameters(db_setup.scope_name, "lhs", xl_df)
+
+    # same values in different dtypes and column order are duplicates
+    xl_df2 = pd.DataFrame(
+        {"exp_var2": [3.0, 2.0], "exp_var1": [1.3, 1.1], "constant": [1.0, 1.0]}
+    )
+    ids2 = db.write_experiment_parameters(db_setup.scope_name, "lhs2", xl_df2)
+    assert ids2[1] == ids[0]
+    assert ids2[0] not in ids
+
+    # experiments without stored fingerprints (i.e. from older versions)
+    # are fingerprinted on the next write
+    db.conn.execute("UPDATE ema_experiment SET experiment_hash = NULL")
+    ids3 = db.write_experiment_parameters(db_setup.scope_name, "lhs3", xl_df2)
+    assert ids3 == ids2
+    assert len(db.read_experiment_parameters(db_setup.scope_name)) == 3
+    assert db.read_all_experiment_ids(db_setup.scope_name, "lhs3") == sorted(ids2)
+
+
+def test_write_experiments_without_hash_column(db_setup, tmp_path):
+    import sqlite3
+    db = db_setup.db_test
+    xl_df = pd.DataFrame(
+        {"constant": [1, 1], "exp_var1": [1.1, 1.2], "exp_var2": [2, 2.2]}
+    )
+    ids = db.write_experiment_parameters(db_setup.scope_name, "lhs", xl_df)
+
+    # a database from before parameter fingerprints, opened without update
+    db_file = str(tmp_path / "no-hash.sqlitedb")
+    with sqlite3.connect(db_file) as dest:
+        db.conn.backup(dest)
+        dest.execute("DROP INDEX ema_experiment_hash_index")
+        dest.execute("ALTER TABLE ema_experiment DROP COLUMN experiment_hash")
+    dest.close()
+    old = SQLiteDB(db_file, initialize=False, update=False)
+
+    xl_df2 = pd.DataFrame(
+        {"exp_var2": [3.0, 2.0], "exp_var1": [1.3, 1.1], "constant": [1.0, 1.0]}
+    )
+    ids2 = old.write_experiment_parameters(db_setup.scope_name, "lhs2", xl_df2)
+    assert ids2[1] == ids[0]
+    assert ids2[0] not in ids
+    columns = [i[1] for i in old.conn.execute("PRAGMA table_info(ema_experiment)")]
+    assert 'experiment_hash' not in columns
+    assert len(old.read_experiment_parameters(db_setup.scope_name)) == 3
+    assert old.read_all_experiment_ids(db_setup.scope_name, "lhs2") == sorted(ids2)
+    old.conn.close()
+
+
+def test_read_experiment_ids(db_setup):
+    from emat.exceptions import MissingIdWarning
+    db = db_setup.db_test
+    xl_df = pd.DataFrame(
+        {"constant": [1, 1, 1], "exp_var1": [1.1, 1.2, 1.3], "exp_var2": [2, 2.2, 2]}
+    )
+    ids = db.write_experiment_parameters(db_setup.scope_name, "lhs", xl_df)
+
+    # complete experiments, in any dtype and column order, match by fingerprint
+    lookup = pd.DataFrame(
+        {"exp_var2": [2.0, 9.9, 2.2], "exp_var1": [1.3, 1.0, 1.2], "constant": [1.0, 1.0, 1.0]}
+    )
+    with pytest.warns(MissingIdWarning):
+        assert db.read_experiment_ids(db_setup.scope_name, lookup) == [ids[2], None, ids[1]]
+
+    # a subset of parameters matches if it identifies only one experiment
+    assert db.read_experiment_ids(db_setup.scope_name, lookup[["exp_var1"]].iloc[[0, 2]]) == [ids[2], ids[1]]
+    with pytest.raises(ValueError):
+        db.read_experiment_ids(db_setup.scope_name, xl_df[["exp_var2"]])
+    assert db.read_experiment_id(db_setup.scope_name, exp_var1=1.1) == ids[0]
+
+    # missing experiments are created, filling in default values
+    new_ids = db.get_experiment_ids(db_setup.scope_name, lookup[["exp_var1", "exp_var2"]])
+    assert new_ids[0] == ids[2] and new_ids[2] == ids[1]
+    assert new_ids[1] not in ids
+    assert db.get_experiment_id(db_setup.scope_name, {"exp_var1": 1.0}, exp_var2=9.9) == new_ids[1]
+    assert db.read_experiment_parameters(db_setup.scope_name).loc[new_ids[1], "constant"] == 1
+
+
+def test_wide_cache(db_setup):
+    db = db_setup.db_test
+    xl_df = pd.DataFrame(
+        {"constant": [1, 1, 1], "exp_var1": [1.1, 1.2, 1.3], "exp_var2": [2.1, 2.2, 2.3]}
+    )
+    db.write_experiment_parameters(db_setup.scope_name, "lhs", xl_df)
+    ex = db.read_experiment_parameters(db_setup.scope_name, "lhs")
+    ex["pm_1"] = [4.4, 5.5, 6.6]
+    ex["pm_2"] = [6.6, 7.7, 8.8]
+    db.write_experiment_measures(db_setup.scope_name, SOURCE_IS_CORE_MODEL, ex[["pm_1", "pm_2"]])
+
+    long_all = db.read_experiment_all(db_setup.scope_name, "lhs")
+    db.create_wide_cache(db_setup.scope_name)
+    pd.testing.assert_frame_equal(long_all, db.read_experiment_all(db_setup.scope_name, "lhs"))
+
+    # writes after the cache is created are mirrored into it
+    xl_df2 = pd.DataFrame(
+        {"constant": [1, 1], "exp_var1": [1.3, 1.4], "exp_var2": [2.3, 2.4]}
+    )
+    db.write_experiment_parameters(db_setup.scope_name, "lhs2", xl_df2)
+    ex2 = db.read_experiment_parameters(db_setup.scope_name, "lhs2")
+    ex2["pm_1"] = [1.1, 2.2]
+    ex2["pm_2"] = [7.7, 8.8]
+    db.write_experiment_measures(db_setup.scope_name, SOURCE_IS_CORE_MODEL, ex2[["pm_1", "pm_2"]])
+    wide = {
+        design: db.read_experiment_all(db_setup.scope_name, design, runs='valid', with_run_ids=True)
+        for design in ("lhs", "lhs2", None)
+    }
+    wide_ids = db.read_experiment_parameters(db_setup.scope_name, experiment_ids=ex2.index[:1])
+    db.drop_wide_cache(db_setup.scope_name)
+    for design, df in wide.items():
+        pd.testing.assert_frame_equal(
+            df, db.read_experiment_all(db_setup.scope_name, design, runs='valid', with_run_ids=True),
+        )
+    pd.testing.assert_frame_equal(
+        wide_ids, db.read_experiment_parameters(db_setup.scope_name, experiment_ids=ex2.index[:1]),
+    )
+    assert sorted(wide["lhs2"]["pm_2"]) == [7.7, 8.8, 8.8]
+
+
+def test_scope_cache(db_setup, monkeypatch):
+    import copy
+    import cloudpickle
+    db = db_setup.db_test
+    db.clear_scope_cache()
+    # only a miss unpickles the stored scope
+    loads = []
+    cloudpickle_loads = cloudpickle.loads
+    def counting_loads(*args, **kwargs):
+        loads.append(1)
+        return cloudpickle_loads(*args, **kwargs)
+    monkeypatch.setattr(cloudpickle, 'loads', counting_loads)
+    s1 = db.read_scope(db_setup.scope_name)
+    s2 = db.read_scope(db_setup.scope_name)
+    assert s1 is s2
+    assert len(loads) == 1
+    monkeypatch.undo()
+    assert db.read_measures(db_setup.scope_name) == db_setup.ex_m
+    assert db.read_measures(db_setup.scope_name) == db_setup.ex_m
+    info = db.scope_cache_info()
+    assert info['scope_hits'] == 1
+    assert info['scope_misses'] == 1
+    assert info['names_hits'] == 1
+    assert info['names_misses'] == 1
+
+    # the cached scope is shared, changes are made to a copy
+    s1 = copy.deepcopy(s1)
+    s1.name = db_setup.scope_name
+    s1.get_measures()[0].desc = "changed"
+    assert db.read_scope(db_setup.scope_name).get_measures()[0].desc != "changed"
+
+    # updating the scope invalidates the cache
+    db.update_scope(s1)
+    s3 = db.read_scope(db_setup.scope_name)
+    assert s3 is not s1
+    assert s3.get_measures()[0].desc == "changed"
+    assert db.read_measures(db_setup.scope_name) == s3.get_measure_names()
+    assert db.scope_cache_info()['names_misses'] == 2
+
+
 def test_deduplicate_indexes():
     testing_df = pd.DataFrame(
         data=np.random.random([10, 5]),
@@ -516,15 +720,18 @@ def test_deduplicate_indexes():
     np.testing.assert_array_equal(r_df.to_numpy(), testing_df.to_numpy())
 
 
-def test_version_warning():
+def test_version_warning(tmp_path):
+    import shutil
     from emat.exceptions import DatabaseVersionWarning
 
     print(os.getcwd())
     test_dir = os.path.dirname(__file__)
     db_file = os.path.join(test_dir, "require_version_999.sqldb")
     assert os.path.exists(db_file)
+    # opening the database updates it, so open a copy
+    db_file = shutil.copy2(db_file, tmp_path / "require_version_999.sqldb")
     with pytest.warns(DatabaseVersionWarning):
-        db = emat.SQLiteDB(db_file)
+        db = emat.SQLiteDB(str(db_file))
 
 
 @pytest.mark.skip
@@ -659,6 +866,8 @@ def test_update_old_database():
         os.path.join(test_dir, "old-format-database-copy.sqlitedb"),
     )
     old = emat.SQLiteDB(os.path.join(test_dir, "old-format-database-copy.sqlitedb"))
+    columns = [i[1] for i in old.conn.execute("PRAGMA table_info(ema_experiment)")]
+    assert 'experiment_hash' in columns
     assert old.read_experiment_parameters(None, "lhs_1").shape == (100, 13)
     assert old.read_experiment_measures(None, "lhs_1").shape == (50, 7)
     old.conn.close()
@@ -216,6 +216,90 @@ class TestCorrelatedExperimentMethods(unittest.TestCase):
         assert np.corrcoef([exp_def.input_flow, exp_def.value_of_time])[0, 1] == approx(-0.5, rel=0.05)
         assert np.corrcoef([exp_def.unit_cost_expansion, exp_def.value_of_time])[0, 1] == approx(0.9, rel=0.05)
 
+    def test_design_frame_matches_records(self):
+        from emat.experiment.samplers import CorrelatedLHSSampler
+        scope_file = emat.package_file("model", "tests", "road_test_corr.yaml")
+        scp = Scope(scope_file)
+        parms = scp.get_uncertainties() + scp.get_levers()
+        sampler = CorrelatedLHSSampler()
+        np.random.seed(99)
+        designs = sampler.generate_designs(parms, 50)
+        designs.kind = dict
+        records = pd.DataFrame.from_records([_ for _ in designs])
+        np.random.seed(99)
+        frame = sampler.generate_design_frame(parms, 50)
+        pd.testing.assert_frame_equal(records, frame)
+        assert (frame.dtypes == object).any()
+
+
+class TestGenePoolLatinHypercube(unittest.TestCase):
+
+    def test_lhs(self):
+        from emat.experiment.latin_hypercube import lhs
+        np.random.seed(42)
+        for criterion in ('correlation', 'maximin'):
+            h = lhs(6, 200, genepool=500, criterion=criterion)
+            assert h.shape == (6, 200)
+            # each column has exactly one sample in each stratum
+            for row in h:
+                assert (np.sort(np.floor(row * 200)) == np.arange(200)).all()
+            corr = np.corrcoef(h) - np.eye(6)
+            assert np.fabs(corr).max() < 0.1
+
+    def test_lhs_pool_memory_cap(self):
+        from emat.experiment import latin_hypercube
+        pool = latin_hypercube._gene_pool(4, 1000, 10000, max_pool_bytes=100 * 1000 * 2)
+        assert pool.shape == (100, 1000)
+        pool = latin_hypercube._gene_pool(4, 1000, 10000, max_pool_bytes=0)
+        assert pool.shape == (4, 1000)
+
+
+class TestWeightedDistances(unittest.TestCase):
+
+    def test_weighted_distances(self):
+        from emat.experiment.experimental_design import (
+            minimum_weighted_distance, count_within_buffer,
+            value_within_buffer, minimum_weighted_distances,
+        )
+        rng = np.random.default_rng(0)
+        for n_dims in (3, 20):
+            fixed = rng.random([30, n_dims])
+            other = rng.random([50, n_dims])
+            values = rng.random([30, n_dims])
+            w = rng.random(n_dims) + 0.1
+            sq_dist_by_axis = (fixed[None, :, :] - other[:, None, :]) ** 2 * w
+            np.testing.assert_allclose(
+                minimum_weighted_distance(fixed, other, w),
+                sq_dist_by_axis.sum(2).min(1),
+            )
+            within = np.sqrt(sq_dist_by_axis) <= 0.2
+            np.testing.assert_array_equal(
+                count_within_buffer(fixed, other, w, 0.2),
+                within.sum((1, 2)),
+            )
+            np.testing.assert_allclose(
+                value_within_buffer(fixed, values, other, w, 0.2),
+                (within * values[None, :, :]).sum((1, 2)),
+            )
+            weights = pd.DataFrame({'a': 1 / w, 'b': np.ones(n_dims)})
+            result = minimum_weighted_distances(pd.DataFrame(fixed), pd.DataFrame(other), weights)
+            np.testing.assert_allclose(result['a'], sq_dist_by_axis.sum(2).min(1))
+
+    def test_batch_pick_new_experiments(self):
+        from emat.experiment.experimental_design import batch_pick_new_experiments
+        rng = np.random.default_rng(0)
+        existing = pd.DataFrame(rng.random([20, 2]), columns=['x', 'y'])
+        possible = pd.DataFrame(rng.random([500, 2]), columns=['x', 'y'], index=np.arange(100, 600))
+        picks = batch_pick_new_experiments(existing, possible, 5, np.ones(2), None, None)
+        assert len(picks) == 5
+        assert picks.index.is_unique
+        pd.testing.assert_frame_equal(picks, possible.loc[picks.index])
+        # each pick is the farthest candidate from all the other experiments
+        for i in picks.index:
+            others = pd.concat([existing, picks.drop(i)]).to_numpy()
+            mwd = ((possible.to_numpy()[:, None, :] - others[None, :, :]) ** 2).sum(2).min(1)
+            assert possible.index[mwd.argmax()] == i
+
 
 
 if __name__ == '__main__':
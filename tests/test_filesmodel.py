@@ -45,6 +45,59 @@ class TestCoreFilesMethods(unittest.TestCase):
         assert k(zz) == 245
         assert j(zz) == 278
 
+    def test_read_cache(self):
+        import tempfile
+        from emat.model.core_files.parsers import TableParser, MappingParser, ReadCache, loc, iloc, key
+        calls = []
+        def reader(f, **kwargs):
+            calls.append(kwargs)
+            return pd.read_csv(f, **kwargs)
+        zz = pd.DataFrame(
+            np.arange(12).reshape(3, 4),
+            index=pd.Index(['row1', 'row2', 'row3'], name='idx'),
+            columns=['col1', 'col2', 'col3', 'col4'],
+        )
+        p1 = TableParser('zz.csv', {'a': loc['row1', 'col1']}, reader, index_col=0, usecols=['idx', 'col1'])
+        p2 = TableParser('zz.csv', {'b': loc['row3', 'col3']}, reader, index_col=0, usecols=['idx', 'col3'])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            zz.to_csv(os.path.join(tmpdir, 'zz.csv'))
+            assert p1.read(tmpdir) == {'a': 0}
+            assert calls.pop() == {'index_col': 0, 'usecols': ['idx', 'col1']}
+
+            cache = ReadCache()
+            cache.add_hints(p1, tmpdir)
+            cache.add_hints(p2, tmpdir)
+            assert p1.read(tmpdir, cache=cache) == {'a': 0}
+            assert p2.read(tmpdir, cache=cache) == {'b': 10}
+            # one shared read of the merged columns
+            assert calls == [{'index_col': 0, 'usecols': ['idx', 'col1', 'col3']}]
+
+            # positional getters see the same columns as plain pandas,
+            # whichever other parsers share the read
+            p3 = TableParser('zz.csv', {'c': iloc[0, 0]}, reader, index_col=0, usecols=['idx', 'col3'])
+            p4 = TableParser('zz.csv', {'d': iloc[0, 0]}, reader, index_col=0, usecols=['idx', 'col4', 'col1'])
+            cache = ReadCache()
+            for p in (p1, p3, p4):
+                cache.add_hints(p, tmpdir)
+            for p in (p3, p4):
+                plain = pd.read_csv(os.path.join(tmpdir, 'zz.csv'), index_col=0, usecols=p.usecols)
+                pd.testing.assert_frame_equal(p.raw(tmpdir), plain)
+                pd.testing.assert_frame_equal(p.raw(tmpdir, cache=cache), plain)
+            assert p3.read(tmpdir) == p3.read(tmpdir, cache=cache) == {'c': 2}
+            assert p4.read(tmpdir) == p4.read(tmpdir, cache=cache) == {'d': 0}
+
+            # default mapping parsers share a read, and ignore column hints
+            with open(os.path.join(tmpdir, 'mm.yaml'), 'w') as f:
+                f.write("x: 1.5\ny: 2.5\n")
+            m1 = MappingParser('mm.yaml', {'x': key['x']}, usecols=['x'])
+            m2 = MappingParser('mm.yaml', {'y': key['y']})
+            assert m1.read(tmpdir) == {'x': 1.5}
+            cache = ReadCache()
+            cache.add_hints(m1, tmpdir)
+            cache.add_hints(m2, tmpdir)
+            assert m1.read(tmpdir, cache=cache) == {'x': 1.5}
+            assert m2.read(tmpdir, cache=cache) == {'y': 2.5}
+            assert len(cache._reads) == 1
 
     def test_load_archived_gbnrtc(self):
         import emat.examples
@@ -123,5 +176,128 @@ def test_files_with_broken_scope():
     result = fx.run_experiments(design)
     assert result['bogus_measure'].isna().all()
 
+def test_provision_directory(tmp_path):
+    import pytest
+    from emat.workbench.em_framework.working_directories import provision_directory
+    master = tmp_path / "master"
+    (master / "inputs").mkdir(parents=True)
+    (master / "inputs" / "network.dat").write_text("links")
+    (master / "params.yml").write_text("alpha: 1")
+
+    methods = provision_directory(master, tmp_path / "hard", "hardlink", writable=["params.yml"])
+    assert os.path.samefile(tmp_path / "hard" / "inputs" / "network.dat", master / "inputs" / "network.dat")
+    assert not os.path.samefile(tmp_path / "hard" / "params.yml", master / "params.yml")
+    assert sum(methods.values()) == 2
+    (tmp_path / "hard" / "params.yml").write_text("alpha: 2")
+    assert (master / "params.yml").read_text() == "alpha: 1"
+
+    provision_directory(master, tmp_path / "sym", "symlink", writable=["params.yml"])
+    assert os.path.islink(tmp_path / "sym" / "inputs" / "network.dat")
+    assert not os.path.islink(tmp_path / "sym" / "params.yml")
+
+    # without declared writable files, everything is copied
+    provision_directory(master, tmp_path / "all", "hardlink")
+    assert not os.path.samefile(tmp_path / "all" / "inputs" / "network.dat", master / "inputs" / "network.dat")
+    assert (tmp_path / "all" / "inputs" / "network.dat").read_text() == "links"
+
+    with pytest.raises(ValueError):
+        provision_directory(master, tmp_path / "bad", "teleport")
+
+    # symlinked directories are provisioned with their contents,
+    # and a link back to an enclosing directory is not followed
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "table.csv").write_text("a,b")
+    (master / "linked").symlink_to(tmp_path / "shared", target_is_directory=True)
+    (master / "inputs" / "loop").symlink_to(master, target_is_directory=True)
+    methods = provision_directory(master, tmp_path / "links", "copy")
+    assert (tmp_path / "links" / "linked" / "table.csv").read_text() == "a,b"
+    assert not os.path.islink(tmp_path / "links" / "linked")
+    assert not os.path.exists(tmp_path / "links" / "inputs" / "loop")
+    assert sum(methods.values()) == 3
+
+def test_files_model_working_directory(tmp_path):
+    from emat.model.core_files.core_files_example import RoadTestFileModel
+    cwd = os.getcwd()
+    try:
+        m = RoadTestFileModel()
+        master = m.resolved_model_path
+        m.working_directory_strategy = 'hardlink'
+        m.setup({'expand_capacity': 42.0})
+        working = m.resolved_model_path
+        assert os.path.dirname(os.path.normpath(working)) == os.path.dirname(os.path.normpath(master))
+        assert os.path.basename(os.path.normpath(working)).startswith(os.path.basename(os.path.normpath(master)) + "-")
+        with open(os.path.join(m.resolved_model_path, 'levers.yml')) as f:
+            assert 'expand_capacity: 42.0' in f.read()
+        with open(os.path.join(master, 'levers.yml')) as f:
+            assert 'expand_capacity: 42.0' not in f.read()
+
+        m.archive({}, str(tmp_path / "archive"))
+        assert not os.path.samefile(
+            tmp_path / "archive" / "levers.yml",
+            os.path.join(m.resolved_model_path, 'levers.yml'),
+        )
+
+        # the working copy is removed by cleanup
+        m.cleanup()
+        assert not os.path.exists(working)
+        assert os.path.normpath(m.resolved_model_path) == os.path.normpath(master)
+    finally:
+        os.chdir(cwd)
+
+def test_async_archive(tmp_path):
+    import yaml
+    from emat.model.core_files.core_files_example import RoadTestFileModel
+    from emat.model.core_files.archiving import read_manifest
+    cwd = os.getcwd()
+    try:
+        m = RoadTestFileModel()
+        m.archive_path = str(tmp_path / "archive")
+        m.archive_workers = 2
+        m.archive_compression = 'gzip'
+        outputs = os.path.join(m.resolved_model_path, m.rel_output_path)
+        os.makedirs(outputs, exist_ok=True)
+        measures = {'build_travel_time': 60.5, 'no_build_travel_time': 80.25, 'time_savings': 19.75}
+        with open(os.path.join(outputs, 'output.yaml'), 'w') as f:
+            yaml.safe_dump(measures, f)
+
+        for experiment_id in (1, 2):
+            m.archive({}, m.get_experiment_archive_path(experiment_id), experiment_id)
+        assert m.archive_stage is not None
+        # the archive is a snapshot, later changes to the model are not archived
+        with open(os.path.join(outputs, 'output.yaml'), 'w') as f:
+            yaml.safe_dump({k: 0 for k in measures}, f)
+
+        assert m.load_archived_measures(1, list(measures)) == measures
+        m.wait_for_archives()
+        manifest1 = read_manifest(m.get_experiment_archive_path(1))
+        manifest2 = read_manifest(m.get_experiment_archive_path(2))
+        assert manifest1['files'] == manifest2['files']
+        assert manifest1['files']['levers.yml']['compression'] == 'gzip'
+        # identical files are stored once
+        store = os.path.join(m.resolved_archive_path, f"scp_{m.scope.name}", "_objects")
+        n_objects = sum(len(files) for _, _, files in os.walk(store))
+        assert n_objects == len(manifest1['files'])
+        assert m.load_archived_measures(2, list(measures)) == measures
+    finally:
+        os.chdir(cwd)
+
+def test_archive_failure(tmp_path):
+    import pytest
+    from emat.model.core_files.archiving import ArchiveStage, read_manifest
+    snapshot = tmp_path / "snapshot"
+    snapshot.mkdir()
+    (snapshot / "out.txt").write_text("result")
+    # the object store cannot be created inside a file
+    (tmp_path / "store").write_text("not a directory")
+    stage = ArchiveStage(tmp_path / "store")
+    stage.submit(snapshot, tmp_path / "archive")
+    with pytest.raises(OSError):
+        stage.wait(tmp_path / "archive")
+    assert not snapshot.exists()
+    assert read_manifest(tmp_path / "archive") is None
+    # each failure is raised once
+    stage.wait()
+    stage.close()
+
 if __name__ == '__main__':
     unittest.main()
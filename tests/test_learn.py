@@ -17,3 +17,68 @@ def test_select_unique_columns():
 	s = SelectUniqueColumns().fit(df)
 	pandas.testing.assert_frame_equal(s.transform(df), df[['Aa','Bb','Dd']])
 
+
+
+def test_shared_kernel_gaussian_process():
+	import numpy
+	import pytest
+	from sklearn.gaussian_process import GaussianProcessRegressor
+	from sklearn.gaussian_process.kernels import RBF, ConstantKernel as C
+	try:
+		from emat.multitarget.shared_kernel import SharedKernelGaussianProcess
+		from emat.multitarget import MultipleTargetRegression
+	except ImportError as err:
+		pytest.skip(f"emat.multitarget unavailable: {err}")
+
+	rng = numpy.random.default_rng(0)
+	X = rng.random((40, 3))
+	Y = numpy.c_[numpy.sin(4 * X[:, 0]), X[:, 1] ** 2]
+	X_new = rng.random((5, 3))
+
+	# with a single target, this is the usual Gaussian process
+	kernel = C() * RBF([1.0] * 3)
+	shared = SharedKernelGaussianProcess(kernel=kernel, random_state=0).fit(X, Y[:, :1])
+	single = GaussianProcessRegressor(kernel=kernel, random_state=0).fit(X, Y[:, :1])
+	assert shared.log_marginal_likelihood_value_ == pytest.approx(single.log_marginal_likelihood_value_, rel=1e-8)
+	mean, std = shared.predict(X_new, return_std=True)
+	mean_1, std_1 = single.predict(X_new, return_std=True)
+	numpy.testing.assert_allclose(mean.ravel(), numpy.ravel(mean_1))
+	numpy.testing.assert_allclose(std.ravel(), numpy.ravel(std_1), rtol=1e-6)
+
+	mtr = MultipleTargetRegression(shared_kernel=True, n_restarts_optimizer=2, random_state=0)
+	mtr.fit(pandas.DataFrame(X), pandas.DataFrame(Y, columns=['y1', 'y2']))
+	mean, std = mtr.predict(pandas.DataFrame(X_new), return_std=True)
+	assert list(mean.columns) == ['y1', 'y2']
+	assert mean.shape == std.shape == (5, 2)
+
+
+def test_hypothetical_training_points():
+	import numpy
+	import pytest
+	try:
+		from emat.multitarget import DetrendedMultipleTargetRegression
+	except ImportError as err:
+		pytest.skip(f"emat.multitarget unavailable: {err}")
+
+	rng = numpy.random.default_rng(0)
+	X = pandas.DataFrame(rng.random((50, 3)), columns=['a', 'b', 'c'])
+	Y = pandas.DataFrame({'y1': numpy.sin(4 * X.a) + X.b, 'y2': X.b ** 2})
+	candidates = pandas.DataFrame(rng.random((10, 3)), columns=['a', 'b', 'c'])
+	X_new = pandas.DataFrame(rng.random((5, 3)), columns=['a', 'b', 'c'])
+
+	for shared_kernel in (False, True):
+		mtr = DetrendedMultipleTargetRegression(
+			n_restarts_optimizer=0, shared_kernel=shared_kernel, random_state=0,
+		).fit(X, Y)
+		base = mtr.predict(X_new)
+		for picks in ([0, 1, 2], [0, 1, 2, 3, 4], [0, 2, 4], [5, 4, 0]):
+			mtr.set_hypothetical_training_points(candidates.iloc[picks])
+			assert sorted(map(tuple, mtr._hypothetical_X_)) == sorted(map(tuple, candidates.iloc[picks].to_numpy()))
+			# the updated factors match factorizing from scratch
+			for estimator in mtr._gaussian_processes():
+				K = estimator.kernel_(mtr.X_train_)
+				K[numpy.diag_indices_from(K)] += estimator.alpha
+				numpy.testing.assert_allclose(estimator.L_, numpy.linalg.cholesky(K), atol=1e-8)
+		mtr.clear_hypothetical_training_points()
+		assert mtr.X_train_.shape == X.shape
+		pandas.testing.assert_frame_equal(mtr.predict(X_new), base)
@@ -210,6 +210,83 @@ class TestMetaModelMethods(unittest.TestCase):
         for j, (_, k) in zip(correct, ExogenouslyStratifiedKFold(n_splits=5, exo_data=S).split(X, Y)):
             assert np.array_equal(j, k)
 
+    def test_chunked_predictions(self):
+        from emat.model.meta_model import MetaModel
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        rng = np.random.default_rng(42)
+        X = pd.DataFrame(rng.random([40, 3]), columns=['a', 'b', 'c'])
+        Y = pd.DataFrame({
+            'y1': X.a * 2 + np.sin(X.b * 5),
+            'y2': np.exp(X.c + X.a),
+            'y3': X.b,
+        })
+        mm = MetaModel(
+            X, Y, metamodel_types={'y2': 'log'}, disabled_outputs=['y3'],
+            regressor=GaussianProcessRegressor(), use_best_cv=False,
+        )
+        X_new = pd.DataFrame(rng.random([7, 3]), columns=['a', 'b', 'c'], index=np.arange(100, 107))
+        expected, expected_std = mm.regression.predict(X_new, return_std=True)
+        expected[:, 1] = np.exp(expected[:, 1])
+
+        mm.prediction_chunk_size = 3
+        y = mm(X_new)
+        y_std = mm.compute_std(X_new)
+        assert list(y.index) == list(X_new.index)
+        np.testing.assert_allclose(y[['y1', 'y2']].to_numpy(float), expected[:, :2])
+        np.testing.assert_allclose(y_std[['y1', 'y2']].to_numpy(float), expected_std[:, :2])
+        assert y['y3'].isna().all()
+        assert y_std['y3'].isna().all()
+
+        y2, y2_std = mm.predict_std(X_new)
+        assert list(y2.columns) == ['y1', 'y2']
+        pd.testing.assert_frame_equal(y2, y[['y1', 'y2']].astype(float))
+        pd.testing.assert_frame_equal(y2_std, y_std[['y1', 'y2']].astype(float))
+
+    def test_select_best_metamodeltype(self):
+        from emat.model.meta_model import MetaModel, select_best_metamodeltype
+        from emat.learn.multioutput import MultiOutputRegressor
+        from sklearn.gaussian_process import GaussianProcessRegressor
+        rng = np.random.default_rng(7)
+        X = pd.DataFrame(rng.random([40, 3]), columns=['a', 'b', 'c'])
+        Y = pd.DataFrame({
+            'y1': np.exp(X.a + X.b),
+            'y2': X.c * 0.9 + 0.05,
+            'y3': X.a - X.b,
+        })
+        regressor = MultiOutputRegressor(GaussianProcessRegressor(normalize_y=True))
+        best, tab = select_best_metamodeltype(
+            X, Y, regressor=regressor, return_tabulation=True, n_jobs=1,
+        )
+        assert list(tab.columns) == ['linear', 'linear', 'log', 'log1p', 'logit', 'exp']
+        assert list(best.index) == ['y1', 'y2', 'y3']
+
+        # same scores as cross-validating a separate MetaModel per transform
+        log_cols = Y.columns[Y.min() > 0]
+        expected = MetaModel(
+            X, Y[log_cols], {i: 'log' for i in log_cols},
+            random_state=0, regressor=regressor, use_best_cv=False,
+        ).cross_val_scores(random_state=0, n_repeats=3, return_type='raw')
+        np.testing.assert_allclose(tab['log'][log_cols], expected)
+        assert tab['log'][['y3']].isna().all()
+
+        # repeated searches on the same data are served from the cache
+        tab.iloc[:, :] = 0
+        best2, tab2 = select_best_metamodeltype(
+            X, Y, regressor=regressor, return_tabulation=True,
+        )
+        pd.testing.assert_series_equal(best, best2)
+        np.testing.assert_allclose(tab2['log'][log_cols], expected)
+
+        # the cache key covers nested parameters, and searches with
+        # random splits are not cached
+        from emat.model import meta_model
+        from emat.util.hasher import hash_it
+        other = MultiOutputRegressor(GaussianProcessRegressor(normalize_y=True, alpha=1e-5))
+        assert hash_it(meta_model._estimator_params(regressor)) != hash_it(meta_model._estimator_params(other))
+        n_cached = len(meta_model._metamodeltype_cache)
+        select_best_metamodeltype(X, Y, regressor=regressor, random_state=None, n_jobs=1)
+        assert len(meta_model._metamodeltype_cache) == n_cached
+
 
 if __name__ == '__main__':
     unittest.main()
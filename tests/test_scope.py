@@ -145,6 +145,40 @@ class TestScopeMethods(unittest.TestCase):
         assert s1.relevant_features == s1_.relevant_features
         assert s2.relevant_features == s2_.relevant_features
 
+    def test_density(self):
+        import numpy
+        scope = Scope(package_file('model', 'tests', 'road_test.yaml'))
+        design = scope.design_experiments(n_samples=200, random_seed=1)
+        log_density = scope.logpdf(design)
+        assert list(log_density.index) == list(design.index)
+
+        # one parameter at a time, with categories evaluated at their position
+        expected = numpy.zeros(len(design))
+        for p in scope.get_uncertainties() + scope.get_levers():
+            for i, x in enumerate(design[p.name]):
+                if p.dtype in ('cat', 'bool'):
+                    x = p.values.index(x)
+                if p.dtype == 'real':
+                    expected[i] += p.dist.logpdf(x)
+                else:
+                    expected[i] += p.dist.logpmf(x)
+        numpy.testing.assert_allclose(log_density, expected)
+        assert scope.get_density(design.iloc[0]) == pytest.approx(numpy.exp(expected[0]))
+
+        outside = design.iloc[:2].astype({'debt_type': object})
+        outside.loc[0, 'alpha'] = 99
+        outside.loc[1, 'debt_type'] = 'Not A Bond'
+        assert (scope.pdf(outside) == 0).all()
+
+        # correlated parameters use the Gaussian copula, which integrates
+        # to one against the independent marginal distributions
+        corr_scope = Scope(package_file('model', 'tests', 'road_test_corr.yaml'))
+        independent = scope.design_experiments(n_samples=20000, random_seed=2, sampler='mc')
+        ratio = numpy.exp(corr_scope.logpdf(independent) - scope.logpdf(independent))
+        assert ratio.mean() == pytest.approx(1, abs=0.05)
+        correlated = corr_scope.design_experiments(n_samples=2000, random_seed=2, sampler='mc')
+        assert corr_scope.logpdf(correlated).mean() > scope.logpdf(correlated).mean()
+
 
 if __name__ == '__main__':
     unittest.main()
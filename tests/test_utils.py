@@ -10,3 +10,69 @@ def test_seq_int_grouper():
     print(data1)
     assert data1 == data
 
+
+
+def test_fingerprint_rows():
+    import numpy as np
+    import pandas as pd
+    from emat.util.deduplicate import fingerprint_rows
+    a = pd.DataFrame({'x': [1, 2, -0.0], 'y': ['a', '1', None], 'z': [True, False, True]})
+    b = pd.DataFrame({'z': [1, 0, 1], 'x': [1.0, 2.0, 0.0], 'y': pd.Categorical(['a', 1, np.nan])})
+    assert fingerprint_rows(a).tolist() == fingerprint_rows(b).tolist()
+    c = a.copy()
+    c.loc[1, 'x'] = 2.000001
+    fa, fc = fingerprint_rows(a), fingerprint_rows(c)
+    assert fa[0] == fc[0]
+    assert fa[1] != fc[1]
+    assert fingerprint_rows(a, ['x']).tolist() == fingerprint_rows(b[['x']]).tolist()
+
+
+def test_nondominated_solutions():
+    import numpy as np
+    import pandas as pd
+    from emat import Measure
+    from emat.optimization.nondominated import nondominated_solutions
+
+    def pairwise(s, nearly):
+        # the reference algorithm, comparing each pair of solutions in turn
+        dominated = set()
+        for i in range(len(s)):
+            if i in dominated:
+                continue
+            for j in range(i + 1, len(s)):
+                if j in dominated:
+                    continue
+                diff = s[i] - s[j]
+                dmax, dmin = diff.max(), diff.min()
+                if dmax < 0 or (dmax == 0 and dmin < 0):
+                    dominated.add(i)
+                elif dmin > 0 or (dmin == 0 and dmax > 0):
+                    dominated.add(j)
+                elif nearly and dmax < nearly and dmin > -nearly:
+                    dominated.add(j)
+        return [k for k in range(len(s)) if k not in dominated]
+
+    rng = np.random.default_rng(0)
+    measures = [
+        Measure('a', kind=Measure.MAXIMIZE),
+        Measure('b', kind=Measure.MINIMIZE),
+        Measure('c', kind=Measure.MAXIMIZE),
+    ]
+    for n_objectives in (1, 2, 3):
+        x = np.round(rng.random([200, 3]) * 10, 1)
+        x[50:60] = x[:10] + 1e-6
+        x[7, 1] = np.nan
+        df = pd.DataFrame(x, columns=['a', 'b', 'c'])
+        rfs = measures[:n_objectives]
+        s = df[['a', 'b', 'c'][:n_objectives]].to_numpy() * [1, -1, 1][:n_objectives]
+        for nearly in (1e-5, 0):
+            expected = pairwise(s, nearly)
+            result = nondominated_solutions(df, None, rfs, nearly=nearly)
+            assert list(result.index) == expected
+            # inserting into an existing front
+            front = nondominated_solutions(df.iloc[:100], None, rfs, nearly=nearly)
+            result = nondominated_solutions(df.iloc[100:], None, rfs, nearly=nearly, front=front)
+            labels = list(front.index) + list(range(100, 200))
+            assert list(result.index) == [
+                labels[k] for k in pairwise(np.concatenate([s[front.index], s[100:]]), nearly)
+            ]
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from emat.workbench.em_framework import (
+    Model, RealParameter, IntegerParameter, CategoricalParameter, ScalarOutcome,
+    Policy, Constraint, sample_uncertainties, perform_experiments,
+)
+from emat.workbench.em_framework.parameters import experiment_generator
+
+
+def simple_function(x=0, y=0, n=0, c='a', lever=0):
+    return {'z': x * lever + y + n, 'w': x - lever}
+
+
+@pytest.fixture()
+def simple_model():
+    model = Model('simple', function=simple_function)
+    model.uncertainties = [
+        RealParameter('x', 0, 1),
+        RealParameter('y', 0, 1),
+        IntegerParameter('n', 0, 5),
+        CategoricalParameter('c', ['a', 'b']),
+    ]
+    model.levers = [RealParameter('lever', 0, 1)]
+    model.outcomes = [ScalarOutcome('z'), ScalarOutcome('w')]
+    np.random.seed(0)
+    return model
+
+
+def test_robust_evaluate_streamed(simple_model):
+    from emat.workbench.em_framework.callbacks import RobustCallback
+    from emat.workbench.em_framework.evaluators import robust_evaluate
+
+    robustness_functions = [
+        ScalarOutcome('mean_z', variable_name='z', function=np.mean),
+        ScalarOutcome('max_zw', variable_name=['z', 'w'], function=lambda z, w: np.max(z + w)),
+    ]
+    scenarios = sample_uncertainties(simple_model, 12)
+    policies = [Policy(f'p{i}', lever=v) for i, v in enumerate([0.1, 0.5, 0.9])]
+
+    # the same as evaluating each policy separately
+    expected = []
+    for policy in policies:
+        _, outcomes = perform_experiments(simple_model, scenarios=scenarios, policies=[policy])
+        expected.append([np.mean(outcomes['z']), np.max(outcomes['z'] + outcomes['w'])])
+    result = robust_evaluate(simple_model, robustness_functions, scenarios, policies)
+    assert list(result.columns) == ['lever', 'mean_z', 'max_zw']
+    np.testing.assert_allclose(result[['mean_z', 'max_zw']].to_numpy(), expected)
+
+    # results arriving in any order are grouped by policy
+    callback = RobustCallback(robustness_functions, 12, 3)
+    experiments = list(experiment_generator(scenarios, [simple_model], policies))
+    random.Random(1).shuffle(experiments)
+    for experiment in experiments:
+        assert len(callback._outcomes) <= 3
+        callback(experiment, simple_function(**experiment.scenario, **experiment.policy))
+    assert not callback._outcomes
+    np.testing.assert_allclose([callback.get_results()[i] for i in range(3)], expected)
+
+
+def test_evaluate_robust_grouped_rows(simple_model):
+    from emat.workbench.em_framework.optimization import evaluate, evaluate_robust
+
+    scenarios = sample_uncertainties(simple_model, 8)
+    policies = [Policy(str(i), lever=v) for i, v in enumerate([0.2, 0.9, 0.5])]
+    experiments, outcomes = perform_experiments(simple_model, scenarios=scenarios, policies=policies)
+
+    class Job:
+        def __init__(self):
+            self.solution = self
+            self.problem = self
+
+        def evaluate(self):
+            self.result = self.function(None)
+
+    robustness_functions = [
+        ScalarOutcome('mean_z', kind=ScalarOutcome.MAXIMIZE, variable_name='z', function=np.mean),
+        ScalarOutcome('min_w', kind=ScalarOutcome.MINIMIZE, variable_name='w', function=np.min),
+    ]
+    constraints = [
+        Constraint('lever', parameter_names='lever', function=Constraint.must_be_less_than(0.6)),
+        Constraint('mean_z', outcome_names='mean_z', function=Constraint.must_be_greater_than(3.4)),
+    ]
+    problem = SimpleNamespace(robustness_functions=robustness_functions, ema_constraints=constraints)
+    jobs = [Job() for _ in policies]
+    evaluate_robust(zip(reversed(policies), jobs), experiments, outcomes, problem)
+    for policy, job in zip(reversed(policies), jobs):
+        logical = (experiments['policy'] == policy.name).to_numpy()
+        mean_z = outcomes['z'][logical].mean()
+        assert job.result[0] == [mean_z, outcomes['w'][logical].min()]
+        assert job.result[1] == [max(0, policy['lever'] - 0.6), max(0, 3.4 - mean_z)]
+
+    # one experiment per policy
+    experiments, outcomes = perform_experiments(simple_model, scenarios=list(scenarios)[:1], policies=policies)
+    problem = SimpleNamespace(searchover='levers', outcome_names=['z'], ema_constraints=constraints[:1])
+    jobs = [Job() for _ in policies]
+    evaluate(zip(policies, jobs), experiments, outcomes, problem)
+    assert [job.result for job in jobs] == [
+        ([outcomes['z'][i]], [max(0, policy['lever'] - 0.6)]) for i, policy in enumerate(policies)
+    ]
+
+
+def test_default_callback_extend(simple_model):
+    from emat.workbench.em_framework.callbacks import DefaultCallback
+
+    scenarios = sample_uncertainties(simple_model, 5)
+    policies = [Policy(f'p{i}', lever=v) for i, v in enumerate([0.1, 0.9])]
+    experiments = list(experiment_generator(scenarios, [simple_model], policies))
+    results = [
+        (e, simple_function(**e.scenario.data, **e.policy.data))
+        for e in experiments
+    ]
+
+    def new_callback():
+        return DefaultCallback(simple_model.uncertainties, simple_model.levers,
+                               simple_model.outcomes, 10)
+
+    # storing results one at a time or in batches gives the same results
+    one_by_one = new_callback()
+    for experiment, outcomes in results:
+        one_by_one(experiment, outcomes)
+    batched = new_callback()
+    batched.extend(results[:3])
+    batched.extend(results[3:])
+    cases, outcomes = batched.get_results()
+    pd.testing.assert_frame_equal(cases, one_by_one.cases)
+    for k in ['z', 'w']:
+        np.testing.assert_array_equal(outcomes[k], one_by_one.results[k])
+    assert one_by_one.i == batched.i == 10
+    assert cases['n'].dtype == np.int64
+    assert list(cases['policy']) == ['p0'] * 5 + ['p1'] * 5
+    np.testing.assert_allclose(
+        outcomes['z'],
+        cases['x'] * cases['lever'] + cases['y'] + cases['n'],
+    )
+
+    # rows that were never stored are missing
+    partial = new_callback()
+    partial.extend(results[:4])
+    cases = partial.cases
+    assert cases['n'].dtype == np.float64
+    assert cases['n'][:4].tolist() == one_by_one.cases['n'][:4].tolist()
+    assert cases.iloc[4:, :].isna().all().all()
+    assert np.isnan(partial.results['z'][4:]).all()